@@ -0,0 +1,153 @@
+# clavis_event_inventory/bookings/batch_documents.py
+
+"""
+Dispatch documents for a day (or date range) in one PDF: a delivery note for every event and rental
+starting in the range, and a waybill for every logistics service.
+
+All bookings are loaded up front with their client and item lines (a fixed number of queries whatever
+the number of bookings), then rendered into a single document with one page template per document
+kind, so the styles and the logo image are shared by every page.
+
+Large days can be rendered across processes (workers > 1): the bookings are split into contiguous
+chunks, each rendered to its own PDF by a worker, and the chunks are concatenated with pypdf
+(requirements.txt). With a single worker, or if pypdf is not installed, the serial renderer is used.
+"""
+
+import datetime
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.db.models import Prefetch
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import BaseDocTemplate, Frame, NextPageTemplate, PageBreak, PageTemplate
+
+from inventory.models import day_bounds
+from reports.pdf_toolkit import get_pdf_styles
+from .models import Event, EventItem, Rental, RentalItem
+from .utils import (
+    DELIVERY_NOTE_MARGINS, WAYBILL_MARGINS, build_delivery_note_story, build_logistics_waybill_story,
+    draw_signature_footer,
+)
+
+try:
+    from pypdf import PdfWriter
+except ImportError: # Parallel rendering needs pypdf to join the chunks
+    PdfWriter = None
+
+DOCUMENT_KINDS = ('delivery-notes', 'waybills', 'all')
+
+# Page template per document: (margins, story builder, onPage callback)
+PAGE_TEMPLATES = {
+    'delivery-note': (DELIVERY_NOTE_MARGINS, build_delivery_note_story, draw_signature_footer),
+    'waybill': (WAYBILL_MARGINS, build_logistics_waybill_story, None),
+}
+
+
+def get_batch_document_workers():
+    """ Processes used by the dispatch-documents endpoint (settings.BATCH_DOCUMENT_WORKERS, default 1 = serial). """
+    return max(1, getattr(settings, 'BATCH_DOCUMENT_WORKERS', 1))
+
+
+def parse_date_range(start, end=None):
+    """ (start date, end date) from ISO strings; the end defaults to the start. Raises ValueError if invalid or reversed. """
+    start_date = datetime.date.fromisoformat(start)
+    end_date = datetime.date.fromisoformat(end) if end else start_date
+    if end_date < start_date:
+        raise ValueError("The end date is before the start date.")
+    return start_date, end_date
+
+
+def batch_filename(start_date, end_date, kind):
+    period = start_date.isoformat() if start_date == end_date else f"{start_date.isoformat()}_{end_date.isoformat()}"
+    return f"Dispatch-{kind}-{period}.pdf"
+
+
+def dispatch_documents(start_date, end_date=None, kind='all'):
+    """
+    List of (page template name, booking) for the non-cancelled bookings starting between start_date and
+    end_date (inclusive, local days), ordered by start date. Runs at most four queries.
+    """
+    range_start, _ = day_bounds(start_date)
+    _, range_end = day_bounds(end_date or start_date)
+    lines = lambda model: Prefetch('items', queryset=model.objects.select_related('item', 'item__category'))
+
+    documents = []
+    if kind in ('delivery-notes', 'all'):
+        events = Event.objects.all() if kind == 'all' else Event.objects.filter(is_logistics_only_service=False)
+    else:
+        events = Event.objects.filter(is_logistics_only_service=True)
+    events = events.filter(start_date__range=(range_start, range_end)).exclude(status=Event.StatusChoices.CANCELLED)
+    if kind != 'waybills': # Waybills do not list items
+        events = events.prefetch_related(lines(EventItem))
+    for event in events.select_related('client'):
+        documents.append(('waybill' if event.is_logistics_only_service else 'delivery-note', event))
+
+    if kind != 'waybills':
+        rentals = (
+            Rental.objects.filter(start_date__range=(range_start, range_end)).exclude(status=Rental.StatusChoices.CANCELLED)
+            .select_related('client').prefetch_related(lines(RentalItem))
+        )
+        documents.extend(('delivery-note', rental) for rental in rentals)
+
+    documents.sort(key=lambda document: (document[1].start_date, document[1].reference_number))
+    return documents
+
+
+def _page_template(name):
+    margins, _, on_page = PAGE_TEMPLATES[name]
+    width, height = letter
+    frame = Frame(
+        margins['leftMargin'], margins['bottomMargin'],
+        width - margins['leftMargin'] - margins['rightMargin'], height - margins['topMargin'] - margins['bottomMargin'],
+        id='normal',
+    )
+    if on_page:
+        return PageTemplate(id=name, frames=[frame], onPage=on_page, pagesize=letter)
+    return PageTemplate(id=name, frames=[frame], pagesize=letter)
+
+
+def render_documents(documents):
+    """ PDF bytes of the documents, each starting on a new page with its own page template. """
+    buffer = io.BytesIO()
+    # The document margins are the delivery note's: draw_signature_footer lays out its columns from them
+    doc = BaseDocTemplate(buffer, pagesize=letter, **DELIVERY_NOTE_MARGINS)
+    first = documents[0][0] if documents else 'delivery-note'
+    doc.addPageTemplates([_page_template(name) for name in sorted(PAGE_TEMPLATES, key=lambda name: name != first)])
+
+    styles = get_pdf_styles()
+    story = []
+    for index, (name, booking) in enumerate(documents):
+        if index:
+            story += [NextPageTemplate(name), PageBreak()]
+        story += PAGE_TEMPLATES[name][1](booking, styles)
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def _chunks(documents, count):
+    size = -(-len(documents) // count)
+    return [documents[start:start + size] for start in range(0, len(documents), size)]
+
+
+def render_documents_parallel(documents, workers):
+    """
+    Renders contiguous chunks of the documents in `workers` processes and joins them with pypdf.
+    The bookings are pickled with their prefetched lines, so workers do not query the database.
+    Falls back to render_documents() when pypdf is missing or there is too little to split.
+    """
+    if PdfWriter is None or workers < 2 or len(documents) < 2:
+        return render_documents(documents)
+
+    chunks = _chunks(documents, workers)
+    with ProcessPoolExecutor(max_workers=len(chunks), mp_context=multiprocessing.get_context('spawn'), initializer=django.setup) as pool:
+        rendered = list(pool.map(render_documents, chunks))
+
+    writer = PdfWriter()
+    for chunk in rendered:
+        writer.append(io.BytesIO(chunk))
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
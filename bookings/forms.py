@@ -6,6 +6,7 @@ from django.forms import inlineformset_factory, BooleanField # Import BooleanFie
 # Import models from their correct apps
 from .models import Event, EventItem, Rental, RentalItem
 from inventory.models import Item # This should still refer to the Item model with initial_quantity
+from inventory.availability import check_availability_bulk, describe_peak
 from clients.models import Client
 from django.contrib.auth.models import User
 
@@ -228,4 +229,51 @@ class RentalItemForm(forms.ModelForm):
 RentalItemInlineFormSet = inlineformset_factory(
     Rental, RentalItem, form=RentalItemForm, # Changed to use RentalItemForm
     extra=1, can_delete=True, fk_name='booking' # Explicitly set fk_name
-)
\ No newline at end of file
+)
+
+# --- Shared Availability Validation (used by the event and rental add/edit views) ---
+
+def validate_item_formset_availability(item_formset, start_date, end_date, exclude_event_pk=None, exclude_rental_pk=None):
+    """
+    Checks every kept row of a validated item formset against the booking window in one batch
+    (two grouped queries whatever the number of rows) and attaches errors to the offending forms.
+    Pass exclude_*_pk when editing so the booking's own lines are not counted against it.
+    Returns (all_items_available, availability_errors).
+    """
+    all_items_available = True
+    availability_errors = []
+
+    # Check item availability only if there are forms with data and not marked for deletion
+    has_items_to_book = any(form.has_changed() and not form.cleaned_data.get('DELETE', False) for form in item_formset)
+    if not has_items_to_book or not (start_date and end_date):
+        return all_items_available, availability_errors
+
+    rows = []
+    row_forms = []
+    for form in item_formset:
+        if not form.cleaned_data or form.cleaned_data.get('DELETE', False):
+            continue
+        item = form.cleaned_data.get('item')
+        quantity = form.cleaned_data.get('quantity')
+        if item and quantity:
+            rows.append((item, quantity))
+            row_forms.append(form)
+        elif form.has_changed(): # Incomplete touched row
+            form.add_error(None, "Both item and quantity are required if using this row, or leave it empty/mark it for deletion.")
+            all_items_available = False
+
+    period = f"[{start_date.strftime('%Y-%m-%d')} - {end_date.strftime('%Y-%m-%d')}]"
+    editing = bool(exclude_event_pk or exclude_rental_pk)
+    results = check_availability_bulk(rows, start_date, end_date, exclude_event_pk=exclude_event_pk, exclude_rental_pk=exclude_rental_pk)
+    for form, availability in zip(row_forms, results):
+        if availability['is_available']:
+            continue
+        all_items_available = False
+        item = availability['item']
+        if editing:
+            error_msg = f"Not enough '{item.name}' available (only {availability['available']} free) for the period {period}, considering other bookings: {describe_peak(availability)}."
+        else:
+            error_msg = f"Not enough '{item.name}' available (only {availability['available']} free) for the selected dates {period}: {describe_peak(availability)}."
+        form.add_error('item', error_msg)
+        availability_errors.append(error_msg)
+    return all_items_available, availability_errors
@@ -0,0 +1,118 @@
+# clavis_event_inventory/bookings/management/commands/explain_booking_queries.py
+
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from bookings.models import Event, Rental, EventItem, RentalItem
+from dashboard.models import Notification
+from inventory.availability import BLOCKING_EVENT_STATUSES, BLOCKING_RENTAL_STATUSES
+from inventory.models import Item, ItemDayOccupancy
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs EXPLAIN QUERY PLAN on the hot booking / availability / dashboard queries and flags "
+        "full table scans. Exits with an error if any query scans a table it is not expected to."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the full plan of every query, not just the flagged ones.')
+
+    def get_queries(self):
+        """
+        (label, queryset, tables allowed to be scanned).
+        Tables listed as allowed are ones the query legitimately reads in full (e.g. the item list itself).
+        """
+        now = timezone.now()
+        window_end = now + datetime.timedelta(days=7)
+        today = timezone.localdate()
+        sample_item_ids = list(Item.objects.order_by('pk').values_list('pk', flat=True)[:40]) or [0]
+
+        return [
+            ('availability: event lines for items', EventItem.objects.filter(
+                item_id__in=sample_item_ids, booking__end_date__gte=now, booking__start_date__lte=window_end,
+                booking__status__in=BLOCKING_EVENT_STATUSES,
+            ).values_list('item_id', 'booking_id', 'booking__reference_number', 'booking__start_date', 'booking__end_date', 'quantity'), set()),
+            ('availability: rental lines for items', RentalItem.objects.filter(
+                item_id__in=sample_item_ids, booking__end_date__gte=now, booking__start_date__lte=window_end,
+                booking__status__in=BLOCKING_RENTAL_STATUSES,
+            ).values_list('item_id', 'booking_id', 'booking__reference_number', 'booking__start_date', 'booking__end_date', 'quantity'), set()),
+            ('occupancy: blocking event lines in window', EventItem.objects.filter(
+                booking__end_date__gte=now, booking__start_date__lte=window_end, booking__status__in=BLOCKING_EVENT_STATUSES,
+            ).values_list('item_id', 'booking__start_date', 'booking__end_date', 'quantity'), set()),
+            ('occupancy: blocking rental lines in window', RentalItem.objects.filter(
+                booking__end_date__gte=now, booking__start_date__lte=window_end, booking__status__in=BLOCKING_RENTAL_STATUSES,
+            ).values_list('item_id', 'booking__start_date', 'booking__end_date', 'quantity'), set()),
+            ('occupancy: reserved on day', ItemDayOccupancy.objects.filter(day=today), set()),
+            ('item list with availability', Item.objects.with_availability(today), {'inventory_item'}),
+            ('dashboard: upcoming events', Event.objects.filter(
+                start_date__range=(now, window_end), status=Event.StatusChoices.PLANNED,
+            ).order_by('start_date'), set()),
+            ('dashboard: events ending soon', Event.objects.filter(
+                end_date__range=(now, window_end), status=Event.StatusChoices.ACTIVE,
+            ).order_by('end_date'), set()),
+            ('dashboard: overdue rentals', Rental.objects.filter(
+                end_date__lt=now, status__in=[Rental.StatusChoices.OUT, Rental.StatusChoices.BOOKED, Rental.StatusChoices.OVERDUE],
+            ).order_by('end_date'), set()),
+            ('status update: events to complete', Event.objects.filter(
+                status=Event.StatusChoices.ACTIVE, end_date__lt=now,
+            ), set()),
+            ('dashboard: unread notifications', Notification.objects.filter(
+                user_id=1, is_read=False,
+            ).order_by('-created_at'), set()),
+            ('dashboard: latest notifications', Notification.objects.filter(
+                Q(user_id=1) | Q(user__isnull=True),
+            ).order_by('-created_at'), set()),
+        ]
+
+    def explain(self, queryset):
+        """ Returns the plan as a list of detail strings (SQLite) or raw lines (other backends). """
+        sql, params = queryset.query.sql_with_params()
+        if connection.vendor != 'sqlite':
+            return queryset.explain().splitlines()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            # Rows are (id, parent, notused, detail)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def full_scans(self, plan, allowed_tables):
+        """ SQLite plan lines that read a whole table: 'SCAN <table>' without an index. """
+        flagged = []
+        for line in plan:
+            words = line.split()
+            if len(words) < 2 or words[0] != 'SCAN' or 'USING' in words:
+                continue
+            table = words[1]
+            if table in allowed_tables or table.startswith('('): # '(subquery-n)' / constant rows
+                continue
+            flagged.append(line)
+        return flagged
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                f"Full-scan detection only understands SQLite plans; printing raw plans for '{connection.vendor}'."
+            ))
+
+        problems = 0
+        for label, queryset, allowed_tables in self.get_queries():
+            plan = self.explain(queryset)
+            flagged = self.full_scans(plan, allowed_tables) if connection.vendor == 'sqlite' else []
+            if flagged:
+                problems += 1
+                self.stdout.write(self.style.ERROR(f"FULL SCAN  {label}"))
+                for line in flagged:
+                    self.stdout.write(f"    {line}")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok         {label}"))
+            if options['verbose_plans'] or (flagged and connection.vendor == 'sqlite'):
+                for line in plan:
+                    self.stdout.write(f"      | {line}")
+
+        if problems:
+            raise CommandError(f"{problems} query plan(s) use full table scans. Check the indexes in bookings/dashboard/inventory models.")
+        self.stdout.write(self.style.SUCCESS("All query plans use indexes."))
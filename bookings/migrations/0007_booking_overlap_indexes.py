@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_event_project_manager_rental_project_manager'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', 'start_date', 'end_date'], name='event_status_dates_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', 'end_date'], name='event_status_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventitem',
+            index=models.Index(fields=['item', 'booking', 'quantity'], name='eventitem_item_booking_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['status', 'start_date', 'end_date'], name='rental_status_dates_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['status', 'end_date'], name='rental_status_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rentalitem',
+            index=models.Index(fields=['item', 'booking', 'quantity'], name='rentalitem_item_booking_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_booking_overlap_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventitem',
+            name='picked_quantity',
+            field=models.PositiveIntegerField(default=0, help_text='Units scanned out at dispatch.'),
+        ),
+        migrations.AddField(
+            model_name='eventitem',
+            name='returned_quantity',
+            field=models.PositiveIntegerField(default=0, help_text='Units scanned back in on return.'),
+        ),
+        migrations.AddField(
+            model_name='rentalitem',
+            name='picked_quantity',
+            field=models.PositiveIntegerField(default=0, help_text='Units scanned out at dispatch.'),
+        ),
+        migrations.AddField(
+            model_name='rentalitem',
+            name='returned_quantity',
+            field=models.PositiveIntegerField(default=0, help_text='Units scanned back in on return.'),
+        ),
+    ]
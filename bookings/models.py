@@ -72,6 +72,16 @@ class BaseBooking(models.Model):
     class Meta:
         abstract = True 
         ordering = ['start_date', 'created_at'] 
+        indexes = [
+            # Availability / overlap lookups: status IN (...) AND start_date <= x AND end_date >= y
+            models.Index(fields=['status', 'start_date', 'end_date'], name='%(class)s_status_dates_idx'),
+            # Dashboard and status-update filters: status = x AND end_date < / between y
+            models.Index(fields=['status', 'end_date'], name='%(class)s_status_end_idx'),
+            # Keyset-paginated lists (newest first), unfiltered or filtered by client / project manager
+            models.Index(fields=['start_date'], name='%(class)s_start_idx'),
+            models.Index(fields=['client', 'start_date'], name='%(class)s_client_start_idx'),
+            models.Index(fields=['project_manager', 'start_date'], name='%(class)s_manager_start_idx'),
+        ]
 
     def clean(self):
         super().clean() 
@@ -252,8 +262,24 @@ class BookingItemBase(models.Model):
         return f"{self.quantity} x {item_name}"
 
 
+# --- Booking lines that are picked and returned (events and rentals; not quote lines) ---
+class ScannedItemBase(BookingItemBase):
+    """Adds the running counts of the scan station (bookings.scanning); never above quantity."""
+    picked_quantity = models.PositiveIntegerField(
+        default=0,
+        help_text="Units scanned out at dispatch."
+    )
+    returned_quantity = models.PositiveIntegerField(
+        default=0,
+        help_text="Units scanned back in on return."
+    )
+
+    class Meta:
+        abstract = True
+
+
 # --- Linking Table for Event Items ---
-class EventItem(BookingItemBase):
+class EventItem(ScannedItemBase):
     """Links an Item with quantity to a specific Event."""
     booking = models.ForeignKey(
         Event,
@@ -264,12 +290,16 @@ class EventItem(BookingItemBase):
 
     class Meta:
         unique_together = [['booking', 'item']]
+        indexes = [
+            # Per-item lookups (availability, occupancy refresh) resolve booking_id and quantity from the index alone
+            models.Index(fields=['item', 'booking', 'quantity'], name='eventitem_item_booking_idx'),
+        ]
         verbose_name = "Event Item"
         verbose_name_plural = "Event Items"
 
 
 # --- Linking Table for Rental Items ---
-class RentalItem(BookingItemBase):
+class RentalItem(ScannedItemBase):
     """Links an Item with quantity to a specific Rental."""
     booking = models.ForeignKey(
         Rental,
@@ -280,5 +310,9 @@ class RentalItem(BookingItemBase):
 
     class Meta:
         unique_together = [['booking', 'item']]
+        indexes = [
+            # Per-item lookups (availability, occupancy refresh) resolve booking_id and quantity from the index alone
+            models.Index(fields=['item', 'booking', 'quantity'], name='rentalitem_item_booking_idx'),
+        ]
         verbose_name = "Rental Item"
         verbose_name_plural = "Rental Items"
\ No newline at end of file
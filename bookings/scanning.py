@@ -0,0 +1,88 @@
+# clavis_event_inventory/bookings/scanning.py
+
+"""
+Scan-driven dispatch and return check-in of booking items.
+
+A scanned SKU is resolved through the in-process SKU map (inventory.sku_lookup), then counted against
+the booking's line for that item (one line per item and booking) with a single conditional UPDATE,
+so concurrent scans from several stations can neither lose a count nor overshoot. The counts always
+satisfy returned_quantity <= picked_quantity <= quantity: a dispatch scan needs a unit not yet picked,
+a return scan a picked unit not yet returned, and undoing a dispatch a picked unit not yet returned.
+"""
+
+from django.db.models import F, Sum
+
+from inventory.sku_lookup import lookup_sku
+from .models import Event, EventItem, Rental, RentalItem
+
+# mode: line field it counts, the result reported for a counted scan, the count a scan may not exceed,
+# and the count an undo may not go below
+SCAN_MODES = {
+    'dispatch': {'field': 'picked_quantity', 'result': 'picked', 'limit': 'quantity', 'floor': 'returned_quantity'},
+    'return': {'field': 'returned_quantity', 'result': 'returned', 'limit': 'picked_quantity', 'floor': None},
+}
+BOOKING_MODELS = {'event': (Event, EventItem), 'rental': (Rental, RentalItem)}
+LINE_FIELDS = ('pk', 'item_id', 'item__sku', 'item__name', 'quantity', 'picked_quantity', 'returned_quantity')
+
+
+def _line_dict(values):
+    return {
+        'id': values['pk'], 'item_id': values['item_id'], 'sku': values['item__sku'], 'name': values['item__name'],
+        'quantity': values['quantity'], 'picked': values['picked_quantity'], 'returned': values['returned_quantity'],
+    }
+
+
+def booking_totals(line_model, booking_id):
+    totals = line_model.objects.filter(booking_id=booking_id).aggregate(
+        quantity=Sum('quantity'), picked=Sum('picked_quantity'), returned=Sum('returned_quantity'),
+    )
+    return {key: value or 0 for key, value in totals.items()}
+
+
+def scan_state(booking_type, booking_id):
+    """ {'lines': [...], 'totals': {...}} of a booking, as shown by the scan station. """
+    line_model = BOOKING_MODELS[booking_type][1]
+    lines = line_model.objects.filter(booking_id=booking_id).order_by('item__name', 'pk').values(*LINE_FIELDS)
+    return {'lines': [_line_dict(line) for line in lines], 'totals': booking_totals(line_model, booking_id)}
+
+
+def record_scan(booking, booking_type, mode, sku, undo=False):
+    """
+    Counts (or with undo=True, uncounts) one unit of the scanned SKU on the booking. Returns a dict with
+    'ok', 'result' (picked / returned / undone, or unknown_sku / not_on_booking / complete /
+    nothing_to_undo / booking_cancelled), 'message', 'item', 'line' and 'totals'.
+    """
+    line_model = BOOKING_MODELS[booking_type][1]
+    spec = SCAN_MODES[mode]
+    field = spec['field']
+    response = {'ok': False, 'sku': sku, 'mode': mode, 'item': None, 'line': None, 'totals': None}
+
+    if booking.status == booking.StatusChoices.CANCELLED:
+        return {**response, 'result': 'booking_cancelled', 'message': f"{booking.reference_number} is cancelled."}
+    item = lookup_sku(sku)
+    if item is None:
+        return {**response, 'result': 'unknown_sku', 'message': f"No item has the SKU '{sku}'."}
+    response['item'] = item
+
+    lines = line_model.objects.filter(booking_id=booking.pk, item_id=item['id'])
+    if undo:
+        floor = F(spec['floor']) if spec['floor'] else 0
+        updated = lines.filter(**{f"{field}__gt": floor}).update(**{field: F(field) - 1})
+    else:
+        updated = lines.filter(**{f"{field}__lt": F(spec['limit'])}).update(**{field: F(field) + 1})
+
+    line = lines.values(*LINE_FIELDS).first()
+    if line is None:
+        return {**response, 'result': 'not_on_booking', 'message': f"{item['name']} is not booked on {booking.reference_number}."}
+    response.update(line=_line_dict(line), totals=booking_totals(line_model, booking.pk))
+    if updated:
+        result = 'undone' if undo else spec['result']
+        count = line[field]
+        return {**response, 'ok': True, 'result': result, 'message': f"{item['name']}: {count} of {line['quantity']} {spec['result']}."}
+    if undo:
+        if spec['floor'] and line[field]:
+            return {**response, 'result': 'nothing_to_undo', 'message': f"All {line[field]} {item['name']} picked have been returned; undo a return first."}
+        return {**response, 'result': 'nothing_to_undo', 'message': f"No {item['name']} has been {spec['result']} yet."}
+    if mode == 'return' and line['picked_quantity'] < line['quantity']:
+        return {**response, 'result': 'complete', 'message': f"All {line['picked_quantity']} {item['name']} picked are already returned."}
+    return {**response, 'result': 'complete', 'message': f"All {line['quantity']} {item['name']} are already {spec['result']}."}
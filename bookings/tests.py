@@ -1,3 +1,265 @@
-from django.test import TestCase
+import datetime
+import io
+import os
+import tempfile
+from unittest import skipIf
 
-# Create your tests here.
+from django.contrib.auth.models import User
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from clients.models import Client
+from dashboard.models import Notification
+from inventory.availability import check_availability_bulk
+from inventory.models import Item
+from inventory.sku_lookup import invalidate_sku_map
+from .batch_documents import PdfWriter, dispatch_documents, render_documents, render_documents_parallel
+from .forms import EventItemInlineFormSet, validate_item_formset_availability
+from .models import Event, EventItem, Rental, RentalItem
+from .scanning import record_scan
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class RecordScanTests(TestCase):
+    """ The scan counts stay within returned_quantity <= picked_quantity <= quantity. """
+
+    def setUp(self):
+        start = timezone.now()
+        client = Client.objects.create(name="Scan Client")
+        self.item = Item.objects.create(name="Folding Chair", rent_price_per_day=1, initial_quantity=10)
+        self.event = Event.objects.create(
+            client=client, event_name="Scan Event", event_location="Hall",
+            start_date=start, end_date=start + datetime.timedelta(days=1),
+        )
+        self.line = EventItem.objects.create(booking=self.event, item=self.item, quantity=5)
+        invalidate_sku_map() # Item saves invalidate on commit, which TestCase never reaches
+
+    def scan(self, mode, times=1, undo=False):
+        return [record_scan(self.event, 'event', mode, self.item.sku, undo=undo) for _ in range(times)]
+
+    def counts(self):
+        self.line.refresh_from_db()
+        return self.line.picked_quantity, self.line.returned_quantity
+
+    def test_dispatch_stops_at_booked_quantity(self):
+        results = self.scan('dispatch', times=6)
+        self.assertEqual([r['result'] for r in results], ['picked'] * 5 + ['complete'])
+        self.assertEqual(self.counts(), (5, 0))
+
+    def test_returns_stop_at_picked_quantity(self):
+        self.scan('dispatch', times=2)
+        results = self.scan('return', times=5)
+        self.assertEqual([r['result'] for r in results], ['returned'] * 2 + ['complete'] * 3)
+        self.assertFalse(results[-1]['ok'])
+        self.assertEqual(self.counts(), (2, 2))
+
+    def test_return_without_dispatch_is_refused(self):
+        result = self.scan('return')[0]
+        self.assertEqual(result['result'], 'complete')
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_dispatch_undo_stops_at_returned_quantity(self):
+        self.scan('dispatch', times=3)
+        self.scan('return', times=2)
+        results = self.scan('dispatch', times=3, undo=True)
+        self.assertEqual([r['result'] for r in results], ['undone', 'nothing_to_undo', 'nothing_to_undo'])
+        self.assertEqual(self.counts(), (2, 2))
+
+    def test_return_undo_frees_dispatch_undo(self):
+        self.scan('dispatch', times=2)
+        self.scan('return', times=2)
+        self.scan('return', undo=True)
+        self.assertEqual(self.scan('dispatch', undo=True)[0]['result'], 'undone')
+        self.assertEqual(self.counts(), (1, 1))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class FormsetAvailabilityTests(TestCase):
+    """ validate_item_formset_availability / check_availability_bulk on a booking's item rows. """
+
+    def setUp(self):
+        self.start = timezone.now() + datetime.timedelta(days=30)
+        self.end = self.start + datetime.timedelta(days=2)
+        self.client_record = Client.objects.create(name="Formset Client")
+        self.chairs = Item.objects.create(name="Chair", rent_price_per_day=1, initial_quantity=10)
+        self.tables = Item.objects.create(name="Table", rent_price_per_day=1, initial_quantity=4)
+        self.other = self.book({self.chairs: 6})
+
+    def book(self, quantities):
+        event = Event.objects.create(
+            client=self.client_record, event_name="Booked", event_location="Hall", start_date=self.start, end_date=self.end,
+        )
+        for item, quantity in quantities.items():
+            EventItem.objects.create(booking=event, item=item, quantity=quantity)
+        return event
+
+    def formset(self, rows, instance=None):
+        lines = list(instance.items.order_by('pk')) if instance else []
+        data = {
+            'items-TOTAL_FORMS': str(len(rows)), 'items-INITIAL_FORMS': str(len(lines)),
+            'items-MIN_NUM_FORMS': '0', 'items-MAX_NUM_FORMS': '1000',
+        }
+        for index, (item, quantity) in enumerate(rows):
+            data[f'items-{index}-item'] = item.pk
+            data[f'items-{index}-quantity'] = quantity
+            if index < len(lines):
+                data[f'items-{index}-id'] = lines[index].pk
+        formset = EventItemInlineFormSet(data, instance=instance, prefix='items')
+        self.assertTrue(formset.is_valid(), formset.errors)
+        return formset
+
+    def test_shortage_is_attached_to_the_row(self):
+        formset = self.formset([(self.chairs, 5), (self.tables, 4)])
+        ok, errors = validate_item_formset_availability(formset, self.start, self.end)
+        self.assertFalse(ok)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("only 4 free", formset.forms[0].errors['item'][0])
+        self.assertIn(self.other.reference_number, errors[0])
+        self.assertFalse(formset.forms[1].errors)
+
+    def test_edited_booking_does_not_count_against_itself(self):
+        edited = self.book({self.chairs: 3})
+        formset = self.formset([(self.chairs, 4)], instance=edited)
+        self.assertFalse(validate_item_formset_availability(formset, self.start, self.end)[0])
+        formset = self.formset([(self.chairs, 4)], instance=edited)
+        self.assertEqual(validate_item_formset_availability(formset, self.start, self.end, exclude_event_pk=edited.pk), (True, []))
+
+    def test_rows_for_the_same_item_use_their_combined_quantity(self):
+        # The inline formset refuses duplicate items, so this is check_availability_bulk's own guarantee
+        results = check_availability_bulk([(self.chairs, 3), (self.chairs, 2), (self.tables, 1)], self.start, self.end)
+        self.assertEqual([r['available'] for r in results], [4, 4, 4])
+        self.assertEqual([r['shortfall'] for r in results], [1, 1, 0])
+        self.assertEqual([r['is_available'] for r in results], [False, False, True])
+        self.assertTrue(all(r['is_available'] for r in check_availability_bulk([(self.chairs, 2), (self.chairs, 2)], self.start, self.end)))
+
+    def test_duplicate_item_rows_are_rejected_by_the_formset(self):
+        formset = EventItemInlineFormSet({
+            'items-TOTAL_FORMS': '2', 'items-INITIAL_FORMS': '0', 'items-MIN_NUM_FORMS': '0', 'items-MAX_NUM_FORMS': '1000',
+            'items-0-item': self.chairs.pk, 'items-0-quantity': 2, 'items-1-item': self.chairs.pk, 'items-1-quantity': 2,
+        }, prefix='items')
+        self.assertFalse(formset.is_valid())
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class BookingReminderTests(TestCase):
+    """ update_booking_statuses sends each reminder once per booking and day, however often it runs. """
+
+    def setUp(self):
+        now = timezone.now()
+        # The command's notion of tomorrow; noon local time lies inside its day range
+        tomorrow = timezone.make_aware(datetime.datetime.combine((now + datetime.timedelta(days=1)).date(), datetime.time(12)))
+        yesterday = now - datetime.timedelta(days=1)
+        client = Client.objects.create(name="Reminder Client")
+        event = lambda **kwargs: Event.objects.create(client=client, event_name="Reminder", event_location="Hall", **kwargs)
+        event(start_date=tomorrow, end_date=tomorrow + datetime.timedelta(days=1), status='PLANNED')
+        event(start_date=yesterday, end_date=tomorrow, status='ACTIVE')
+        Rental.objects.create(client=client, start_date=tomorrow, end_date=tomorrow + datetime.timedelta(days=3), status='BOOKED')
+        Rental.objects.create(client=client, start_date=yesterday, end_date=tomorrow, status='OUT')
+
+    def run_command(self):
+        output = io.StringIO()
+        call_command('update_booking_statuses', stdout=output)
+        return output.getvalue()
+
+    def test_second_run_on_the_same_day_sends_nothing_new(self):
+        self.run_command()
+        reminders = list(Notification.objects.order_by('kind').values_list('kind', 'dedup_key'))
+        self.assertEqual([kind for kind, _ in reminders], sorted([
+            Notification.KindChoices.EVENT_UPCOMING, Notification.KindChoices.EVENT_ENDING,
+            Notification.KindChoices.RENTAL_UPCOMING, Notification.KindChoices.RENTAL_RETURN_DUE,
+        ]))
+        self.assertTrue(all(key for _, key in reminders))
+
+        output = self.run_command()
+        self.assertEqual(list(Notification.objects.order_by('kind').values_list('kind', 'dedup_key')), reminders)
+        self.assertIn("Skipped 4 reminder(s) already sent today.", output)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CachedDocumentTests(TestCase):
+    """ Booking PDFs are revalidated by ETag, which follows the booking's item lines. """
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_dir = cache_dir.name
+        overrides = override_settings(DOCUMENT_CACHE_DIR=self.cache_dir)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        start = timezone.now() + datetime.timedelta(days=7)
+        self.item = Item.objects.create(name="Stage Deck", rent_price_per_day=1, initial_quantity=20)
+        self.event = Event.objects.create(
+            client=Client.objects.create(name="Document Client"), event_name="Launch", event_location="Hall",
+            start_date=start, end_date=start + datetime.timedelta(days=1),
+        )
+        self.line = EventItem.objects.create(booking=self.event, item=self.item, quantity=4)
+        self.url = reverse('bookings:delivery_note_pdf_event', kwargs={'booking_id': self.event.pk})
+        self.client.force_login(User.objects.create_user('documents'))
+
+    def get(self, **headers):
+        response = self.client.get(self.url, **headers)
+        if response.streaming:
+            b''.join(response.streaming_content) # Closes the cached file
+        return response
+
+    def test_repeat_request_is_not_modified(self):
+        first = self.get()
+        self.assertEqual((first.status_code, first['X-Document-Cache']), (200, 'miss'))
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        again = self.get()
+        self.assertEqual((again['X-Document-Cache'], again['ETag']), ('hit', first['ETag']))
+
+    def test_editing_a_line_changes_the_etag(self):
+        etag = self.get()['ETag']
+        self.line.quantity = 6
+        self.line.save()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response['X-Document-Cache']), (200, 'miss'))
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(os.listdir(os.path.join(self.cache_dir, 'delivery-note'))), 1) # The old version is removed
+
+        self.item.name = "Stage Deck 2x1m"
+        self.item.save()
+        self.assertNotEqual(self.get(HTTP_IF_NONE_MATCH=response['ETag'])['ETag'], response['ETag'])
+
+
+@skipIf(PdfWriter is None, "pypdf is not installed")
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class BatchDocumentTests(TestCase):
+    """ The parallel renderer produces the same pages as the serial one. """
+
+    def setUp(self):
+        client = Client.objects.create(name="Dispatch Client")
+        items = [Item.objects.create(name=f"Item {index}", rent_price_per_day=1, initial_quantity=50) for index in range(3)]
+        self.day = timezone.localdate()
+        start = timezone.make_aware(datetime.datetime.combine(self.day, datetime.time(9)))
+        for index in range(3):
+            event = Event.objects.create(
+                client=client, event_name=f"Event {index}", event_location="Hall",
+                start_date=start + datetime.timedelta(hours=index), end_date=start + datetime.timedelta(days=1),
+            )
+            for item in items:
+                EventItem.objects.create(booking=event, item=item, quantity=index + 1)
+        Event.objects.create(
+            client=client, event_name="Logistics", event_location="Port", is_logistics_only_service=True,
+            start_date=start, end_date=start + datetime.timedelta(days=1),
+        )
+        rental = Rental.objects.create(client=client, start_date=start, end_date=start + datetime.timedelta(days=2))
+        RentalItem.objects.create(booking=rental, item=items[0], quantity=4)
+
+    def page_texts(self, pdf):
+        from pypdf import PdfReader
+        return [page.extract_text() for page in PdfReader(io.BytesIO(pdf)).pages]
+
+    def test_parallel_matches_serial(self):
+        documents = dispatch_documents(self.day)
+        self.assertEqual(len(documents), 5)
+        serial = self.page_texts(render_documents(documents))
+        parallel = self.page_texts(render_documents_parallel(documents, workers=2))
+        self.assertGreaterEqual(len(serial), len(documents))
+        self.assertEqual(len(parallel), len(serial))
+        self.assertEqual(parallel, serial)
@@ -15,10 +15,17 @@ urlpatterns = [
     path('events/<int:booking_id>/delivery-note/', views.delivery_note_pdf_view, {'booking_type': 'event'}, name='delivery_note_pdf_event'),
     path('events/<int:booking_id>/receipt/', views.receipt_pdf_view, {'booking_type': 'event'}, name='receipt_pdf_event'),
     
+    path('events/<int:booking_id>/scan/', views.scan_station_view, {'booking_type': 'event'}, name='scan_station_event'),
+    path('events/<int:booking_id>/scan/state/', views.scan_state_view, {'booking_type': 'event'}, name='scan_state_event'),
+    path('events/<int:booking_id>/scan/record/', views.scan_record_view, {'booking_type': 'event'}, name='scan_record_event'),
+    
     # NEW: URL for Logistics Waybill PDF
     path('events/<int:event_id>/waybill/', views.logistics_waybill_pdf_view, name='logistics_waybill_pdf'),
 
 
+    # Delivery notes / waybills of a day in one PDF (?date=&end_date=&kind=)
+    path('dispatch-documents/', views.dispatch_documents_pdf_view, name='dispatch_documents_pdf'),
+
     # --- Rental URLs ---
     path('rentals/', views.rental_list_view, name='rental_list'),
     path('rentals/add/', views.rental_add_view, name='rental_add'),
@@ -27,5 +34,8 @@ urlpatterns = [
     path('rentals/<int:rental_id>/delete/', views.rental_delete_view, name='rental_delete'), 
     path('rentals/<int:booking_id>/delivery-note/', views.delivery_note_pdf_view, {'booking_type': 'rental'}, name='delivery_note_pdf_rental'),
     path('rentals/<int:booking_id>/receipt/', views.receipt_pdf_view, {'booking_type': 'rental'}, name='receipt_pdf_rental'),
+    path('rentals/<int:booking_id>/scan/', views.scan_station_view, {'booking_type': 'rental'}, name='scan_station_rental'),
+    path('rentals/<int:booking_id>/scan/state/', views.scan_state_view, {'booking_type': 'rental'}, name='scan_state_rental'),
+    path('rentals/<int:booking_id>/scan/record/', views.scan_record_view, {'booking_type': 'rental'}, name='scan_record_rental'),
 
 ]
\ No newline at end of file
@@ -1,10 +1,13 @@
 # clavis_event_inventory/bookings/views.py
 
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib import messages
+from django.utils import timezone
 from django.db import transaction
 from django.db.models import ProtectedError
-from django.http import Http404, HttpResponseForbidden
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse
+from django.views.decorators.http import require_POST
 
 # Models
 from .models import Event, Rental, EventItem, RentalItem
@@ -12,23 +15,42 @@ from inventory.models import Item
 from clients.models import Client
 
 # Forms
-from .forms import EventForm, EventItemInlineFormSet, RentalForm, RentalItemInlineFormSet
+from .forms import EventForm, EventItemInlineFormSet, RentalForm, RentalItemInlineFormSet, validate_item_formset_availability
 
 # Utils (for PDF generation)
-from .utils import generate_delivery_note_pdf, generate_receipt_pdf
+from .utils import generate_delivery_note_pdf, generate_receipt_pdf, booking_document_state
+from reports.document_cache import serve_cached_document
+from reports.keyset_pagination import apply_list_filters, filter_choices, keyset_page
+from .scanning import BOOKING_MODELS, SCAN_MODES, record_scan, scan_state
+from .batch_documents import (
+    DOCUMENT_KINDS, batch_filename, dispatch_documents, get_batch_document_workers, parse_date_range, render_documents_parallel,
+)
 # We will add generate_logistics_waybill_pdf later in utils.py
 # from .utils import generate_logistics_waybill_pdf
 
 
 # --- List Views ---
+BOOKING_LIST_ORDERING = ('-start_date', '-pk') # Newest first; keyset-paginated on the start_date indexes
+
+def _booking_list_context(request, model):
+    """ One keyset page of the filtered bookings (status, client, project manager, start date range). """
+    bookings, selected = apply_list_filters(
+        model.objects.select_related('client'), request.GET, 'start_date', model.StatusChoices.choices,
+    )
+    page = keyset_page(bookings, BOOKING_LIST_ORDERING, request.GET)
+    return {
+        'page': page, 'selected': selected, 'filtered': any(selected.values()),
+        'status_choices': model.StatusChoices.choices, **filter_choices(selected),
+    }
+
 def event_list_view(request):
-    events = Event.objects.all().select_related('client').order_by('-start_date')
-    context = { 'events': events, 'page_title': 'Event & Logistics Bookings' } # Updated title
+    context = _booking_list_context(request, Event)
+    context.update({ 'events': context['page']['object_list'], 'page_title': 'Event & Logistics Bookings' }) # Updated title
     return render(request, 'bookings/event_list.html', context)
 
 def rental_list_view(request):
-    rentals = Rental.objects.all().select_related('client').order_by('-start_date')
-    context = { 'rentals': rentals, 'page_title': 'Rental Bookings' }
+    context = _booking_list_context(request, Rental)
+    context.update({ 'rentals': context['page']['object_list'], 'page_title': 'Rental Bookings' })
     return render(request, 'bookings/rental_list.html', context)
 
 
@@ -69,27 +91,8 @@ def event_add_view(request):
                 if item_formset.is_valid():
                     start_date = event_form.cleaned_data.get('start_date')
                     end_date = event_form.cleaned_data.get('end_date')
-                    all_items_available = True
-                    
-                    # Check item availability only if there are forms with data and not marked for deletion
-                    has_items_to_book = any(form.has_changed() and not form.cleaned_data.get('DELETE', False) for form in item_formset)
-
-                    if has_items_to_book:
-                        for form in item_formset:
-                            if form.cleaned_data and not form.cleaned_data.get('DELETE', False):
-                                item = form.cleaned_data.get('item')
-                                quantity = form.cleaned_data.get('quantity')
-                                if item and quantity and start_date and end_date:
-                                    # Using initial_quantity for now as per inventory/models.py
-                                    if not item.is_available(quantity, start_date, end_date):
-                                        all_items_available = False
-                                        # Accessing available_quantity property from Item model
-                                        error_msg = f"Not enough '{item.name}' available ({item.available_quantity} currently free) for the selected dates [{start_date.strftime('%Y-%m-%d')} - {end_date.strftime('%Y-%m-%d')}]."
-                                        form.add_error('item', error_msg)
-                                elif form.has_changed() and not (item and quantity):
-                                    form.add_error(None, "Please select an item and quantity, or leave the row empty/delete if not needed.")
-                                    all_items_available = False
-                    
+                    all_items_available, availability_errors = validate_item_formset_availability(item_formset, start_date, end_date)
+
                     if all_items_available:
                         try:
                             # event_instance.status = Event.StatusChoices.PLANNED # Handled by form
@@ -155,28 +158,8 @@ def event_edit_view(request, event_id):
                 if item_formset.is_valid():
                     start_date = event_form.cleaned_data.get('start_date')
                     end_date = event_form.cleaned_data.get('end_date')
-                    all_items_available = True
-                    availability_errors = []
-
-                    has_items_to_book = any(form.has_changed() and not form.cleaned_data.get('DELETE', False) for form in item_formset)
-
-                    if has_items_to_book:
-                        for form in item_formset:
-                            if form.cleaned_data and not form.cleaned_data.get('DELETE', False):
-                                item = form.cleaned_data.get('item')
-                                quantity = form.cleaned_data.get('quantity')
-                                if item and quantity and start_date and end_date:
-                                    # Using initial_quantity for now as per inventory/models.py
-                                    if not item.is_available(quantity, start_date, end_date, exclude_event_pk=event.pk):
-                                        all_items_available = False
-                                        # Accessing available_quantity property from Item model
-                                        error_msg = f"Not enough '{item.name}' available ({item.available_quantity} currently free) for the period [{start_date.strftime('%Y-%m-%d')} - {end_date.strftime('%Y-%m-%d')}], considering other bookings."
-                                        form.add_error('item', error_msg)
-                                        availability_errors.append(error_msg)
-                                elif form.has_changed() and not (item and quantity) and not form.cleaned_data.get('DELETE', False):
-                                    form.add_error(None, "Both item and quantity are required if using this row and not deleting.")
-                                    all_items_available = False
-                    
+                    all_items_available, availability_errors = validate_item_formset_availability(item_formset, start_date, end_date, exclude_event_pk=event.pk)
+
                     if all_items_available:
                         try:
                             event_instance.save() 
@@ -217,26 +200,8 @@ def rental_add_view(request):
         if rental_form.is_valid() and item_formset.is_valid():
             start_date = rental_form.cleaned_data.get('start_date')
             end_date = rental_form.cleaned_data.get('end_date')
-            all_items_available = True
-            
-            has_items_to_book = any(form.has_changed() and not form.cleaned_data.get('DELETE', False) for form in item_formset)
-            if has_items_to_book:
-                for form in item_formset:
-                    if form.cleaned_data and not form.cleaned_data.get('DELETE', False):
-                        item = form.cleaned_data.get('item')
-                        quantity = form.cleaned_data.get('quantity')
-                        if item and quantity and start_date and end_date:
-                            if not item.is_available(quantity, start_date, end_date):
-                                all_items_available = False
-                                error_msg = f"Not enough '{item.name}' available ({item.available_quantity} currently free) for the selected dates [{start_date.strftime('%Y-%m-%d')} - {end_date.strftime('%Y-%m-%d')}]."
-                                form.add_error('item', error_msg)
-                        elif not item and not quantity and form.has_changed(): # Empty touched row
-                            form.add_error(None, "Please select an item and quantity, or leave the row empty if not needed.")
-                            all_items_available = False
-                        elif not (item and quantity) and form.has_changed(): # Incomplete touched row
-                            form.add_error(None, "Both item and quantity are required if using this row.")
-                            all_items_available = False
-            
+            all_items_available, availability_errors = validate_item_formset_availability(item_formset, start_date, end_date)
+
             if all_items_available:
                 try:
                     rental = rental_form.save(commit=False)
@@ -282,28 +247,8 @@ def rental_edit_view(request, rental_id):
         if rental_form.is_valid() and item_formset.is_valid():
             start_date = rental_form.cleaned_data.get('start_date')
             end_date = rental_form.cleaned_data.get('end_date')
-            all_items_available = True
-            availability_errors = []
-
-            has_items_to_book = any(form.has_changed() and not form.cleaned_data.get('DELETE', False) for form in item_formset)
-            if has_items_to_book:
-                for form in item_formset:
-                    if form.cleaned_data and not form.cleaned_data.get('DELETE', False):
-                        item = form.cleaned_data.get('item')
-                        quantity = form.cleaned_data.get('quantity')
-                        if item and quantity and start_date and end_date:
-                            if not item.is_available(quantity, start_date, end_date, exclude_rental_pk=rental.pk):
-                                all_items_available = False
-                                error_msg = f"Not enough '{item.name}' available ({item.available_quantity} currently free) for the period [{start_date.strftime('%Y-%m-%d')} - {end_date.strftime('%Y-%m-%d')}], considering other bookings."
-                                form.add_error('item', error_msg)
-                                availability_errors.append(error_msg)
-                        elif not item and not quantity and form.has_changed():
-                            form.add_error(None, "Please select an item and quantity, or mark for deletion.")
-                            all_items_available = False
-                        elif not (item and quantity) and form.has_changed():
-                            form.add_error(None, "Both item and quantity are required if using this row.")
-                            all_items_available = False
-            
+            all_items_available, availability_errors = validate_item_formset_availability(item_formset, start_date, end_date, exclude_rental_pk=rental.pk)
+
             if all_items_available:
                 try:
                     rental_instance = rental_form.save(commit=False)
@@ -362,7 +307,10 @@ def delivery_note_pdf_view(request, booking_type, booking_id): # This view is no
             booking = get_object_or_404( Rental.objects.select_related('client').prefetch_related('items__item'), pk=booking_id )
         else: 
             raise Http404("Invalid booking type specified for Delivery Note.")
-        return generate_delivery_note_pdf(booking)
+        return serve_cached_document(
+            request, 'delivery-note', f"{booking_type}-{booking.pk}", booking_document_state(booking),
+            f"Delivery-Note-{booking.reference_number}.pdf", lambda: generate_delivery_note_pdf(booking),
+        )
     except Http404 as e: 
         messages.error(request, str(e))
         return redirect('dashboard:dashboard_main') 
@@ -386,7 +334,10 @@ def logistics_waybill_pdf_view(request, event_id):
     # We will create generate_logistics_waybill_pdf in utils.py in the next step
     from .utils import generate_logistics_waybill_pdf # Import it here
     try:
-        return generate_logistics_waybill_pdf(event)
+        return serve_cached_document(
+            request, 'waybill', f"event-{event.pk}", booking_document_state(event, include_items=False),
+            f"Waybill-{event.reference_number}.pdf", lambda: generate_logistics_waybill_pdf(event),
+        )
     except Exception as e:
         print(f"Error generating Logistics Waybill PDF: {e}")
         import traceback
@@ -395,6 +346,72 @@ def logistics_waybill_pdf_view(request, event_id):
         return redirect('bookings:event_detail', event_id=event_id)
 
 
+def dispatch_documents_pdf_view(request):
+    """
+    One PDF with the delivery notes and/or waybills of the bookings starting on ?date= (default today),
+    or from ?date= to ?end_date=. ?kind= is delivery-notes, waybills or all (default).
+    """
+    kind = request.GET.get('kind', 'all')
+    if kind not in DOCUMENT_KINDS:
+        return HttpResponseBadRequest(f"Unknown kind; use one of: {', '.join(DOCUMENT_KINDS)}.", content_type='text/plain')
+    try:
+        start_date, end_date = parse_date_range(request.GET.get('date') or timezone.localdate().isoformat(), request.GET.get('end_date'))
+    except ValueError as e:
+        return HttpResponseBadRequest(f"Invalid date: {e}", content_type='text/plain')
+
+    documents = dispatch_documents(start_date, end_date, kind)
+    if not documents:
+        messages.info(request, f"No bookings to dispatch between {start_date:%d %b %Y} and {end_date:%d %b %Y}.")
+        return redirect('bookings:event_list')
+    try:
+        pdf = render_documents_parallel(documents, get_batch_document_workers())
+    except Exception as e:
+        print(f"Error generating dispatch documents PDF: {e}")
+        import traceback
+        traceback.print_exc()
+        messages.error(request, "An error occurred generating the dispatch documents PDF. Please check server logs.")
+        return redirect('bookings:event_list')
+
+    response = HttpResponse(pdf, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{batch_filename(start_date, end_date, kind)}"'
+    return response
+
+
+# --- Scan Station (dispatch / return check-in) ---
+def _scan_booking(booking_type, booking_id):
+    if booking_type not in BOOKING_MODELS:
+        raise Http404("Invalid booking type.")
+    return get_object_or_404(BOOKING_MODELS[booking_type][0].objects.select_related('client'), pk=booking_id)
+
+def scan_station_view(request, booking_type, booking_id):
+    booking = _scan_booking(booking_type, booking_id)
+    context = {
+        'booking': booking,
+        'booking_type': booking_type,
+        'scan_state': scan_state(booking_type, booking.pk),
+        'scan_modes': list(SCAN_MODES),
+        'record_url': reverse(f'bookings:scan_record_{booking_type}', args=[booking.pk]),
+        'state_url': reverse(f'bookings:scan_state_{booking_type}', args=[booking.pk]),
+        'page_title': f'Scan Station: {booking.reference_number}',
+    }
+    return render(request, 'bookings/scan_station.html', context)
+
+def scan_state_view(request, booking_type, booking_id):
+    """ JSON lines and totals of a booking; polled by the scan stations to show each other's scans. """
+    booking = _scan_booking(booking_type, booking_id)
+    return JsonResponse(scan_state(booking_type, booking.pk))
+
+@require_POST
+def scan_record_view(request, booking_type, booking_id):
+    """ Records one scan (POST mode=dispatch|return, sku=, undo=1 to take one back) and returns the result as JSON. """
+    booking = _scan_booking(booking_type, booking_id)
+    mode = request.POST.get('mode')
+    sku = request.POST.get('sku', '').strip()
+    if mode not in SCAN_MODES or not sku:
+        return JsonResponse({'ok': False, 'result': 'invalid', 'message': f"Send a SKU and a mode ({' or '.join(SCAN_MODES)})."}, status=400)
+    return JsonResponse(record_scan(booking, booking_type, mode, sku, undo=request.POST.get('undo') == '1'))
+
+
 def receipt_pdf_view(request, booking_type, booking_id):
     booking = None
     try:
@@ -404,7 +421,10 @@ def receipt_pdf_view(request, booking_type, booking_id):
             booking = get_object_or_404( Rental.objects.select_related('client').prefetch_related('items__item'), pk=booking_id )
         else: 
             raise Http404("Invalid booking type specified for Receipt.")
-        return generate_receipt_pdf(booking) 
+        return serve_cached_document(
+            request, 'receipt', f"{booking_type}-{booking.pk}", booking_document_state(booking),
+            f"Receipt-{booking.reference_number}.pdf", lambda: generate_receipt_pdf(booking),
+        )
     except Http404 as e: 
         messages.error(request, str(e))
         return redirect('dashboard:dashboard_main')
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:02
+
+import django.db.models.deletion
+import reports.full_text_search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_alter_client_email_alter_client_phone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientSearchEntry',
+            fields=[
+                ('client', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='clients.client')),
+                ('document', reports.full_text_search.FullTextField(db_column='clients_client_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'clients_client_fts',
+                'managed': False,
+            },
+        ),
+    ]
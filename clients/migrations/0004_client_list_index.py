@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:04
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0003_client_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('company_name', models.Value('')), models.F('name'), models.F('id'), name='client_list_sort_idx'),
+        ),
+    ]
@@ -1,6 +1,9 @@
 # clavis_event_inventory/clients/models.py
 
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from reports.full_text_search import FullTextField
 
 class Client(models.Model):
     """Represents a client (individual or company) who books events or rentals."""
@@ -48,3 +51,21 @@ class Client(models.Model):
 
     class Meta:
         ordering = ['company_name', 'name'] # Order clients primarily by company, then name
+        indexes = [
+            # Keyset-paginated client list: company (NULL as ''), name, id; see clients.views.CLIENT_SORT_COMPANY
+            models.Index(Coalesce('company_name', Value('')), 'name', 'id', name='client_list_sort_idx'),
+        ]
+
+
+class ClientSearchEntry(models.Model):
+    """
+    Row of the FTS5 index of the client search (clients.search), one per client. The table and the triggers
+    keeping it in sync are created after migrate, only on SQLite; hence not managed by migrations.
+    """
+    client = models.OneToOneField(Client, primary_key=True, db_column='rowid', on_delete=models.DO_NOTHING, related_name='search_entry')
+    document = FullTextField(db_column='clients_client_fts') # The hidden column MATCH runs against
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'clients_client_fts'
@@ -0,0 +1,38 @@
+# clavis_event_inventory/clients/search.py
+
+"""
+Full-text index of the client list search: names, contact person, email and phone.
+See reports.full_text_search; created after migrate by ClientsConfig.ready().
+"""
+
+from reports.full_text_search import ensure_search_index, search
+
+CLIENT_SEARCH_INDEX = {
+    'table': 'clients_client_fts',
+    'columns': {'name': 10, 'company_name': 10, 'contact_person': 5, 'email': 3, 'phone': 3},
+    'source': "SELECT c.id, c.name, c.company_name, c.contact_person, c.email, c.phone FROM clients_client c",
+    'triggers': {
+        'insert': {'on': "AFTER INSERT ON clients_client", 'insert': "c.id = new.id"},
+        'update': {
+            'on': (
+                "AFTER UPDATE OF name, company_name, contact_person, email, phone ON clients_client "
+                "WHEN old.name IS NOT new.name OR old.company_name IS NOT new.company_name "
+                "OR old.contact_person IS NOT new.contact_person OR old.email IS NOT new.email OR old.phone IS NOT new.phone"
+            ),
+            'delete': "old.id", 'insert': "c.id = new.id",
+        },
+        'delete': {'on': "AFTER DELETE ON clients_client", 'delete': "old.id"},
+    },
+    'relation': 'search_entry',
+    'ordering': ('company_name', 'name', 'pk'),
+    'fallback_fields': ('name', 'company_name', 'contact_person', 'email', 'phone'),
+}
+
+
+def search_clients(queryset, query):
+    return search(queryset, CLIENT_SEARCH_INDEX, query)
+
+
+def create_client_search_index(sender, using, verbosity=1, **kwargs):
+    """ post_migrate receiver. """
+    ensure_search_index(CLIENT_SEARCH_INDEX, using, verbosity)
@@ -9,6 +9,9 @@ urlpatterns = [
     # Client List (/clients/)
     path('', views.client_list_view, name='client_list'),
 
+    # Client Autocomplete for the list filter forms (/clients/autocomplete/?q=)
+    path('autocomplete/', views.client_autocomplete_view, name='client_autocomplete'),
+
     # Client Add (/clients/add/)
     path('add/', views.client_add_view, name='client_add'),
 
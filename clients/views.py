@@ -1,17 +1,40 @@
 # clavis_event_inventory/clients/views.py
 
 from django.shortcuts import render, get_object_or_404, redirect
+from django.http import JsonResponse
 from django.contrib import messages
-from django.db.models import ProtectedError # Import ProtectedError
+from django.db.models import ProtectedError, Value # Import ProtectedError
+from django.db.models.functions import Coalesce
 from .models import Client
 from .forms import ClientForm
+from .search import search_clients
+from reports.keyset_pagination import keyset_page
+
+# Keyset-paginated on client_list_sort_idx; NULL company names sort as ''
+CLIENT_SORT_COMPANY = Coalesce('company_name', Value(''))
+CLIENT_LIST_ORDERING = ('sort_company', 'name', 'pk')
+CLIENT_AUTOCOMPLETE_LIMIT = 10
 
 def client_list_view(request):
     # ... (list view as before) ...
-    clients = Client.objects.all().order_by('company_name', 'name')
-    context = { 'clients': clients, 'page_title': 'Clients' }
+    search_query = request.GET.get('q', '').strip()
+    clients = Client.objects.annotate(sort_company=CLIENT_SORT_COMPANY)
+    ordering = CLIENT_LIST_ORDERING
+    if search_query:
+        clients = search_clients(clients, search_query) # Best matches first (see clients.search)
+        ordering = ('search_rank', *ordering)
+    page = keyset_page(clients, ordering, request.GET)
+    context = { 'clients': page['object_list'], 'page': page, 'search_query': search_query, 'page_title': 'Clients' }
     return render(request, 'clients/client_list.html', context)
 
+def client_autocomplete_view(request):
+    """ JSON {'results': [{'id', 'label'}]}: the best CLIENT_AUTOCOMPLETE_LIMIT matches of q, for the list filter forms. """
+    search_query = request.GET.get('q', '').strip()
+    if not search_query:
+        return JsonResponse({'results': []})
+    clients = search_clients(Client.objects.only('pk', 'name', 'company_name'), search_query)[:CLIENT_AUTOCOMPLETE_LIMIT]
+    return JsonResponse({'results': [{'id': client.pk, 'label': str(client)} for client in clients]})
+
 def client_detail_view(request, client_id):
     # ... (detail view as before) ...
     client = get_object_or_404(Client, pk=client_id)
@@ -98,6 +98,18 @@ DATABASES = {
 }
 
 
+# Cache shared by every process on the host (web workers and cron commands such as update_booking_statuses).
+# The dashboard widgets (dashboard.widgets) and the scanning SKU map (inventory.sku_lookup) are invalidated by
+# bumping version numbers kept here; Django's default per-process LocMemCache would keep each bump private to
+# the process making it. Use Redis or Memcached instead when the workers run on several hosts.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/stable/ref/settings/#auth-password-validators
 
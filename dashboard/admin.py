@@ -4,8 +4,9 @@ from .models import Notification
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ('message_snippet', 'user', 'created_at', 'is_read', 'link')
-    list_filter = ('is_read', 'created_at', 'user')
+    list_display = ('message_snippet', 'kind', 'user', 'created_at', 'is_read', 'link')
+    list_filter = ('is_read', 'kind', 'created_at', 'user')
+    list_select_related = ('user',)
     search_fields = ('message', 'user__username')
     list_editable = ('is_read',)
 
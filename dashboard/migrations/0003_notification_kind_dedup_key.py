@@ -0,0 +1,112 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:25
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# Message prefixes written by update_booking_statuses, mapped to the new kinds
+REMINDER_PREFIXES = [
+    ('Upcoming Event Reminder', 'EVENT_UPCOMING', 'event'),
+    ('Event Nearing Completion', 'EVENT_ENDING', 'event'),
+    ('Upcoming Rental Reminder', 'RENTAL_UPCOMING', 'rental'),
+    ('Rental Nearing Return', 'RENTAL_RETURN_DUE', 'rental'),
+]
+REFERENCE_RE = re.compile(r"Ref: ([\w-]+)")
+
+
+def classify_and_collapse(apps, schema_editor):
+    """
+    Sets kind/event/rental on existing notifications from their message text, gives reminders a
+    dedup key per (kind, booking, local day of creation) and collapses the duplicates of each key
+    into the earliest row (kept as read if any copy was read).
+    """
+    Notification = apps.get_model('dashboard', 'Notification')
+    Event = apps.get_model('bookings', 'Event')
+    Rental = apps.get_model('bookings', 'Rental')
+    events = dict(Event.objects.values_list('reference_number', 'pk'))
+    rentals = dict(Rental.objects.values_list('reference_number', 'pk'))
+
+    kept_by_key = {}
+    duplicate_ids = []
+    for notification in Notification.objects.order_by('created_at', 'pk').iterator():
+        message = notification.message or ''
+        match = REFERENCE_RE.search(message)
+        reference = match.group(1) if match else None
+
+        kind, booking_type = 'GENERAL', None
+        for prefix, reminder_kind, reminder_booking_type in REMINDER_PREFIXES:
+            if message.startswith(prefix):
+                kind, booking_type = reminder_kind, reminder_booking_type
+                break
+        else:
+            if 'status changed to' in message and reference:
+                kind = 'STATUS_CHANGE'
+                booking_type = 'event' if message.startswith('Event') else 'rental'
+
+        event_id = events.get(reference) if booking_type == 'event' else None
+        rental_id = rentals.get(reference) if booking_type == 'rental' else None
+        booking_id = event_id or rental_id
+
+        dedup_key = None
+        if kind not in ('GENERAL', 'STATUS_CHANGE') and booking_id:
+            day = timezone.localtime(notification.created_at).date() if timezone.is_aware(notification.created_at) else notification.created_at.date()
+            dedup_key = f"{kind}:{booking_type}:{booking_id}:{day.isoformat()}"
+            if dedup_key in kept_by_key:
+                kept = kept_by_key[dedup_key]
+                if notification.is_read and not kept.is_read:
+                    kept.is_read = True
+                    kept.save(update_fields=['is_read'])
+                duplicate_ids.append(notification.pk)
+                continue
+
+        notification.kind = kind
+        notification.event_id = event_id
+        notification.rental_id = rental_id
+        notification.dedup_key = dedup_key
+        notification.save(update_fields=['kind', 'event', 'rental', 'dedup_key'])
+        if dedup_key:
+            kept_by_key[dedup_key] = notification
+
+    for index in range(0, len(duplicate_ids), 500):
+        Notification.objects.filter(pk__in=duplicate_ids[index:index + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_booking_overlap_indexes'),
+        ('dashboard', '0002_notification_user_read_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('GENERAL', 'General'), ('STATUS_CHANGE', 'Booking Status Change'), ('EVENT_UPCOMING', 'Upcoming Event Reminder'), ('EVENT_ENDING', 'Event Nearing Completion'), ('RENTAL_UPCOMING', 'Upcoming Rental Reminder'), ('RENTAL_RETURN_DUE', 'Rental Nearing Return')], default='GENERAL', help_text='What produced this notification.', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='event',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notifications', to='bookings.event'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='rental',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notifications', to='bookings.rental'),
+        ),
+        # Added without the unique constraint, filled and deduplicated, then made unique
+        migrations.AddField(
+            model_name='notification',
+            name='dedup_key',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.RunPython(classify_and_collapse, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='notification',
+            name='dedup_key',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True, unique=True),
+        ),
+    ]
@@ -36,14 +36,47 @@ class Notification(models.Model):
         help_text="Has this notification been read?"
     )
     
-    # Optional: Link to a relevant object (e.g., an Event or Rental booking)
-    # This requires generic foreign keys if you want to link to different model types,
-    # or separate ForeignKey fields for each type of related object.
-    # For simplicity now, we'll omit this, but it can be added.
-    # Example:
-    # content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, null=True, blank=True)
-    # object_id = models.PositiveIntegerField(null=True, blank=True)
-    # related_object = GenericForeignKey('content_type', 'object_id')
+    # What produced the notification; reminders are deduplicated per kind, booking and day
+    class KindChoices(models.TextChoices):
+        GENERAL = 'GENERAL', 'General'
+        STATUS_CHANGE = 'STATUS_CHANGE', 'Booking Status Change'
+        EVENT_UPCOMING = 'EVENT_UPCOMING', 'Upcoming Event Reminder'
+        EVENT_ENDING = 'EVENT_ENDING', 'Event Nearing Completion'
+        RENTAL_UPCOMING = 'RENTAL_UPCOMING', 'Upcoming Rental Reminder'
+        RENTAL_RETURN_DUE = 'RENTAL_RETURN_DUE', 'Rental Nearing Return'
+
+    kind = models.CharField(
+        max_length=20,
+        choices=KindChoices.choices,
+        default=KindChoices.GENERAL,
+        help_text="What produced this notification."
+    )
+
+    # The booking the notification is about (at most one of the two is set)
+    event = models.ForeignKey(
+        'bookings.Event',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notifications'
+    )
+    rental = models.ForeignKey(
+        'bookings.Rental',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notifications'
+    )
+
+    # e.g. 'EVENT_UPCOMING:event:42:2025-07-20'. Unique, so re-running a job cannot insert the same reminder twice;
+    # NULL (the default) for notifications that are not deduplicated.
+    dedup_key = models.CharField(
+        max_length=100,
+        unique=True,
+        null=True,
+        blank=True,
+        editable=False
+    )
 
     # Optional: A URL that the notification can link to directly in the frontend.
     link = models.URLField(
@@ -55,6 +88,10 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at'] # Show newest notifications first
+        indexes = [
+            # Dashboard: a user's (unread) notifications, newest first
+            models.Index(fields=['user', 'is_read', '-created_at'], name='notification_user_read_idx'),
+        ]
         verbose_name = "Notification"
         verbose_name_plural = "Notifications"
 
@@ -65,6 +102,11 @@ class Notification(models.Model):
         user_info = f"for {self.user.username} " if self.user else ""
         return f"Notification {user_info}({read_status}) @ {timestamp}: {msg_snippet}"
 
+    @staticmethod
+    def make_dedup_key(kind, booking, day):
+        """ Dedup key for a notification of `kind` about `booking` (an Event or Rental) on `day`. """
+        return f"{kind}:{booking._meta.model_name}:{booking.pk}:{day.isoformat()}"
+
     def mark_as_read(self):
         """Marks the notification as read."""
         if not self.is_read:
@@ -0,0 +1,26 @@
+# clavis_event_inventory/dashboard/signals.py
+
+"""
+Invalidates cached dashboard widgets when the data behind them changes.
+Connected in DashboardConfig.ready().
+"""
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+from .widgets import WIDGETS, invalidate_widgets, widgets_for_model
+
+
+def _invalidate_for(sender, **kwargs):
+    names = widgets_for_model(sender._meta.label)
+    # Wait for the commit so a concurrent request cannot re-cache the pre-change data
+    transaction.on_commit(lambda: invalidate_widgets(names))
+
+
+def connect_signals():
+    labels = {label for widget in WIDGETS.values() for label in widget['models']}
+    for label in labels:
+        model = apps.get_model(label)
+        post_save.connect(_invalidate_for, sender=model, dispatch_uid=f'dashboard_widgets_save_{label}')
+        post_delete.connect(_invalidate_for, sender=model, dispatch_uid=f'dashboard_widgets_delete_{label}')
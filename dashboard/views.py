@@ -8,13 +8,15 @@ from datetime import timedelta
 from django.contrib.auth.decorators import login_required # For user-specific notifications
 
 # Import models from other apps
-from inventory.models import Item
+from inventory.models import Item, day_bounds, DEFAULT_LOW_STOCK_THRESHOLD
+from inventory.occupancy import total_reserved_on
 from clients.models import Client
-from bookings.models import Event, Rental, EventItem, RentalItem
+from bookings.models import Event, Rental
 from .models import Notification # Import the Notification model
+from .widgets import get_widget, widget_stats
 
-# Define a threshold for low stock - adjust as needed
-LOW_STOCK_THRESHOLD = 3
+# Default threshold for low stock (per-item / per-category thresholds override it)
+LOW_STOCK_THRESHOLD = DEFAULT_LOW_STOCK_THRESHOLD
 
 @login_required # Ensure user is logged in to see the dashboard
 def dashboard_view(request):
@@ -36,104 +38,102 @@ def dashboard_view(request):
         start_of_today = datetime.datetime.combine(today, datetime.time.min)
         end_of_today = datetime.datetime.combine(today, datetime.time.max)
 
-    # --- Quick Stats ---
-    total_item_types = Item.objects.count()
-    total_quantity_owned_agg = Item.objects.aggregate(total=Sum('initial_quantity'))
-    total_quantity_owned = total_quantity_owned_agg['total'] if total_quantity_owned_agg['total'] else 0
-
-    assigned_event_qty = EventItem.objects.filter(
-        booking__start_date__lte=end_of_today,
-        booking__end_date__gte=start_of_today,
-        booking__status__in=[Event.StatusChoices.PLANNED, Event.StatusChoices.ACTIVE]
-    ).aggregate(total=Sum('quantity'))['total'] or 0
-
-    assigned_rental_qty = RentalItem.objects.filter(
-        booking__start_date__lte=end_of_today,
-        booking__end_date__gte=start_of_today,
-        booking__status__in=[Rental.StatusChoices.BOOKED, Rental.StatusChoices.OUT]
-    ).aggregate(total=Sum('quantity'))['total'] or 0
+    # Each widget is computed through the per-widget cache (dashboard/widgets.py); querysets are
+    # evaluated with list() so the cached values are plain, picklable data.
 
-    total_items_assigned_today = assigned_event_qty + assigned_rental_qty
-    total_clients = Client.objects.count()
+    # --- Quick Stats ---
+    def quick_stats():
+        total_quantity_owned_agg = Item.objects.aggregate(total=Sum('initial_quantity'))
+        return {
+            'total_item_types': Item.objects.count(),
+            'total_quantity_owned': total_quantity_owned_agg['total'] if total_quantity_owned_agg['total'] else 0,
+            # Read from the materialized per-day occupancy table instead of joining booking lines
+            'total_items_assigned_today': total_reserved_on(today),
+            'total_clients': Client.objects.count(),
+        }
 
     # --- Upcoming Events/Rentals (Next 7 days) ---
-    upcoming_period_end_date = today + timedelta(days=7)
-    upcoming_events = Event.objects.filter(
-        start_date__date__gte=today,
-        start_date__date__lte=upcoming_period_end_date,
-        status=Event.StatusChoices.PLANNED
-    ).select_related('client').order_by('start_date')[:5]
-
-    upcoming_rentals = Rental.objects.filter(
-        start_date__date__gte=today,
-        start_date__date__lte=upcoming_period_end_date,
-        status=Rental.StatusChoices.BOOKED
-    ).select_related('client').order_by('start_date')[:5]
+    def upcoming_bookings():
+        upcoming_period_end_date = today + timedelta(days=7)
+        # Plain datetime ranges (not __date lookups) so the (status, start_date/end_date) indexes are usable
+        upcoming_range = (start_of_today, day_bounds(upcoming_period_end_date)[1])
+        return {
+            'upcoming_events': list(Event.objects.filter(
+                start_date__range=upcoming_range,
+                status=Event.StatusChoices.PLANNED
+            ).select_related('client').order_by('start_date')[:5]),
+            'upcoming_rentals': list(Rental.objects.filter(
+                start_date__range=upcoming_range,
+                status=Rental.StatusChoices.BOOKED
+            ).select_related('client').order_by('start_date')[:5]),
+        }
 
     # --- Items Due Back Soon (Today or next 3 days) ---
-    events_ending_soon = Event.objects.filter(
-        end_date__date__gte=today,
-        end_date__date__lte=next_3_days,
-        status=Event.StatusChoices.ACTIVE
-    ).select_related('client').order_by('end_date')
-
-    rentals_ending_soon = Rental.objects.filter(
-        end_date__gte=now, 
-        end_date__date__lte=next_3_days, 
-        status__in=[Rental.StatusChoices.OUT, Rental.StatusChoices.BOOKED] 
-    ).select_related('client').order_by('end_date')
+    def due_back():
+        end_of_next_3_days = day_bounds(next_3_days)[1]
+        return {
+            'events_ending_soon': list(Event.objects.filter(
+                end_date__range=(start_of_today, end_of_next_3_days),
+                status=Event.StatusChoices.ACTIVE
+            ).select_related('client').order_by('end_date')),
+            'rentals_ending_soon': list(Rental.objects.filter(
+                end_date__gte=now, 
+                end_date__lte=end_of_next_3_days, 
+                status__in=[Rental.StatusChoices.OUT, Rental.StatusChoices.BOOKED] 
+            ).select_related('client').order_by('end_date')),
+        }
 
     # --- Overdue Rentals ---
-    overdue_rentals = Rental.objects.filter(
-        end_date__lt=now, 
-        status__in=[Rental.StatusChoices.OUT, Rental.StatusChoices.BOOKED, Rental.StatusChoices.OVERDUE]
-    ).exclude(
-        status__in=[Rental.StatusChoices.RETURNED, Rental.StatusChoices.CANCELLED]
-    ).select_related('client').order_by('end_date')[:10]
+    def overdue_rentals():
+        return {
+            'overdue_rentals': list(Rental.objects.filter(
+                end_date__lt=now, 
+                status__in=[Rental.StatusChoices.OUT, Rental.StatusChoices.BOOKED, Rental.StatusChoices.OVERDUE]
+            ).exclude(
+                status__in=[Rental.StatusChoices.RETURNED, Rental.StatusChoices.CANCELLED]
+            ).select_related('client').order_by('end_date')[:10]),
+        }
 
     # --- Low Availability Items ---
-    all_items = Item.objects.filter(initial_quantity__gt=0).select_related('category')
-    low_stock_items = []
-    for item in all_items:
-        if item.available_quantity <= LOW_STOCK_THRESHOLD:
-            low_stock_items.append(item)
-    low_stock_items = low_stock_items[:10]
+    def low_stock():
+        # Thresholds come from the item, its category or DEFAULT_LOW_STOCK_THRESHOLD; filtered and limited in SQL
+        return {'low_stock_items': list(Item.objects.filter(initial_quantity__gt=0).low_stock(today)[:10])}
 
     # --- Recently Added Items & Clients ---
-    recent_items = Item.objects.order_by('-created_at')[:5]
-    recent_clients = Client.objects.order_by('-created_at')[:5]
+    def recent_additions():
+        return {
+            'recent_items': list(Item.objects.order_by('-created_at')[:5]),
+            'recent_clients': list(Client.objects.order_by('-created_at')[:5]),
+        }
 
     # --- Fetch Notifications ---
-    # Fetch notifications for the current user or system-wide if user is None in Notification model
-    # For simplicity, let's assume we show notifications that are either unassigned OR assigned to the current user.
-    # You might want to refine this based on your exact needs (e.g., only for logged-in user).
-    user_notifications = Notification.objects.filter(
-        Q(user=request.user) | Q(user__isnull=True) # Show user's OR system-wide notifications
-    ).order_by('-created_at') # Newest first
-    
-    unread_notifications_count = user_notifications.filter(is_read=False).count()
-    # Show, for example, the latest 10 notifications regardless of read status for the dashboard
-    latest_notifications = user_notifications[:10] 
-
+    # Notifications that are either unassigned (system-wide) OR assigned to the current user.
+    def notifications():
+        user_notifications = Notification.objects.filter(
+            Q(user=request.user) | Q(user__isnull=True) # Show user's OR system-wide notifications
+        ).select_related('user').order_by('-created_at') # Newest first
+        return {
+            'unread_notifications_count': user_notifications.filter(is_read=False).count(),
+            # Show, for example, the latest 10 notifications regardless of read status for the dashboard
+            'latest_notifications': list(user_notifications[:10]),
+        }
+
+    widget_data = {}
+    widget_data.update(get_widget('quick_stats', quick_stats, today))
+    widget_data.update(get_widget('upcoming_bookings', upcoming_bookings, today))
+    widget_data.update(get_widget('due_back', due_back, today))
+    widget_data.update(get_widget('overdue_rentals', overdue_rentals, today))
+    widget_data.update(get_widget('low_stock', low_stock, today))
+    widget_data.update(get_widget('recent_additions', recent_additions))
+    widget_data.update(get_widget('notifications', notifications, request.user.pk))
 
     context = {
         'page_title': 'Dashboard',
-        'total_item_types': total_item_types,
-        'total_quantity_owned': total_quantity_owned,
-        'total_items_assigned_today': total_items_assigned_today,
-        'total_clients': total_clients,
-        'upcoming_events': upcoming_events,
-        'upcoming_rentals': upcoming_rentals,
-        'events_ending_soon': events_ending_soon,
-        'rentals_ending_soon': rentals_ending_soon,
-        'overdue_rentals': overdue_rentals,
-        'low_stock_items': low_stock_items,
+        **widget_data,
         'low_stock_threshold': LOW_STOCK_THRESHOLD,
-        'recent_items': recent_items,
-        'recent_clients': recent_clients,
         'current_time': now,
-        'latest_notifications': latest_notifications, # ADDED
-        'unread_notifications_count': unread_notifications_count, # ADDED
+        # Per-widget cache hit/miss counters, for staff only
+        'widget_cache_stats': widget_stats() if request.user.is_staff else None,
     }
 
     return render(request, 'dashboard/dashboard.html', context)
\ No newline at end of file
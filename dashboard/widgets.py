@@ -0,0 +1,115 @@
+# clavis_event_inventory/dashboard/widgets.py
+
+"""
+Per-widget cache for the dashboard.
+
+Every widget is cached under its own key and TTL. Keys carry a per-widget version number;
+dashboard.signals bumps the version of every widget that depends on a model whenever an
+instance of that model is saved or deleted, which orphans all cached variants of the widget
+(per day, per user) at once. TTLs only bound staleness for time-driven changes
+(e.g. a rental becoming overdue without any save).
+
+The versions only reach other processes (other web workers, the update_booking_statuses cron) through a
+cache they all share: settings.CACHES configures one; a per-process LocMemCache would not do.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+
+# name: default TTL in seconds, and the models whose saves/deletes invalidate it
+WIDGETS = {
+    'quick_stats': {'ttl': 300, 'models': ['inventory.Item', 'clients.Client', 'bookings.Event', 'bookings.Rental', 'bookings.EventItem', 'bookings.RentalItem']},
+    'upcoming_bookings': {'ttl': 120, 'models': ['bookings.Event', 'bookings.Rental', 'clients.Client']},
+    'due_back': {'ttl': 60, 'models': ['bookings.Event', 'bookings.Rental', 'clients.Client']},
+    'overdue_rentals': {'ttl': 60, 'models': ['bookings.Rental', 'clients.Client']},
+    'low_stock': {'ttl': 300, 'models': ['inventory.Item', 'inventory.Category', 'bookings.Event', 'bookings.Rental', 'bookings.EventItem', 'bookings.RentalItem']},
+    'recent_additions': {'ttl': 600, 'models': ['inventory.Item', 'clients.Client']},
+    'notifications': {'ttl': 60, 'models': ['dashboard.Notification']},
+}
+
+KEY_PREFIX = 'dashboard:widget'
+_MISSING = object()
+
+
+def _cache():
+    return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')]
+
+
+def widget_ttl(name):
+    """ TTL for a widget; settings.DASHBOARD_WIDGET_TTLS = {'name': seconds} overrides the defaults. """
+    return getattr(settings, 'DASHBOARD_WIDGET_TTLS', {}).get(name, WIDGETS[name]['ttl'])
+
+
+def _version_key(name):
+    return f"{KEY_PREFIX}:{name}:version"
+
+
+def _stat_key(name, outcome):
+    return f"{KEY_PREFIX}:{name}:{outcome}"
+
+
+def _incr(cache, key):
+    """ Counter increment, creating the counter if needed (atomic on Redis / Memcached; last write wins on files). """
+    cache.add(key, 0, None)
+    try:
+        return cache.incr(key)
+    except ValueError: # Evicted between add() and incr()
+        cache.set(key, 1, None)
+        return 1
+
+
+def widgets_for_model(label):
+    """ Names of the widgets invalidated by changes to the model with this 'app_label.ModelName' label. """
+    return [name for name, widget in WIDGETS.items() if label in widget['models']]
+
+
+def get_widget(name, compute, *key_parts):
+    """
+    Returns the cached value of a widget, computing and storing it on a miss.
+    key_parts distinguish variants of the same widget (e.g. the day, or the user for notifications).
+    `compute` must return picklable data (evaluate querysets with list()).
+    """
+    cache = _cache()
+    version = cache.get_or_set(_version_key(name), 1, None)
+    key = ':'.join([KEY_PREFIX, name, f"v{version}", *(str(part) for part in key_parts)])
+
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        _incr(cache, _stat_key(name, 'misses'))
+        value = compute()
+        cache.set(key, value, widget_ttl(name))
+    else:
+        _incr(cache, _stat_key(name, 'hits'))
+    return value
+
+
+def invalidate_widgets(names):
+    """ Bumps the version of each named widget, so every cached variant of it is recomputed on next use. """
+    cache = _cache()
+    for name in names:
+        _incr(cache, _version_key(name))
+
+
+def widget_stats():
+    """ Per-widget hit/miss counters for the staff panel: [{'name', 'ttl', 'hits', 'misses', 'hit_rate', 'version'}]. """
+    cache = _cache()
+    keys = [key for name in WIDGETS for key in (_stat_key(name, 'hits'), _stat_key(name, 'misses'), _version_key(name))]
+    values = cache.get_many(keys)
+    stats = []
+    for name in WIDGETS:
+        hits = values.get(_stat_key(name, 'hits'), 0)
+        misses = values.get(_stat_key(name, 'misses'), 0)
+        stats.append({
+            'name': name,
+            'ttl': widget_ttl(name),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(100 * hits / (hits + misses), 1) if hits + misses else None,
+            'version': values.get(_version_key(name), 1),
+        })
+    return stats
+
+
+def reset_widget_stats():
+    """ Zeroes the hit/miss counters (cached values are kept). """
+    _cache().delete_many([_stat_key(name, outcome) for name in WIDGETS for outcome in ('hits', 'misses')])
@@ -5,7 +5,7 @@ from .models import Category, Item # Import both models from this app's models.p
 
 @admin.register(Category) # Use decorator for cleaner registration
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ('name', 'parent')
+    list_display = ('name', 'parent', 'low_stock_threshold')
     search_fields = ('name',)
     list_filter = ('parent',) # Allow filtering by parent
 
@@ -39,6 +39,10 @@ class ItemAdmin(admin.ModelAdmin):
     readonly_fields = ('sku', 'created_at', 'updated_at', 'available_quantity')
     list_select_related = ('category', 'supplier') # Optimize fetching related objects for list display
 
+    def get_queryset(self, request):
+        # Annotate availability in the list query instead of two queries per row
+        return super().get_queryset(request).with_availability()
+
     # Define layout for Add/Edit pages in Admin
     fieldsets = (
         (None, { # Main section
@@ -49,7 +53,7 @@ class ItemAdmin(admin.ModelAdmin):
                        'description')
         }),
         ('Stock & Location', {
-            'fields': ('initial_quantity', 'storage_location')
+            'fields': ('initial_quantity', 'low_stock_threshold', 'storage_location')
         }),
         ('Images', {
             'fields': ('image1', 'image2')
@@ -0,0 +1,131 @@
+# clavis_event_inventory/inventory/availability.py
+
+from collections import defaultdict
+
+from django.utils import timezone
+
+BLOCKING_EVENT_STATUSES = ['PLANNED', 'ACTIVE']
+BLOCKING_RENTAL_STATUSES = ['BOOKED', 'OUT', 'OVERDUE']
+
+
+def load_booking_intervals(item_ids, start_date, end_date, exclude_event_pk=None, exclude_rental_pk=None):
+    """
+    Loads the intervals of every blocking booking line OVERLAPPING [start_date, end_date] for all of
+    item_ids at once: one values_list query per booking type, whatever the number of items.
+    Returns {item_id: [interval dict, ...]} as consumed by peak_concurrent_usage().
+    """
+    from bookings.models import EventItem, RentalItem
+    item_ids = list(item_ids)
+    intervals = defaultdict(list)
+    if not item_ids:
+        return intervals
+
+    interval_fields = ('item_id', 'booking_id', 'booking__reference_number', 'booking__start_date', 'booking__end_date', 'quantity')
+    queries = (
+        ('event', EventItem, BLOCKING_EVENT_STATUSES, exclude_event_pk),
+        ('rental', RentalItem, BLOCKING_RENTAL_STATUSES, exclude_rental_pk),
+    )
+    for booking_type, model, statuses, exclude_pk in queries:
+        query = model.objects.filter( item_id__in=item_ids, booking__end_date__gte=start_date, booking__start_date__lte=end_date, booking__status__in=statuses )
+        if exclude_pk: query = query.exclude(booking_id=exclude_pk)
+        for item_id, booking_id, reference_number, booking_start, booking_end, quantity in query.values_list(*interval_fields):
+            intervals[item_id].append({
+                'booking_type': booking_type,
+                'booking_id': booking_id,
+                'reference_number': reference_number,
+                'start': booking_start,
+                'end': booking_end,
+                'quantity': quantity,
+            })
+    return intervals
+
+
+def peak_concurrent_usage(intervals, window_start, window_end):
+    """
+    Sweep-line over booking intervals to find the maximum quantity in use at any
+    single moment of [window_start, window_end].
+
+    `intervals` is an iterable of dicts with at least 'start', 'end' and 'quantity'
+    (any other keys, e.g. the booking reference, are passed through untouched).
+    Intervals are treated as closed, matching the overlap filters used elsewhere
+    (booking__end_date__gte=start, booking__start_date__lte=end), so a booking that
+    starts at the exact moment another ends still counts as overlapping.
+
+    Returns a dict:
+        'peak_quantity': highest concurrent quantity (0 if nothing overlaps)
+        'peak_at':       datetime at which that peak starts (None if nothing overlaps)
+        'peak_bookings': the intervals that are active at the peak
+    """
+    points = []
+    for index, interval in enumerate(intervals):
+        start = max(interval['start'], window_start)
+        end = min(interval['end'], window_end)
+        if start > end:
+            continue
+        # At equal timestamps starts (0) sort before ends (1) so touching intervals overlap
+        points.append((start, 0, index, interval))
+        points.append((end, 1, index, interval))
+    points.sort(key=lambda point: (point[0], point[1], point[2]))
+
+    active = {}
+    current = 0
+    peak_quantity = 0
+    peak_at = None
+    peak_bookings = []
+    for moment, kind, index, interval in points:
+        if kind == 0:
+            active[index] = interval
+            current += interval['quantity']
+            if current > peak_quantity:
+                peak_quantity = current
+                peak_at = moment
+                peak_bookings = list(active.values())
+        else:
+            active.pop(index, None)
+            current -= interval['quantity']
+
+    return {
+        'peak_quantity': peak_quantity,
+        'peak_at': peak_at,
+        'peak_bookings': peak_bookings,
+    }
+
+
+def describe_peak(peak):
+    """ Human-readable explanation of a peak_concurrent_usage() result, for form errors. """
+    if not peak or not peak['peak_quantity']:
+        return "no overlapping bookings"
+    peak_day = timezone.localtime(peak['peak_at']).strftime('%Y-%m-%d') if timezone.is_aware(peak['peak_at']) else peak['peak_at'].strftime('%Y-%m-%d')
+    references = ", ".join(booking['reference_number'] for booking in peak['peak_bookings'])
+    return f"peak of {peak['peak_quantity']} booked on {peak_day} by {references}"
+
+
+def check_availability_bulk(rows, start_date, end_date, exclude_event_pk=None, exclude_rental_pk=None):
+    """
+    Validates many (item, quantity) rows for one date window with two grouped queries in total.
+    Rows for the same item are checked against their combined quantity.
+    Returns one dict per row, in order, with the peak_concurrent_usage() keys plus
+    'item', 'quantity', 'available', 'shortfall' and 'is_available'.
+    """
+    rows = list(rows)
+    requested = defaultdict(int)
+    for item, quantity in rows:
+        requested[item.pk] += quantity or 0
+
+    intervals = load_booking_intervals(requested.keys(), start_date, end_date, exclude_event_pk=exclude_event_pk, exclude_rental_pk=exclude_rental_pk)
+    peaks = {item_id: peak_concurrent_usage(intervals.get(item_id, []), start_date, end_date) for item_id in requested}
+
+    results = []
+    for item, quantity in rows:
+        result = dict(peaks[item.pk])
+        available = max(0, item.initial_quantity - result['peak_quantity'])
+        shortfall = max(0, requested[item.pk] - available)
+        result.update({
+            'item': item,
+            'quantity': quantity,
+            'available': available,
+            'shortfall': shortfall,
+            'is_available': shortfall == 0,
+        })
+        results.append(result)
+    return results
@@ -0,0 +1,69 @@
+# clavis_event_inventory/inventory/barcodes.py
+
+"""
+Code128 barcode images of item SKUs (PNG and SVG), rendered once and kept under MEDIA_ROOT/barcodes.
+
+A barcode only depends on its SKU, so each file is named after a digest of the SKU (and BARCODE_VERSION,
+to be bumped whenever the rendering changes) and served by barcode_image_view from a URL containing the
+SKU, with immutable cache headers. A new SKU gets a new URL; the files of the old one are removed by
+inventory.signals. Images are built when an item's SKU is set, on the first request for a missing one,
+or by the backfill_barcodes command.
+"""
+
+import hashlib
+import io
+
+import barcode
+from barcode.writer import ImageWriter, SVGWriter
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+BARCODE_DIR = 'barcodes'
+BARCODE_VERSION = 1
+BARCODE_FORMATS = {
+    'png': {'writer': ImageWriter, 'content_type': 'image/png'}, # Screen (item list)
+    'svg': {'writer': SVGWriter, 'content_type': 'image/svg+xml'}, # Printing
+}
+BARCODE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def barcode_name(sku, barcode_format):
+    """ Storage name of the barcode image of `sku`, e.g. 'barcodes/3f/3f9a...c2.svg'. """
+    digest = hashlib.sha256(f"{BARCODE_VERSION}:{sku}".encode()).hexdigest()
+    return f"{BARCODE_DIR}/{digest[:2]}/{digest}.{barcode_format}"
+
+
+def render_barcode(sku, barcode_format):
+    """ Image bytes of the Code128 barcode of `sku`; raises barcode.errors.BarcodeError for SKUs Code128 cannot encode. """
+    buffer = io.BytesIO()
+    barcode.get('code128', sku, writer=BARCODE_FORMATS[barcode_format]['writer']()).write(buffer)
+    return buffer.getvalue()
+
+
+def build_barcodes(sku, formats=None, force=False, storage=None):
+    """ Writes the missing barcode images of `sku` (all of them with force=True). Returns the formats written. """
+    storage = storage or default_storage
+    written = []
+    for barcode_format in formats or BARCODE_FORMATS:
+        name = barcode_name(sku, barcode_format)
+        if storage.exists(name):
+            if not force:
+                continue
+            storage.delete(name) # Storage.save() would otherwise pick a new, unpredictable name
+        storage.save(name, ContentFile(render_barcode(sku, barcode_format)))
+        written.append(barcode_format)
+    return written
+
+
+def delete_barcodes(sku, storage=None):
+    storage = storage or default_storage
+    for barcode_format in BARCODE_FORMATS:
+        storage.delete(barcode_name(sku, barcode_format))
+
+
+def barcode_url(sku, barcode_format='png'):
+    """ Cacheable URL of the barcode image of `sku` ('' without a SKU). """
+    if not sku:
+        return ''
+    return reverse('inventory:barcode_image', kwargs={'version': BARCODE_VERSION, 'sku': sku, 'barcode_format': barcode_format})
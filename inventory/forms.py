@@ -79,7 +79,7 @@ class ItemForm(forms.ModelForm):
             'name', 'description',
             'item_source',  # ADDED item_source
             'category', 'storage_location',
-            'initial_quantity',
+            'initial_quantity', 'low_stock_threshold',
             'depth', 'width', 'height',
             'dimension_unit', 'image1', 'image2', 'purchase_price',
             'rent_price_per_day', 'supplier'
@@ -89,6 +89,7 @@ class ItemForm(forms.ModelForm):
             'description': forms.Textarea(attrs={'rows': 3, 'class': 'form-control'}),
             'storage_location': forms.TextInput(attrs={'class': 'form-control'}),
             'initial_quantity': forms.NumberInput(attrs={'min': '0', 'class': 'form-control'}),
+            'low_stock_threshold': forms.NumberInput(attrs={'min': '0', 'class': 'form-control'}),
             'depth': forms.NumberInput(attrs={'step': '0.01', 'class': 'form-control'}),
             'width': forms.NumberInput(attrs={'step': '0.01', 'class': 'form-control'}),
             'height': forms.NumberInput(attrs={'step': '0.01', 'class': 'form-control'}),
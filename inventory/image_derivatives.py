@@ -0,0 +1,133 @@
+# clavis_event_inventory/inventory/image_derivatives.py
+
+"""
+Fixed-size derivatives of item images (Item.image1/image2, ItemImage.image).
+
+Each original gets one file per entry of DERIVATIVES, stored alongside the originals under
+'<upload dir>/derivatives/<kind>/<original file name>.<ext>', so the original a derivative
+belongs to can always be told from its path. Derivatives are built once per upload
+(inventory.signals) or by the backfill_image_derivatives command; templates use the
+derivative_url filter (inventory_images tag library) and the master inventory PDF embeds the
+'pdf' JPEG directly instead of re-encoding the original on every export.
+"""
+
+import io
+import os
+import posixpath
+
+from django.core.files.base import ContentFile
+from PIL import Image as PILImage, ImageOps
+
+# kind: bounding box in pixels, output format/extension and encoder options
+DERIVATIVES = {
+    'list': {'size': (120, 120), 'format': 'WEBP', 'ext': 'webp', 'options': {'quality': 80, 'method': 4}}, # 60px list column at 2x
+    'pdf': {'size': (150, 150), 'format': 'JPEG', 'ext': 'jpg', 'options': {'quality': 85, 'optimize': True}}, # 0.5in PDF cell at 300 dpi
+    'detail': {'size': (1000, 1000), 'format': 'WEBP', 'ext': 'webp', 'options': {'quality': 85, 'method': 4}},
+}
+DERIVATIVES_DIR = 'derivatives'
+# What a missing, truncated or hostile original raises while being decoded
+IMAGE_ERRORS = (OSError, ValueError, PILImage.DecompressionBombError)
+
+
+def derivative_name(name, kind):
+    """ Storage name of the `kind` derivative of the original stored as `name`. """
+    directory, filename = posixpath.split(name)
+    return posixpath.join(directory, DERIVATIVES_DIR, kind, f"{filename}.{DERIVATIVES[kind]['ext']}")
+
+
+def is_derivative_name(name):
+    return f"/{DERIVATIVES_DIR}/" in f"/{name}"
+
+
+def original_name(name):
+    """ Inverse of derivative_name(): the original a derivative was built from, or None if `name` is not a derivative. """
+    directory, filename = posixpath.split(name)
+    derivatives_dir, kind = posixpath.split(directory)
+    base_dir, marker = posixpath.split(derivatives_dir)
+    if marker != DERIVATIVES_DIR or kind not in DERIVATIVES:
+        return None
+    extension = f".{DERIVATIVES[kind]['ext']}"
+    if not filename.endswith(extension) or filename == extension:
+        return None
+    return posixpath.join(base_dir, filename[:-len(extension)])
+
+
+def _render(image, kind):
+    spec = DERIVATIVES[kind]
+    image = image.copy()
+    image.thumbnail(spec['size'], PILImage.LANCZOS)
+    if spec['format'] == 'JPEG' or image.mode not in ('RGB', 'RGBA'):
+        # JPEG has no alpha; flatten transparent images onto white instead of black
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = PILImage.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        else:
+            image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, format=spec['format'], **spec['options'])
+    return buffer.getvalue()
+
+
+def build_derivatives(field_file, kinds=None, force=False):
+    """
+    Builds the missing derivatives (all of them with force=True) of an image field file.
+    The original is decoded once for all kinds. Returns the list of kinds written.
+    """
+    if not field_file or not field_file.name:
+        return []
+    storage = field_file.storage
+    kinds = [kind for kind in (kinds or DERIVATIVES) if force or not storage.exists(derivative_name(field_file.name, kind))]
+    if not kinds:
+        return []
+
+    with storage.open(field_file.name, 'rb') as original:
+        with PILImage.open(original) as image:
+            image = ImageOps.exif_transpose(image) # Bakes the EXIF orientation in; derivatives carry no EXIF
+            image.load()
+
+    for kind in kinds:
+        name = derivative_name(field_file.name, kind)
+        if storage.exists(name):
+            storage.delete(name) # Storage.save() would otherwise pick a new, unpredictable name
+        storage.save(name, ContentFile(_render(image, kind)))
+    return kinds
+
+
+def delete_derivatives(field_file_or_name, storage=None):
+    """ Deletes every derivative of an original (given as a field file, or a name plus its storage). """
+    name = getattr(field_file_or_name, 'name', field_file_or_name)
+    storage = storage or field_file_or_name.storage
+    if not name:
+        return
+    for kind in DERIVATIVES:
+        storage.delete(derivative_name(name, kind))
+
+
+def derivative_url(field_file, kind):
+    """ URL of the derivative, or of the original while the derivative has not been built yet. """
+    if not field_file or not field_file.name:
+        return ''
+    name = derivative_name(field_file.name, kind)
+    if field_file.storage.exists(name):
+        return field_file.storage.url(name)
+    return field_file.url
+
+
+def prepare_derivative(field_file, kind):
+    """
+    (path, None) for the derivative, building it first if missing, or (None, error message) if the original
+    cannot be read. Safe to call from worker threads: it only touches the storage, never the database.
+    """
+    storage = field_file.storage
+    name = derivative_name(field_file.name, kind)
+    try:
+        if not storage.exists(name):
+            build_derivatives(field_file, kinds=[kind])
+        path = storage.path(name)
+    except IMAGE_ERRORS as e:
+        return None, str(e) or e.__class__.__name__
+    if not os.path.exists(path):
+        return None, "derivative was not written"
+    return path, None
@@ -0,0 +1,103 @@
+# clavis_event_inventory/inventory/image_store.py
+
+"""
+Content-addressed storage for item images (Item.image1/image2, ItemImage.image).
+
+An upload is stored as '<upload dir>/<sha256 of its bytes>.<ext>', so saving the same picture again
+(re-submitting ItemForm, attaching it to another item) reuses the existing file instead of writing
+a '_09UBGmE'-suffixed copy. Because derivatives are named after their original, they are shared too.
+
+Rows simply point at the same name; the references are counted from the image columns themselves
+(no counter to drift), and release_image() deletes a blob and its derivatives once the last row
+referencing it is gone. inventory.signals calls it when an image is replaced or its row deleted.
+Existing duplicates are collapsed by the dedupe_item_images command.
+"""
+
+import hashlib
+import os
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db.models import Q
+from django.utils.deconstruct import deconstructible
+
+from .image_derivatives import delete_derivatives, is_derivative_name
+
+# Same picture, same name: '.jpeg' and '.JPG' uploads of identical bytes must not become two blobs
+EXTENSION_ALIASES = {'.jpeg': '.jpg', '.jpe': '.jpg', '.tif': '.tiff'}
+
+
+def content_hash(content):
+    """ sha256 hex digest of a File / uploaded file, read in chunks; leaves the file rewound. """
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def content_addressed_name(name, digest):
+    directory, filename = posixpath.split(name)
+    extension = os.path.splitext(filename)[1].lower()
+    return posixpath.join(directory, f"{digest}{EXTENSION_ALIASES.get(extension, extension)}")
+
+
+def is_content_addressed_name(name):
+    stem = os.path.splitext(posixpath.basename(name))[0]
+    return len(stem) == 64 and all(char in '0123456789abcdef' for char in stem)
+
+
+@deconstructible(path='inventory.image_store.ContentAddressedStorage')
+class ContentAddressedStorage(FileSystemStorage):
+    """ FileSystemStorage that names uploads after their content and never writes the same bytes twice. """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if is_derivative_name(name):
+            # Derivatives are named after their (already content-addressed) original
+            return super().save(name, content, max_length=max_length)
+
+        name = content_addressed_name(name, content_hash(content))
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+def image_reference_count(name):
+    """ Number of image columns (Item.image1/image2, ItemImage.image) pointing at `name`. """
+    from .models import Item, ItemImage
+    if not name:
+        return 0
+    return (
+        Item.objects.filter(Q(image1=name) | Q(image2=name)).count()
+        + ItemImage.objects.filter(image=name).count()
+    )
+
+
+def referenced_image_names(names):
+    """ The subset of `names` referenced by at least one image column; one indexed IN lookup per column. """
+    from .models import Item, ItemImage
+    names = list(names)
+    referenced = set(Item.objects.filter(image1__in=names).values_list('image1', flat=True))
+    referenced |= set(Item.objects.filter(image2__in=names).values_list('image2', flat=True))
+    referenced |= set(ItemImage.objects.filter(image__in=names).values_list('image', flat=True))
+    return referenced
+
+
+def release_image(name, storage):
+    """ Deletes the file and its derivatives if no row references `name` any more. Returns True if it was deleted. """
+    if not name or image_reference_count(name):
+        return False
+    storage.delete(name)
+    delete_derivatives(name, storage)
+    return True
+
+
+item_image_storage = ContentAddressedStorage()
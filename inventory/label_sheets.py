@@ -0,0 +1,148 @@
+# clavis_event_inventory/inventory/label_sheets.py
+
+"""
+Barcode label sheets (Avery-style, several labels per page) for any set of items, as one PDF.
+
+Labels are drawn straight onto a ReportLab canvas with ReportLab's vector Code128 barcode, so they
+print sharply at any size and need no raster images. Each distinct item's label is drawn once as a
+PDF form XObject and every copy just references it, which keeps thousands of labels fast to render
+and small to download.
+"""
+
+import io
+
+from reportlab.graphics.barcode.code128 import Code128
+from reportlab.lib.pagesizes import A4, letter
+from reportlab.lib.units import inch, mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+
+from bookings.models import EventItem, RentalItem
+from .models import Item
+
+# Sheet geometry: label size, grid, and the page margin/gaps the grid starts from
+LABEL_LAYOUTS = {
+    'avery-5160': { # Letter, 30 labels of 2 5/8 x 1 in
+        'pagesize': letter, 'columns': 3, 'rows': 10, 'width': 2.625*inch, 'height': 1*inch,
+        'left': 0.1875*inch, 'top': 0.5*inch, 'column_gap': 0.125*inch, 'row_gap': 0,
+    },
+    'avery-5163': { # Letter, 10 labels of 4 x 2 in
+        'pagesize': letter, 'columns': 2, 'rows': 5, 'width': 4*inch, 'height': 2*inch,
+        'left': 0.15625*inch, 'top': 0.5*inch, 'column_gap': 0.1875*inch, 'row_gap': 0,
+    },
+    'avery-l7160': { # A4, 21 labels of 63.5 x 38.1 mm
+        'pagesize': A4, 'columns': 3, 'rows': 7, 'width': 63.5*mm, 'height': 38.1*mm,
+        'left': 7.2*mm, 'top': 15.15*mm, 'column_gap': 2.5*mm, 'row_gap': 0,
+    },
+}
+DEFAULT_LABEL_LAYOUT = 'avery-5160'
+MAX_LABELS = 10000 # Per sheet set; guards the endpoint against runaway copy counts
+LABEL_PADDING = 0.06*inch
+MAX_BAR_WIDTH = 0.015*inch # Cap on the narrow bar width, so short SKUs are not stretched across the label
+
+
+def parse_item_copies(spec):
+    """ [(item id, copies)] from '12:3,15' (one copy when omitted). Raises ValueError. """
+    pairs = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        item_id, _, copies = part.partition(':')
+        pairs.append((int(item_id), int(copies) if copies else 1))
+        if pairs[-1][1] < 1:
+            raise ValueError(f"Copies must be at least 1 ('{part}').")
+    return pairs
+
+
+def label_selection(item_copies=None, category=None, supplier=None, event=None, rental=None, copies=1):
+    """
+    [(item, copies)] for the listed (item id, copies) pairs, then every item of a category or supplier
+    (`copies` each) and every item booked on an event or rental (booked quantity x `copies`).
+    An item selected several ways gets the sum of its copies; items without a SKU are left out.
+    Raises ValueError when the total exceeds MAX_LABELS.
+    """
+    wanted = {} # item id -> copies, in selection order
+    def add(item_id, count):
+        wanted[item_id] = wanted.get(item_id, 0) + count
+
+    for item_id, count in item_copies or []:
+        add(item_id, count)
+    if category:
+        for item_id in Item.objects.filter(category_id=category).order_by('name').values_list('pk', flat=True):
+            add(item_id, copies)
+    if supplier:
+        for item_id in Item.objects.filter(supplier_id=supplier).order_by('name').values_list('pk', flat=True):
+            add(item_id, copies)
+    for line_model, booking_id in ((EventItem, event), (RentalItem, rental)):
+        if booking_id:
+            lines = line_model.objects.filter(booking_id=booking_id).order_by('item__name', 'pk').values_list('item_id', 'quantity')
+            for item_id, quantity in lines:
+                add(item_id, quantity * copies)
+
+    items = Item.objects.exclude(sku='').only('pk', 'name', 'sku').in_bulk(list(wanted))
+    labels = [(items[item_id], count) for item_id, count in wanted.items() if item_id in items]
+    total = sum(count for item, count in labels)
+    if total > MAX_LABELS:
+        raise ValueError(f"{total} labels requested; at most {MAX_LABELS} can be printed at once.")
+    return labels
+
+
+def _fit_text(text, font, size, width):
+    if stringWidth(text, font, size) <= width:
+        return text
+    while text and stringWidth(text + '…', font, size) > width:
+        text = text[:-1]
+    return text + '…'
+
+
+def _draw_label(canvas, item, width, height):
+    """ Item name at the top, SKU at the bottom and the barcode filling the space between, inside (0, 0, width, height). """
+    name_size = min(10, max(6, height / 9))
+    sku_size = name_size - 1
+    inner_width = width - 2 * LABEL_PADDING
+
+    canvas.setFont('Helvetica-Bold', name_size)
+    canvas.drawCentredString(width / 2, height - LABEL_PADDING - name_size, _fit_text(item.name or '', 'Helvetica-Bold', name_size, inner_width))
+    canvas.setFont('Helvetica', sku_size)
+    canvas.drawCentredString(width / 2, LABEL_PADDING, item.sku)
+
+    bar_height = height - 2 * LABEL_PADDING - name_size - sku_size - 6
+    modules = Code128(item.sku, barWidth=1, quiet=0).width
+    bar_width = min(MAX_BAR_WIDTH, inner_width / (modules + 20)) # 10-module quiet zone on each side
+    barcode = Code128(item.sku, barWidth=bar_width, barHeight=bar_height, quiet=0, humanReadable=0)
+    barcode.drawOn(canvas, (width - barcode.width) / 2, LABEL_PADDING + sku_size + 3)
+
+
+def render_label_sheets(labels, layout=DEFAULT_LABEL_LAYOUT, skip=0):
+    """ PDF bytes of `labels` ([(item, copies)]) laid out on `layout` sheets, leaving the first `skip` positions empty. """
+    spec = LABEL_LAYOUTS[layout]
+    page_width, page_height = spec['pagesize']
+    per_page = spec['columns'] * spec['rows']
+    if not 0 <= skip < per_page:
+        raise ValueError(f"skip must be between 0 and {per_page - 1} for {layout}.")
+
+    buffer = io.BytesIO()
+    canvas = Canvas(buffer, pagesize=spec['pagesize'])
+    canvas.setTitle("Item labels")
+    position = skip
+    for item, copies in labels:
+        form_name = f"label{item.pk}"
+        canvas.beginForm(form_name, 0, 0, spec['width'], spec['height'])
+        _draw_label(canvas, item, spec['width'], spec['height'])
+        canvas.endForm()
+        for _ in range(copies):
+            if position == per_page:
+                canvas.showPage()
+                position = 0
+            row, column = divmod(position, spec['columns'])
+            x = spec['left'] + column * (spec['width'] + spec['column_gap'])
+            y = page_height - spec['top'] - (row + 1) * spec['height'] - row * spec['row_gap']
+            canvas.saveState()
+            canvas.translate(x, y)
+            canvas.doForm(form_name)
+            canvas.restoreState()
+            position += 1
+    canvas.showPage()
+    canvas.save()
+    return buffer.getvalue()
@@ -0,0 +1,51 @@
+# inventory/management/commands/backfill_barcodes.py
+
+import time
+
+from barcode.errors import BarcodeError
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from inventory.barcodes import BARCODE_FORMATS, barcode_name, build_barcodes
+from inventory.models import Item
+
+
+class Command(BaseCommand):
+    help = (
+        "Renders the stored PNG/SVG barcode images of every item SKU (see inventory.barcodes). "
+        "Only missing images are built unless --force is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-render images that already exist.')
+        parser.add_argument('--formats', nargs='+', choices=list(BARCODE_FORMATS), help='Only build these formats (default: all).')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many SKUs are missing images.')
+
+    def handle(self, *args, **options):
+        formats = options['formats'] or list(BARCODE_FORMATS)
+        start = time.perf_counter()
+        skus = built = up_to_date = failed = 0
+
+        for sku in Item.objects.exclude(sku='').order_by('pk').values_list('sku', flat=True).iterator(chunk_size=1000):
+            skus += 1
+            if options['dry_run']:
+                if options['force'] or any(not default_storage.exists(barcode_name(sku, fmt)) for fmt in formats):
+                    built += 1
+                else:
+                    up_to_date += 1
+                continue
+            try:
+                written = build_barcodes(sku, formats=formats, force=options['force'])
+            except (BarcodeError, OSError) as e:
+                failed += 1
+                self.stderr.write(f"Error rendering the barcode of {sku}: {e}")
+                continue
+            if written:
+                built += 1
+            else:
+                up_to_date += 1
+
+        verb = "would be rendered" if options['dry_run'] else "rendered"
+        self.stdout.write(self.style.SUCCESS(
+            f"{skus} SKU(s) in {time.perf_counter() - start:.1f}s: {built} {verb}, {up_to_date} already up to date, {failed} failed."
+        ))
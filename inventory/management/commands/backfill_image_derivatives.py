@@ -0,0 +1,79 @@
+# inventory/management/commands/backfill_image_derivatives.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.image_derivatives import DERIVATIVES, IMAGE_ERRORS, build_derivatives, derivative_name
+from inventory.models import Item, ItemImage
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds the list/pdf/detail derivatives of existing item images (Item.image1/image2 and extra images). "
+        "Only missing derivatives are built unless --force is given; originals shared by several rows are processed once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild derivatives that already exist.')
+        parser.add_argument('--kinds', nargs='+', choices=list(DERIVATIVES), help='Only build these derivatives (default: all).')
+        parser.add_argument('--items', nargs='+', type=int, help='Only process the images of these item IDs.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many originals are missing derivatives.')
+
+    def iter_field_files(self, item_ids):
+        """ Yields every image field file once per stored name. """
+        items = Item.objects.exclude(image1='', image2='').only('pk', 'image1', 'image2')
+        extra_images = ItemImage.objects.exclude(image='').only('pk', 'image')
+        if item_ids:
+            items = items.filter(pk__in=item_ids)
+            extra_images = extra_images.filter(item_id__in=item_ids)
+
+        seen = set()
+        for item in items.iterator(chunk_size=500):
+            for field_file in (item.image1, item.image2):
+                if field_file and field_file.name not in seen:
+                    seen.add(field_file.name)
+                    yield field_file
+        for extra_image in extra_images.iterator(chunk_size=500):
+            if extra_image.image.name not in seen:
+                seen.add(extra_image.image.name)
+                yield extra_image.image
+
+    def handle(self, *args, **options):
+        kinds = options['kinds'] or list(DERIVATIVES)
+        start = time.perf_counter()
+        originals = built = up_to_date = missing = failed = 0
+
+        for field_file in self.iter_field_files(options['items']):
+            originals += 1
+            storage = field_file.storage
+            if not storage.exists(field_file.name):
+                missing += 1
+                self.stderr.write(f"Original not found: {field_file.name}")
+                continue
+            if options['dry_run']:
+                if options['force'] or any(not storage.exists(derivative_name(field_file.name, kind)) for kind in kinds):
+                    built += 1
+                else:
+                    up_to_date += 1
+                continue
+            try:
+                written = build_derivatives(field_file, kinds=kinds, force=options['force'])
+            except IMAGE_ERRORS as e:
+                failed += 1
+                self.stderr.write(f"Error processing {field_file.name}: {e}")
+                continue
+            if written:
+                built += 1
+            else:
+                up_to_date += 1
+
+        if not originals and options['items']:
+            raise CommandError("None of the given items has an image.")
+
+        elapsed = time.perf_counter() - start
+        verb = "would be processed" if options['dry_run'] else "processed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{originals} original(s) in {elapsed:.1f}s: {built} {verb}, {up_to_date} already up to date, "
+            f"{missing} missing on disk, {failed} failed."
+        ))
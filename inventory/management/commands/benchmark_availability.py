@@ -0,0 +1,48 @@
+# inventory/management/commands/benchmark_availability.py
+
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from inventory.models import Item
+
+
+class Command(BaseCommand):
+    help = 'Compares query counts and timings of per-item vs. bulk (with_availability) availability lookups.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', type=int, default=[10, 50, 100, 300],
+            help='Catalogue sizes (number of items) to benchmark.'
+        )
+
+    def _measure(self, fn):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            fn()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        return len(ctx.captured_queries), elapsed_ms
+
+    def handle(self, *args, **options):
+        total_items = Item.objects.count()
+        self.stdout.write(f"Items in catalogue: {total_items}")
+        self.stdout.write(f"{'size':>6} | {'per-item queries':>16} | {'per-item ms':>11} | {'bulk queries':>12} | {'bulk ms':>8}")
+
+        for size in options['sizes']:
+            if size > total_items:
+                self.stdout.write(self.style.WARNING(f"Skipping size {size}: only {total_items} items available."))
+                continue
+
+            def per_item():
+                for item in Item.objects.all()[:size]:
+                    item.available_quantity
+
+            def bulk():
+                for item in Item.objects.with_availability()[:size]:
+                    item.available_quantity
+
+            per_item_queries, per_item_ms = self._measure(per_item)
+            bulk_queries, bulk_ms = self._measure(bulk)
+            self.stdout.write(f"{size:>6} | {per_item_queries:>16} | {per_item_ms:>11.1f} | {bulk_queries:>12} | {bulk_ms:>8.1f}")
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
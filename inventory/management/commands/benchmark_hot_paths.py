@@ -0,0 +1,201 @@
+# inventory/management/commands/benchmark_hot_paths.py
+
+import datetime
+import json
+import platform
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client as HttpClient
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings.models import Event, Rental
+from clients.models import Client
+from inventory.models import Item
+from request_quote.models import QuoteRequest
+from .seed_synthetic_data import SYNTHETIC_IMAGE_DIR, scaled_counts, seed
+
+# Seeded sizes run against a throwaway cache: the rolled-back rows reuse primary keys, so widget and
+# SKU map entries computed from them must not reach the shared cache the running site reads
+SEEDED_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class _Rollback(Exception):
+    """ Raised to discard a seeded dataset once its size has been benchmarked. """
+
+
+class Command(BaseCommand):
+    help = (
+        "Times and counts queries for the dashboard, item list, availability report, monthly summary, "
+        "booking creation and every PDF/XLSX/DOCX export, at several synthetic dataset sizes. "
+        "Each size is seeded inside a transaction that is rolled back afterwards, with a throwaway cache and its placeholder "
+        "images removed, so the database, the shared cache and MEDIA_ROOT are left untouched. "
+        "Results are written to a JSON file so runs can be compared."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[100, 500, 2000], help='Dataset sizes (number of items; other tables scale from it).')
+        parser.add_argument('--current', action='store_true', help='Also benchmark the current data as-is, without seeding.')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per target; the min and median times are reported.')
+        parser.add_argument('--booking-lines', type=int, default=20, help='Item lines in the benchmarked booking creation POST.')
+        parser.add_argument('--only', nargs='+', help='Only run targets whose name contains one of these strings.')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic data.')
+        parser.add_argument('--output', help='JSON output path (default: benchmark_hot_paths_<timestamp>.json).')
+
+    # --- Measurement ---
+
+    def _http_client(self):
+        """ Logged-in test client, using a host the current settings accept. """
+        user = User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+        if user is None:
+            user = User.objects.create_superuser('benchmark', 'benchmark@example.invalid', None)
+        hosts = [host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*']
+        client = HttpClient(HTTP_HOST=hosts[0] if hosts else 'localhost')
+        client.force_login(user)
+        return client, user
+
+    def _measure(self, client, method, url, data, repeat):
+        timings = []
+        queries = status = size = None
+        for run in range(repeat):
+            with transaction.atomic(): # Bookings created by POST targets are discarded after every run
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    response = client.post(url, data) if method == 'POST' else client.get(url, data)
+                    content = b''.join(response.streaming_content) if response.streaming else response.content
+                    timings.append((time.perf_counter() - start) * 1000)
+                transaction.set_rollback(True)
+            if run == 0:
+                queries, status, size = len(ctx.captured_queries), response.status_code, len(content)
+        return {
+            'status': status,
+            'queries': queries,
+            'bytes': size,
+            'ms_min': round(min(timings), 2),
+            'ms_median': round(statistics.median(timings), 2),
+        }
+
+    # --- Targets ---
+
+    def _booking_post_data(self, user, lines):
+        """ Event creation POST with `lines` item rows, in the window least likely to clash with seeded data. """
+        client = Client.objects.order_by('pk').first()
+        items = list(Item.objects.filter(item_source=Item.ItemSourceType.OWNED, initial_quantity__gt=0).order_by('pk')[:lines])
+        start = timezone.localtime() + datetime.timedelta(days=3650)
+        data = {
+            'client': client.pk if client else '',
+            'event_name': 'Benchmark event', 'event_location': 'Benchmark', 'status': Event.StatusChoices.PLANNED,
+            'start_date': start.strftime('%Y-%m-%d %H:%M'),
+            'end_date': (start + datetime.timedelta(days=2)).strftime('%Y-%m-%d %H:%M'),
+            'project_manager': user.pk,
+            'items-TOTAL_FORMS': str(len(items)), 'items-INITIAL_FORMS': '0',
+            'items-MIN_NUM_FORMS': '0', 'items-MAX_NUM_FORMS': '1000',
+        }
+        for index, item in enumerate(items):
+            data[f'items-{index}-item'] = item.pk
+            data[f'items-{index}-quantity'] = 1
+        return data
+
+    def get_targets(self, user, booking_lines):
+        """ [(name, method, url, data)]; targets whose objects do not exist in the data are skipped. """
+        today = timezone.localdate()
+        all_months = {'year': 'all', 'month': 'all'}
+        event = Event.objects.filter(is_logistics_only_service=False, items__isnull=False).order_by('-pk').first()
+        logistics_event = Event.objects.filter(is_logistics_only_service=True).order_by('-pk').first()
+        rental = Rental.objects.filter(items__isnull=False).order_by('-pk').first()
+        quote = QuoteRequest.objects.filter(items__isnull=False).order_by('-pk').first()
+        item = Item.objects.order_by('pk').first()
+
+        targets = [
+            ('dashboard', 'GET', reverse('dashboard_main'), {}),
+            ('item_list', 'GET', reverse('inventory:item_list'), {}),
+            ('item_list_search', 'GET', reverse('inventory:item_list'), {'q': 'chair'}),
+            ('master_inventory_html', 'GET', reverse('inventory:report_master_inventory'), {}),
+            ('master_inventory_xlsx', 'GET', reverse('inventory:report_master_inventory'), {'format': 'xlsx'}),
+            ('master_inventory_pdf', 'GET', reverse('inventory:report_master_inventory'), {'format': 'pdf'}),
+            ('master_inventory_docx', 'GET', reverse('inventory:report_master_inventory'), {'format': 'docx'}),
+            ('monthly_summary_html', 'GET', reverse('reports:report_monthly_summary'), all_months),
+            ('monthly_summary_xlsx', 'GET', reverse('reports:report_monthly_summary'), {**all_months, 'format': 'xlsx'}),
+            ('monthly_summary_pdf', 'GET', reverse('reports:report_monthly_summary'), {**all_months, 'format': 'pdf'}),
+            ('monthly_summary_docx', 'GET', reverse('reports:report_monthly_summary'), {**all_months, 'format': 'docx'}),
+            ('booking_create', 'POST', reverse('bookings:event_add'), self._booking_post_data(user, booking_lines)),
+        ]
+        if item:
+            targets.append(('availability_report', 'GET', reverse('inventory:report_availability'), {
+                'item': item.pk, 'start_date': today.isoformat(), 'end_date': (today + datetime.timedelta(days=30)).isoformat(),
+            }))
+        if event:
+            targets += [
+                ('delivery_note_event_pdf', 'GET', reverse('bookings:delivery_note_pdf_event', kwargs={'booking_id': event.pk}), {}),
+                ('receipt_event_pdf', 'GET', reverse('bookings:receipt_pdf_event', kwargs={'booking_id': event.pk}), {}),
+            ]
+        if rental:
+            targets += [
+                ('delivery_note_rental_pdf', 'GET', reverse('bookings:delivery_note_pdf_rental', kwargs={'booking_id': rental.pk}), {}),
+                ('receipt_rental_pdf', 'GET', reverse('bookings:receipt_pdf_rental', kwargs={'booking_id': rental.pk}), {}),
+            ]
+        if logistics_event:
+            targets.append(('waybill_pdf', 'GET', reverse('bookings:logistics_waybill_pdf', kwargs={'event_id': logistics_event.pk}), {}))
+        if quote:
+            targets.append(('quote_pdf', 'GET', reverse('request_quote:quote_pdf_view', kwargs={'quote_id': quote.pk}), {}))
+        return targets
+
+    def run_size(self, label, dataset, options):
+        client, user = self._http_client()
+        results = {}
+        for name, method, url, data in self.get_targets(user, options['booking_lines']):
+            if options['only'] and not any(part in name for part in options['only']):
+                continue
+            result = self._measure(client, method, url, data, options['repeat'])
+            results[name] = result
+            self.stdout.write(
+                f"{label:>8} | {name:<26} | {result['status']:>3} | {result['queries']:>6} q | "
+                f"{result['ms_min']:>9.1f} ms min | {result['ms_median']:>9.1f} ms median | {result['bytes']:>9} B"
+            )
+        return {'size': label, 'dataset': dataset, 'results': results}
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1.")
+
+        runs = []
+        if options['current']:
+            runs.append(self.run_size('current', {'items': Item.objects.count()}, options))
+
+        image_dir = os.path.join(settings.MEDIA_ROOT, SYNTHETIC_IMAGE_DIR)
+        keep_images = os.path.isdir(image_dir) # Placeholders of data seeded for real by seed_synthetic_data
+        for size in options['sizes']:
+            self.stdout.write(f"Seeding synthetic dataset of {size} items...")
+            try:
+                with tempfile.TemporaryDirectory() as document_dir, \
+                        override_settings(CACHES=SEEDED_CACHES, DOCUMENT_CACHE_DIR=document_dir), transaction.atomic():
+                    dataset = seed(scaled_counts(size), random.Random(options['seed']))
+                    runs.append(self.run_size(str(size), dataset, options))
+                    raise _Rollback()
+            except _Rollback:
+                pass
+            finally:
+                if not keep_images: # Placeholder images and their derivatives
+                    shutil.rmtree(image_dir, ignore_errors=True)
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'repeat': options['repeat'],
+            'runs': runs,
+        }
+        output = options['output'] or f"benchmark_hot_paths_{timezone.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Benchmark finished. Results written to {output}"))
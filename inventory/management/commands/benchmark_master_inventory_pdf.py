@@ -0,0 +1,106 @@
+# inventory/management/commands/benchmark_master_inventory_pdf.py
+
+import json
+import platform
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from inventory.image_derivatives import derivative_name
+from inventory.models import Item
+from inventory.utils import generate_master_inventory_pdf, get_pdf_image_workers
+from .seed_synthetic_data import scaled_counts, seed
+
+
+class _Rollback(Exception):
+    """ Raised to discard a seeded dataset once its size has been benchmarked. """
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the master inventory PDF at several catalogue sizes with serial and pooled thumbnail preparation. "
+        "Each size is seeded inside a transaction that is rolled back afterwards; the seeded items are given the "
+        "real catalogue photos (cycled) so decoding costs are realistic. 'cold' runs delete the 'pdf' derivatives "
+        "of those photos first, so every thumbnail is rebuilt from its original (the files are recreated by the run)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[100, 1000, 5000], help='Numbers of items in the report.')
+        parser.add_argument('--workers', nargs='+', type=int, help='Pool sizes to compare (default: 1 and PDF_IMAGE_WORKERS).')
+        parser.add_argument('--repeat', type=int, default=2, help='Warm runs per size and pool size; the median is reported.')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic data.')
+        parser.add_argument('--output', help='Optional JSON output path.')
+
+    def catalogue_images(self):
+        names = Item.objects.exclude(image1='').order_by('image1').values_list('image1', flat=True).distinct()
+        return list(names)
+
+    def load_items(self, size, photos):
+        items = list(Item.objects.select_related('category', 'supplier').with_availability().order_by('pk')[:size])
+        if photos:
+            for index, item in enumerate(items):
+                item.image1 = photos[index % len(photos)] # In memory only; nothing is saved
+        return items
+
+    def drop_pdf_thumbnails(self, items):
+        for name in {item.image1.name for item in items if item.image1}:
+            Item._meta.get_field('image1').storage.delete(derivative_name(name, 'pdf'))
+
+    def render(self, items, workers):
+        with override_settings(PDF_IMAGE_WORKERS=workers):
+            start = time.perf_counter()
+            response = generate_master_inventory_pdf(items)
+            return (time.perf_counter() - start) * 1000, len(response.content), int(response['X-Image-Errors'])
+
+    def run_size(self, size, photos, pool_sizes, repeat):
+        items = self.load_items(size, photos)
+        distinct = len({item.image1.name for item in items if item.image1})
+        results = {}
+        for workers in pool_sizes:
+            self.drop_pdf_thumbnails(items)
+            cold_ms, size_bytes, errors = self.render(items, workers)
+            warm = [self.render(items, workers)[0] for run in range(repeat)]
+            results[str(workers)] = {
+                'cold_ms': round(cold_ms, 1), 'warm_ms_median': round(statistics.median(warm), 1),
+                'bytes': size_bytes, 'image_errors': errors,
+            }
+            self.stdout.write(
+                f"{len(items):>6} items ({distinct:>4} images) | {workers:>2} worker(s) | cold {cold_ms:>9.1f} ms | "
+                f"warm {statistics.median(warm):>9.1f} ms | {size_bytes:>10} B | {errors} image error(s)"
+            )
+        return {'items': len(items), 'distinct_images': distinct, 'workers': results}
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        pool_sizes = options['workers'] or sorted({1, get_pdf_image_workers()})
+        photos = self.catalogue_images()
+        if not photos:
+            self.stdout.write(self.style.WARNING("No catalogue photos found; the synthetic placeholder images are used."))
+
+        runs = []
+        for size in options['sizes']:
+            self.stdout.write(f"Seeding synthetic dataset of {size} items...")
+            try:
+                with transaction.atomic():
+                    seed(scaled_counts(size), random.Random(options['seed']))
+                    runs.append(self.run_size(size, photos, pool_sizes, options['repeat']))
+                    raise _Rollback()
+            except _Rollback:
+                pass
+
+        if options['output']:
+            report = {
+                'generated_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'repeat': options['repeat'],
+                'runs': runs,
+            }
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
@@ -0,0 +1,47 @@
+# inventory/management/commands/check_item_occupancy.py
+
+import datetime
+from django.core.management.base import BaseCommand, CommandError
+from inventory.occupancy import find_occupancy_mismatches, refresh_occupancy
+
+
+class Command(BaseCommand):
+    help = 'Compares the ItemDayOccupancy table against a live recomputation from booking lines and reports differences.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to check (YYYY-MM-DD). Defaults to all history.')
+        parser.add_argument('--end', help='Last day to check (YYYY-MM-DD). Defaults to all future bookings.')
+        parser.add_argument('--item', type=int, action='append', dest='item_ids', help='Limit the check to an item id (repeatable).')
+        parser.add_argument('--fix', action='store_true', help='Refresh the mismatching cells from the live data.')
+        parser.add_argument('--limit', type=int, default=50, help='Maximum number of mismatches to print.')
+
+    def _parse_day(self, value, name):
+        if not value:
+            return None
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f"--{name} must be a date in YYYY-MM-DD format.")
+
+    def handle(self, *args, **options):
+        start_day = self._parse_day(options['start'], 'start')
+        end_day = self._parse_day(options['end'], 'end')
+        mismatches = find_occupancy_mismatches(options['item_ids'], start_day, end_day)
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("Item occupancy is consistent with the live booking data."))
+            return
+
+        self.stdout.write(self.style.WARNING(f"Found {len(mismatches)} inconsistent item/day cells:"))
+        for item_id, day, stored, live in mismatches[:options['limit']]:
+            self.stdout.write(f"  item {item_id} on {day}: stored {stored}, live {live}")
+        if len(mismatches) > options['limit']:
+            self.stdout.write(f"  ... and {len(mismatches) - options['limit']} more.")
+
+        if options['fix']:
+            item_ids = {item_id for item_id, _, _, _ in mismatches}
+            days = [day for _, day, _, _ in mismatches]
+            refresh_occupancy(item_ids, min(days), max(days))
+            self.stdout.write(self.style.SUCCESS(f"Refreshed {len(item_ids)} items between {min(days)} and {max(days)}."))
+        else:
+            raise CommandError("Item occupancy is inconsistent. Re-run with --fix or use rebuild_item_occupancy.")
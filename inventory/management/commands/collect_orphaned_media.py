@@ -0,0 +1,117 @@
+# inventory/management/commands/collect_orphaned_media.py
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.image_derivatives import original_name
+from inventory.image_store import item_image_storage, referenced_image_names
+from inventory.models import Item, ItemImage
+
+
+def iter_media_files(location, directory):
+    """ Streams (name relative to the storage root, DirEntry) for every file below `directory`, depth first. """
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        try:
+            entries = os.scandir(os.path.join(location, current))
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                name = f"{current}/{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(name)
+                elif entry.is_file(follow_symlinks=False):
+                    yield name, entry
+
+
+def image_upload_dirs():
+    """ Top-level media directories the item image fields upload to ('item_images'). """
+    fields = [Item._meta.get_field('image1'), Item._meta.get_field('image2'), ItemImage._meta.get_field('image')]
+    return sorted({field.upload_to.strip('/') for field in fields})
+
+
+class Command(BaseCommand):
+    help = (
+        "Streams the item image directories and deletes files no Item/ItemImage row references: replaced or deleted "
+        "originals, and derivatives whose original is no longer referenced. Files are checked against the database "
+        "in batches with indexed lookups. Deletion is throttled (--batch-size / --pause) for use on the live server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report the orphans.')
+        parser.add_argument('--batch-size', type=int, default=200, help='Files checked (and deleted) per batch.')
+        parser.add_argument('--pause', type=float, default=0.2, help='Seconds to sleep after each batch that deleted files.')
+        parser.add_argument('--min-age', type=float, default=24, help='Hours a file must be unmodified before it can be collected; protects uploads whose row is not committed yet.')
+        parser.add_argument('--limit', type=int, help='Stop after deleting this many files.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        self.options = options
+        self.cutoff = time.time() - options['min_age'] * 3600
+        self.stats = {'scanned': 0, 'too_recent': 0, 'orphans': 0, 'orphan_bytes': 0, 'deleted': 0, 'failed': 0}
+        start = time.perf_counter()
+
+        files = (found for directory in image_upload_dirs() for found in iter_media_files(item_image_storage.location, directory))
+        batch = []
+        for name, entry in files:
+            self.stats['scanned'] += 1
+            batch.append((name, entry))
+            if len(batch) >= options['batch_size']:
+                keep_going = self.process_batch(batch)
+                batch = []
+                if not keep_going: # --limit reached
+                    break
+        else:
+            if batch:
+                self.process_batch(batch)
+
+        stats = self.stats
+        deleted = f"{stats['orphans']} would be deleted" if options['dry_run'] else f"{stats['deleted']} deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {stats['scanned']} file(s) in {time.perf_counter() - start:.1f}s: {stats['orphans']} orphan(s) "
+            f"({stats['orphan_bytes'] / 1024 / 1024:.1f} MB), {deleted}, {stats['too_recent']} skipped as too recent, "
+            f"{stats['failed']} failed."
+        ))
+
+    def process_batch(self, batch):
+        """ Checks one batch against the database and deletes its orphans. Returns False once --limit is reached. """
+        # A derivative lives as long as its original is referenced
+        owners = {name: original_name(name) or name for name, entry in batch}
+        referenced = referenced_image_names(set(owners.values()))
+
+        deleted_any = False
+        for name, entry in batch:
+            if owners[name] in referenced:
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime > self.cutoff:
+                self.stats['too_recent'] += 1
+                continue
+            self.stats['orphans'] += 1
+            self.stats['orphan_bytes'] += stat.st_size
+            if self.options['verbosity'] >= 2:
+                self.stdout.write(f"Orphan: {name} ({stat.st_size} bytes)")
+            if self.options['dry_run']:
+                continue
+
+            # Re-checked right before deleting: the row may have been saved since the batch lookup
+            if referenced_image_names([owners[name]]):
+                continue
+            try:
+                item_image_storage.delete(name)
+                self.stats['deleted'] += 1
+                deleted_any = True
+            except OSError as e:
+                self.stats['failed'] += 1
+                self.stderr.write(f"Error deleting {name}: {e}")
+            if self.options['limit'] and self.stats['deleted'] >= self.options['limit']:
+                return False
+
+        if deleted_any and self.options['pause']:
+            time.sleep(self.options['pause'])
+        return True
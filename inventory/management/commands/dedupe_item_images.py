@@ -0,0 +1,107 @@
+# inventory/management/commands/dedupe_item_images.py
+
+import os
+import shutil
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory.image_derivatives import DERIVATIVES, derivative_name
+from inventory.image_store import content_addressed_name, content_hash, is_content_addressed_name, item_image_storage, release_image
+from inventory.models import Item, ItemImage
+
+
+def _link_or_copy(source, target):
+    """ Hard link (no data copied) where the filesystem allows it, a copy otherwise. """
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves every item image referenced by Item.image1/image2 or ItemImage.image to its content-addressed name "
+        "(sha256 of the bytes), so rows holding copies of the same picture share one file, and deletes the copies. "
+        "Existing derivatives are carried over. Files no row references are left to the media GC."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be collapsed.')
+
+    def referenced_names(self):
+        names = set(Item.objects.exclude(image1='').values_list('image1', flat=True).distinct())
+        names |= set(Item.objects.exclude(image2='').exclude(image2__isnull=True).values_list('image2', flat=True).distinct())
+        names |= set(ItemImage.objects.exclude(image='').values_list('image', flat=True).distinct())
+        return sorted(names)
+
+    def repoint(self, old_name, new_name):
+        """ Points every image column holding old_name at new_name. Returns the number of rows updated. """
+        with transaction.atomic():
+            # update() skips the signals on purpose: the content is unchanged, only its name is
+            updated = Item.objects.filter(image1=old_name).update(image1=new_name)
+            updated += Item.objects.filter(image2=old_name).update(image2=new_name)
+            updated += ItemImage.objects.filter(image=old_name).update(image=new_name)
+        return updated
+
+    def carry_over_derivatives(self, old_name, new_name):
+        storage = item_image_storage
+        for kind in DERIVATIVES:
+            old_derivative, new_derivative = derivative_name(old_name, kind), derivative_name(new_name, kind)
+            if storage.exists(old_derivative) and not storage.exists(new_derivative):
+                _link_or_copy(storage.path(old_derivative), storage.path(new_derivative))
+
+    def handle(self, *args, **options):
+        storage = item_image_storage
+        dry_run = options['dry_run']
+        start = time.perf_counter()
+        names = self.referenced_names()
+        blobs = {}
+        already = collapsed = rows = missing = failed = freed_bytes = 0
+
+        for name in names:
+            if is_content_addressed_name(name):
+                already += 1
+                blobs.setdefault(name, []).append(name)
+                continue
+            if not storage.exists(name):
+                missing += 1
+                self.stderr.write(f"Original not found, left as is: {name}")
+                continue
+            try:
+                with storage.open(name, 'rb') as original:
+                    target = content_addressed_name(name, content_hash(original))
+                size = storage.size(name)
+            except OSError as e:
+                failed += 1
+                self.stderr.write(f"Error reading {name}: {e}")
+                continue
+
+            duplicate = target in blobs or storage.exists(target)
+            blobs.setdefault(target, []).append(name)
+            if duplicate:
+                freed_bytes += size
+            collapsed += 1
+            if dry_run:
+                continue
+
+            try:
+                if not storage.exists(target):
+                    _link_or_copy(storage.path(name), storage.path(target))
+                self.carry_over_derivatives(name, target)
+                rows += self.repoint(name, target)
+                release_image(name, storage) # Nothing references the old name any more
+            except OSError as e:
+                failed += 1
+                self.stderr.write(f"Error moving {name} to {target}: {e}")
+
+        shared = sum(1 for sources in blobs.values() if len(sources) > 1)
+        elapsed = time.perf_counter() - start
+        prefix = "[dry run] " if dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{len(names)} referenced image name(s) -> {len(blobs)} unique file(s) in {elapsed:.1f}s: "
+            f"{collapsed} renamed, {already} already content-addressed, {shared} file(s) shared by several names, "
+            f"{rows} row(s) updated, {freed_bytes / 1024 / 1024:.1f} MB of duplicates freed, {missing} missing, {failed} failed."
+        ))
@@ -0,0 +1,15 @@
+# inventory/management/commands/rebuild_item_occupancy.py
+
+import time
+from django.core.management.base import BaseCommand
+from inventory.occupancy import rebuild_occupancy
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the ItemDayOccupancy table from scratch from the live event/rental item lines.'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rows_written = rebuild_occupancy()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt item occupancy: {rows_written} rows in {elapsed:.2f}s."))
@@ -0,0 +1,261 @@
+# inventory/management/commands/seed_synthetic_data.py
+
+import datetime
+import os
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from bookings.models import Event, Rental, EventItem, RentalItem
+from clients.models import Client
+from inventory.models import Category, Item
+from inventory.occupancy import rebuild_occupancy
+from request_quote.models import QuoteRequest, QuoteRequestItem
+
+# Every seeded row carries this marker so --clear only ever removes synthetic data
+SYNTHETIC_MARKER = '[synthetic]'
+SYNTHETIC_EMAIL_DOMAIN = 'synthetic.invalid'
+SYNTHETIC_IMAGE_DIR = 'item_images/synthetic'
+
+CATEGORY_NAMES = [
+    'Furniture', 'Linens', 'AV Equipment', 'Lighting', 'Staging', 'Tents', 'Catering',
+    'Decor', 'Signage', 'Power', 'Flooring', 'Heating & Cooling', 'Barriers', 'Glassware',
+]
+ITEM_ADJECTIVES = ['White', 'Black', 'Gold', 'Silver', 'Clear', 'Folding', 'Round', 'Square', 'Outdoor', 'Premium', 'Compact', 'Large']
+ITEM_NOUNS = ['Chair', 'Table', 'Tablecloth', 'Speaker', 'Projector', 'Uplight', 'Stage Deck', 'Marquee', 'Chafing Dish', 'Vase', 'Banner Stand', 'Generator', 'Carpet Tile', 'Fan', 'Crowd Barrier', 'Wine Glass']
+EVENT_KINDS = ['Wedding', 'Gala Dinner', 'Conference', 'Product Launch', 'Exhibition', 'Birthday', 'Corporate Retreat', 'Award Night']
+LOCATIONS = ['Manama', 'Muharraq', 'Riffa', 'Seef', 'Juffair', 'Amwaj', 'Sakhir', 'Budaiya', 'Hamad Town', 'Isa Town']
+COMPANY_SUFFIXES = ['Events', 'Holdings', 'Group', 'Trading', 'Hospitality', 'Consulting']
+FIRST_NAMES = ['Ahmed', 'Fatima', 'Ali', 'Maryam', 'Hassan', 'Noor', 'Omar', 'Layla', 'Yousif', 'Sara']
+LAST_NAMES = ['Al Khalifa', 'Haddad', 'Rashid', 'Mansoor', 'Qassim', 'Saleh', 'Jaffar', 'Nasser']
+
+
+def scaled_counts(items):
+    """ Realistic relative sizes for a catalogue of `items` items (used by benchmark_hot_paths). """
+    return {
+        'categories': min(len(CATEGORY_NAMES), max(3, items // 25)),
+        'items': items,
+        'clients': max(5, items // 5),
+        'events': max(5, items // 2),
+        'rentals': max(5, items // 2),
+        'quotes': max(2, items // 10),
+        'max_lines': 8,
+        'images': min(20, items),
+    }
+
+
+def _placeholder_images(count, rng):
+    """ Writes `count` small solid-colour JPEGs under MEDIA_ROOT and returns their storage names. """
+    if not count:
+        return []
+    from PIL import Image as PILImage
+    directory = os.path.join(settings.MEDIA_ROOT, SYNTHETIC_IMAGE_DIR)
+    os.makedirs(directory, exist_ok=True)
+    names = []
+    for index in range(count):
+        name = f"{SYNTHETIC_IMAGE_DIR}/placeholder_{index:03d}.jpg"
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        if not os.path.exists(path):
+            colour = (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))
+            PILImage.new('RGB', (800, 600), colour).save(path, 'JPEG', quality=85)
+        names.append(name)
+    return names
+
+
+def _booking_window(rng, now, history_days, future_days, max_duration_days):
+    """ Start/end drawn around `now`, denser close to today, starting during working hours. """
+    offset_days = rng.triangular(-history_days, future_days, 0)
+    start = now + datetime.timedelta(days=offset_days)
+    start = start.replace(hour=rng.randint(7, 18), minute=rng.choice([0, 15, 30, 45]), second=0, microsecond=0)
+    duration = datetime.timedelta(days=rng.randint(0, max_duration_days), hours=rng.randint(2, 10))
+    return start, start + duration
+
+
+def _status_for(rng, now, start, end, past, current, future, extra_past=None):
+    """ Status consistent with the window, with a few cancellations (and e.g. overdue rentals). """
+    if rng.random() < 0.05:
+        return 'CANCELLED'
+    if end < now:
+        if extra_past and rng.random() < 0.05:
+            return extra_past
+        return past
+    if start <= now:
+        return current
+    return future
+
+
+def seed(counts, rng, history_days=365, future_days=120, batch_size=500):
+    """
+    Bulk-inserts synthetic categories, items, clients, events, rentals, quotes and their item lines.
+    Returns the number of rows created per model. Occupancy is rebuilt once at the end because
+    bulk_create bypasses the signals that normally maintain it.
+    """
+    now = timezone.now()
+    created = {}
+
+    categories = Category.objects.bulk_create([
+        Category(name=f"{SYNTHETIC_MARKER} {CATEGORY_NAMES[index % len(CATEGORY_NAMES)]} {index // len(CATEGORY_NAMES) or ''}".strip())
+        for index in range(counts['categories'])
+    ])
+    created['categories'] = len(categories)
+
+    images = _placeholder_images(counts.get('images', 0), rng)
+    items = []
+    for index in range(counts['items']):
+        category = rng.choice(categories)
+        initial_quantity = rng.choice([rng.randint(1, 10), rng.randint(10, 80), rng.randint(50, 400)])
+        items.append(Item(
+            name=f"{rng.choice(ITEM_ADJECTIVES)} {rng.choice(ITEM_NOUNS)} {index + 1}",
+            description=SYNTHETIC_MARKER,
+            sku=f"SYN-{rng.getrandbits(48):012x}", # Replaced with the usual PREFIX-pk format below
+            category=category,
+            storage_location=f"Warehouse {rng.choice('ABC')}, Shelf {rng.randint(1, 40)}",
+            initial_quantity=initial_quantity,
+            rent_price_per_day=rng.randint(1, 200),
+            purchase_price=rng.randint(5, 2000),
+            image1=images[index % len(images)] if images else '',
+        ))
+    items = Item.objects.bulk_create(items, batch_size=batch_size)
+    for item in items:
+        prefix = ''.join(filter(str.isalnum, item.category.name.replace(SYNTHETIC_MARKER, '').upper()))[:2]
+        item.sku = f"{prefix}-{str(item.pk).zfill(6)}"
+    Item.objects.bulk_update(items, ['sku'], batch_size=batch_size)
+    created['items'] = len(items)
+
+    clients = []
+    for index in range(counts['clients']):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        is_company = rng.random() < 0.6
+        clients.append(Client(
+            name=f"{first} {last}",
+            company_name=f"{last} {rng.choice(COMPANY_SUFFIXES)}" if is_company else None,
+            email=f"client{index}.{rng.getrandbits(32):08x}@{SYNTHETIC_EMAIL_DOMAIN}",
+            phone=f"+973 {rng.randint(3000, 3999)} {rng.randint(1000, 9999)}",
+            address=f"{SYNTHETIC_MARKER} Block {rng.randint(100, 999)}, {rng.choice(LOCATIONS)}",
+        ))
+    clients = Client.objects.bulk_create(clients, batch_size=batch_size)
+    created['clients'] = len(clients)
+
+    # Deterministic references: the random uuid-based defaults collide at tens of thousands of rows
+    events = []
+    for index in range(counts['events']):
+        start, end = _booking_window(rng, now, history_days, future_days, max_duration_days=3)
+        logistics_only = rng.random() < 0.1
+        events.append(Event(
+            reference_number=f"SYN-EVT-{index:07d}",
+            client=rng.choice(clients),
+            event_name=f"{rng.choice(EVENT_KINDS)} #{index + 1}",
+            event_location=rng.choice(LOCATIONS),
+            start_date=start, end_date=end,
+            status=_status_for(rng, now, start, end, 'COMPLETED', 'ACTIVE', 'PLANNED'),
+            is_logistics_only_service=logistics_only,
+            description_of_goods="Pallets of event material" if logistics_only else None,
+            notes=SYNTHETIC_MARKER,
+        ))
+    events = Event.objects.bulk_create(events, batch_size=batch_size)
+    created['events'] = len(events)
+
+    rentals = []
+    for index in range(counts['rentals']):
+        start, end = _booking_window(rng, now, history_days, future_days, max_duration_days=14)
+        rentals.append(Rental(
+            reference_number=f"SYN-RNT-{index:07d}",
+            client=rng.choice(clients),
+            start_date=start, end_date=end,
+            status=_status_for(rng, now, start, end, 'RETURNED', 'OUT', 'BOOKED', extra_past='OVERDUE'),
+            delivery_location=rng.choice(LOCATIONS),
+            notes=SYNTHETIC_MARKER,
+        ))
+    rentals = Rental.objects.bulk_create(rentals, batch_size=batch_size)
+    created['rentals'] = len(rentals)
+
+    quotes = []
+    for index in range(counts['quotes']):
+        start, end = _booking_window(rng, now, history_days // 4, future_days, max_duration_days=3)
+        quotes.append(QuoteRequest(
+            reference_number=f"SYN-QUO-{index:07d}",
+            client=rng.choice(clients),
+            event_title=f"{rng.choice(EVENT_KINDS)} quote #{index + 1}",
+            event_start_date=start, event_end_date=end,
+            setup_installation_datetime=start - datetime.timedelta(hours=6),
+            setup_removal_datetime=end + datetime.timedelta(hours=4),
+            project_manager_notes=SYNTHETIC_MARKER,
+        ))
+    quotes = QuoteRequest.objects.bulk_create(quotes, batch_size=batch_size)
+    created['quotes'] = len(quotes)
+
+    def lines_for(model, bookings):
+        lines = []
+        for booking in bookings:
+            if getattr(booking, 'is_logistics_only_service', False):
+                continue
+            for item in rng.sample(items, min(len(items), rng.randint(1, counts['max_lines']))):
+                lines.append(model(booking=booking, item=item, quantity=rng.randint(1, max(1, item.initial_quantity // 3))))
+        return model.objects.bulk_create(lines, batch_size=batch_size)
+
+    created['event_items'] = len(lines_for(EventItem, events))
+    created['rental_items'] = len(lines_for(RentalItem, rentals))
+    created['quote_items'] = len(lines_for(QuoteRequestItem, quotes))
+    created['occupancy_rows'] = rebuild_occupancy(batch_size=batch_size)
+    return created
+
+
+def clear_synthetic_data():
+    """ Deletes every row created by seed(). Returns the number of rows deleted per model. """
+    deleted = {}
+    deleted['events'] = Event.objects.filter(notes=SYNTHETIC_MARKER).delete()[0]
+    deleted['rentals'] = Rental.objects.filter(notes=SYNTHETIC_MARKER).delete()[0]
+    deleted['quotes'] = QuoteRequest.objects.filter(project_manager_notes=SYNTHETIC_MARKER).delete()[0]
+    deleted['items'] = Item.objects.filter(description=SYNTHETIC_MARKER).delete()[0]
+    deleted['clients'] = Client.objects.filter(email__endswith=f"@{SYNTHETIC_EMAIL_DOMAIN}").delete()[0]
+    deleted['categories'] = Category.objects.filter(name__startswith=SYNTHETIC_MARKER).delete()[0]
+    rebuild_occupancy()
+    return deleted
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds synthetic categories, items, clients, events, rentals and quotes with realistic date "
+        "distributions, for load testing. All rows are tagged so --clear removes only synthetic data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=500, help='Number of items; other counts scale from it unless given explicitly.')
+        parser.add_argument('--categories', type=int, help='Number of categories.')
+        parser.add_argument('--clients', type=int, help='Number of clients.')
+        parser.add_argument('--events', type=int, help='Number of events.')
+        parser.add_argument('--rentals', type=int, help='Number of rentals.')
+        parser.add_argument('--quotes', type=int, help='Number of quote requests.')
+        parser.add_argument('--max-lines', type=int, help='Maximum item lines per booking.')
+        parser.add_argument('--images', type=int, help='Number of distinct placeholder images shared by the items (0 for none).')
+        parser.add_argument('--history-days', type=int, default=365, help='How far back bookings may start.')
+        parser.add_argument('--future-days', type=int, default=120, help='How far ahead bookings may start.')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed, for reproducible datasets.')
+        parser.add_argument('--clear', action='store_true', help='Delete previously seeded synthetic data first.')
+        parser.add_argument('--clear-only', action='store_true', help='Delete previously seeded synthetic data and exit.')
+
+    def handle(self, *args, **options):
+        if options['items'] < 1:
+            raise CommandError("--items must be at least 1.")
+
+        with transaction.atomic():
+            if options['clear'] or options['clear_only']:
+                deleted = clear_synthetic_data()
+                self.stdout.write(f"Deleted synthetic rows (including cascaded rows): {deleted}")
+                if options['clear_only']:
+                    return
+
+            counts = scaled_counts(options['items'])
+            for key in ('categories', 'clients', 'events', 'rentals', 'quotes', 'max_lines', 'images'):
+                if options[key] is not None:
+                    counts[key] = options[key]
+            if counts['categories'] < 1:
+                raise CommandError("--categories must be at least 1.")
+
+            self.stdout.write(f"Seeding: {counts}")
+            created = seed(counts, random.Random(options['seed']), options['history_days'], options['future_days'])
+
+        self.stdout.write(self.style.SUCCESS(f"Created: {created}"))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_occupancy(apps, schema_editor):
+    from inventory.occupancy import compute_occupancy
+    ItemDayOccupancy = apps.get_model('inventory', 'ItemDayOccupancy')
+    cells = compute_occupancy(
+        event_item_model=apps.get_model('bookings', 'EventItem'),
+        rental_item_model=apps.get_model('bookings', 'RentalItem'),
+    )
+    ItemDayOccupancy.objects.bulk_create(
+        (ItemDayOccupancy(item_id=item_id, day=day, reserved_quantity=quantity) for (item_id, day), quantity in cells.items()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_itemimage'),
+        ('bookings', '0006_event_project_manager_rental_project_manager'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemDayOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('reserved_quantity', models.PositiveIntegerField(default=0)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_occupancy', to='inventory.item')),
+            ],
+            options={
+                'verbose_name': 'Item Day Occupancy',
+                'verbose_name_plural': 'Item Day Occupancy',
+                'indexes': [models.Index(fields=['day', 'item'], name='item_occupancy_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('item', 'day'), name='unique_item_day_occupancy')],
+            },
+        ),
+        migrations.RunPython(populate_occupancy, migrations.RunPython.noop),
+    ]
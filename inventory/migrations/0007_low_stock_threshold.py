@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_itemdayoccupancy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='low_stock_threshold',
+            field=models.PositiveIntegerField(blank=True, help_text='Items in this category are flagged as low stock at or below this many available units (optional; inherited by subcategories).', null=True),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='low_stock_threshold',
+            field=models.PositiveIntegerField(blank=True, help_text='Flag this item as low stock at or below this many available units (optional; overrides the category threshold).', null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:38
+
+import inventory.image_store
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_low_stock_threshold'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='item',
+            name='image1',
+            field=models.ImageField(db_index=True, help_text='Primary image of the item.', storage=inventory.image_store.ContentAddressedStorage(), upload_to='item_images/'),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='image2',
+            field=models.ImageField(blank=True, db_index=True, help_text='Optional second image of the item.', null=True, storage=inventory.image_store.ContentAddressedStorage(), upload_to='item_images/'),
+        ),
+        migrations.AlterField(
+            model_name='itemimage',
+            name='image',
+            field=models.ImageField(db_index=True, storage=inventory.image_store.ContentAddressedStorage(), upload_to='item_images/'),
+        ),
+    ]
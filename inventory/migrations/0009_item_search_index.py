@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:02
+
+import django.db.models.deletion
+import reports.full_text_search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemSearchEntry',
+            fields=[
+                ('item', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='inventory.item')),
+                ('document', reports.full_text_search.FullTextField(db_column='inventory_item_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'inventory_item_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,12 +1,20 @@
 # clavis_event_inventory/inventory/models.py
 
 from django.db import models
-from django.db.models import Q, Sum # Ensure Q and Sum are imported
+from django.db.models import Q, Sum, F, OuterRef, Subquery, IntegerField, Value # Ensure Q and Sum are imported
+from django.db.models.functions import Coalesce, Greatest
+from .availability import load_booking_intervals, peak_concurrent_usage
+from .image_store import item_image_storage
+from reports.full_text_search import FullTextField
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from django.conf import settings
 import datetime # Import datetime
 
+# Fallback low-stock threshold when neither the item nor its category (or parent category) sets one
+DEFAULT_LOW_STOCK_THRESHOLD = getattr(settings, 'LOW_STOCK_THRESHOLD', 3)
+
 # Top-level try-except for initial app loading for Event and Rental (for StatusChoices)
 try:
     from bookings.models import Event, Rental
@@ -30,6 +38,11 @@ class Category(models.Model):
         related_name='subcategories',
         help_text="Optional parent category for creating hierarchies."
     )
+    low_stock_threshold = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Items in this category are flagged as low stock at or below this many available units (optional; inherited by subcategories)."
+    )
 
     class Meta:
         verbose_name_plural = "Categories"
@@ -40,6 +53,78 @@ class Category(models.Model):
             return f"{self.parent} > {self.name}"
         return self.name
 
+def day_bounds(target_date):
+    """ Returns timezone-aware datetimes for the start and end of target_date. """
+    start_of_day = timezone.make_aware(datetime.datetime.combine(target_date, datetime.time.min))
+    end_of_day = timezone.make_aware(datetime.datetime.combine(target_date, datetime.time.max))
+    return start_of_day, end_of_day
+
+def _sum_subquery(queryset):
+    """ Wraps a booking-item queryset (already filtered on item=OuterRef('pk')) as a SUM(quantity) subquery. """
+    summed = queryset.order_by().values('item').annotate(total=Sum('quantity')).values('total')
+    return Coalesce(Subquery(summed, output_field=IntegerField()), Value(0))
+
+class ItemQuerySet(models.QuerySet):
+    """
+    Set-based availability for any Item queryset.
+    Reads the materialized ItemDayOccupancy row for the day plus rentals that are past their end date
+    but still OUT/OVERDUE (open-ended, so not materialized), all as correlated subqueries in a single SELECT.
+    Unlike Item.get_assigned_quantity_on_date, an OVERDUE rental also counts on its own scheduled days.
+    """
+
+    def with_availability(self, target_date=None):
+        """
+        Annotates `currently_assigned` and `available_quantity` for target_date (default: today).
+        The Item properties of the same name return these values when present.
+        """
+        from bookings.models import RentalItem
+        if Event is None or Rental is None:
+            return self.annotate(currently_assigned=Value(0), available_quantity=F('initial_quantity'))
+
+        if target_date is None:
+            target_date = timezone.now().date()
+        start_of_day, end_of_day = day_bounds(target_date)
+
+        reserved_qty = Coalesce(Subquery(
+            ItemDayOccupancy.objects.filter(item=OuterRef('pk'), day=target_date).values('reserved_quantity')[:1],
+            output_field=IntegerField()
+        ), Value(0))
+
+        rentals_physically_out_overdue_statuses = [Rental.StatusChoices.OUT, Rental.StatusChoices.OVERDUE]
+        past_due_rental_qty = _sum_subquery(RentalItem.objects.filter(
+            item=OuterRef('pk'),
+            booking__end_date__lt=start_of_day,
+            booking__status__in=rentals_physically_out_overdue_statuses
+        ))
+
+        return self.annotate(
+            currently_assigned=reserved_qty + past_due_rental_qty,
+        ).annotate(
+            available_quantity=Greatest(F('initial_quantity') - F('currently_assigned'), Value(0)),
+        )
+
+    def with_low_stock_threshold(self):
+        """ Annotates `effective_low_stock_threshold`: the item's own, else its category's, else the parent category's, else the default. """
+        return self.annotate(effective_low_stock_threshold=Coalesce(
+            'low_stock_threshold',
+            'category__low_stock_threshold',
+            'category__parent__low_stock_threshold',
+            Value(DEFAULT_LOW_STOCK_THRESHOLD),
+            output_field=IntegerField(),
+        ))
+
+    def low_stock(self, target_date=None):
+        """
+        Items whose availability on target_date (default: today) is at or below their effective threshold,
+        scarcest first. Filtering, ordering and limiting all happen in SQL.
+        """
+        return (
+            self.with_availability(target_date)
+            .with_low_stock_threshold()
+            .filter(available_quantity__lte=F('effective_low_stock_threshold'))
+            .order_by('available_quantity', 'name')
+        )
+
 class Item(models.Model):
     """Represents a distinct type of inventory item available for rent/events."""
 
@@ -98,6 +183,11 @@ class Item(models.Model):
         default=0,
         help_text="Total number of this specific item owned or received from client." # Updated help_text
     )
+    low_stock_threshold = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Flag this item as low stock at or below this many available units (optional; overrides the category threshold)."
+    )
 
     depth = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, help_text="Depth dimension (optional).")
     width = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, help_text="Width dimension (optional).")
@@ -109,8 +199,9 @@ class Item(models.Model):
         help_text="Units for the dimensions provided (Depth x Width x Height)."
     )
 
-    image1 = models.ImageField( upload_to='item_images/', help_text="Primary image of the item." ) # Consider making optional if client items might not have images
-    image2 = models.ImageField( upload_to='item_images/', blank=True, null=True, help_text="Optional second image of the item." )
+    # Content-addressed: identical uploads share one file (see inventory.image_store); indexed for the reference counts
+    image1 = models.ImageField( upload_to='item_images/', storage=item_image_storage, db_index=True, help_text="Primary image of the item." ) # Consider making optional if client items might not have images
+    image2 = models.ImageField( upload_to='item_images/', storage=item_image_storage, db_index=True, blank=True, null=True, help_text="Optional second image of the item." )
  
     purchase_price = models.DecimalField( 
         max_digits=10, decimal_places=2, null=True, blank=True, 
@@ -130,10 +221,15 @@ class Item(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ItemQuerySet.as_manager()
+
     # --- Calculated fields / Methods ---
 
     def get_assigned_quantity_in_range(self, start_date, end_date, exclude_event_pk=None, exclude_rental_pk=None):
-        """ Calculates SUM of quantities from bookings OVERLAPPING the date range, optionally excluding a booking. """
+        """
+        Calculates SUM of quantities from bookings OVERLAPPING the date range, optionally excluding a booking.
+        Note: back-to-back bookings inside the range are all counted; availability checks use get_peak_usage_in_range.
+        """
         from bookings.models import EventItem, RentalItem 
         if Event is None or Rental is None: return 0
 
@@ -150,8 +246,29 @@ class Item(models.Model):
         
         return overlapping_event_qty + overlapping_rental_qty
 
+    def get_booking_intervals_in_range(self, start_date, end_date, exclude_event_pk=None, exclude_rental_pk=None):
+        """ Loads the (start, end, quantity) intervals of every blocking booking OVERLAPPING the range, one query per booking type. """
+        if Event is None or Rental is None: return []
+        intervals = load_booking_intervals( [self.pk], start_date, end_date, exclude_event_pk=exclude_event_pk, exclude_rental_pk=exclude_rental_pk )
+        return intervals.get(self.pk, [])
+
+    def get_peak_usage_in_range(self, start_date, end_date, exclude_event_pk=None, exclude_rental_pk=None):
+        """
+        Maximum quantity booked at any single moment of the range (sweep-line over the overlapping bookings),
+        with the moment it occurs and the bookings responsible. See inventory.availability.peak_concurrent_usage.
+        """
+        intervals = self.get_booking_intervals_in_range( start_date, end_date, exclude_event_pk=exclude_event_pk, exclude_rental_pk=exclude_rental_pk )
+        return peak_concurrent_usage(intervals, start_date, end_date)
+
+    def check_availability(self, quantity_needed, start_date, end_date, exclude_event_pk=None, exclude_rental_pk=None):
+        """ Like is_available, but returns the peak usage details plus 'available' and 'is_available' keys. """
+        peak = self.get_peak_usage_in_range( start_date, end_date, exclude_event_pk=exclude_event_pk, exclude_rental_pk=exclude_rental_pk )
+        peak['available'] = max(0, self.initial_quantity - peak['peak_quantity'])
+        peak['is_available'] = quantity_needed <= 0 or peak['available'] >= quantity_needed
+        return peak
+
     def is_available(self, quantity_needed, start_date, end_date, exclude_event_pk=None, exclude_rental_pk=None):
-        """ Checks availability using the simple overlapping sum logic, optionally excluding a specific booking. """
+        """ Checks availability against the PEAK concurrent usage in the range, optionally excluding a specific booking. """
         if self.item_source == self.ItemSourceType.CLIENT_SUPPLIED:
             # Client-supplied items are only available for their specific event context,
             # general availability check might not be appropriate here or needs different logic.
@@ -161,9 +278,7 @@ class Item(models.Model):
             pass # Let it proceed with normal logic for now, but flag for review.
 
         if quantity_needed <= 0: return True
-        assigned_during_period = self.get_assigned_quantity_in_range( start_date, end_date, exclude_event_pk=exclude_event_pk, exclude_rental_pk=exclude_rental_pk )
-        potential_available = self.initial_quantity - assigned_during_period
-        return potential_available >= quantity_needed
+        return self.check_availability( quantity_needed, start_date, end_date, exclude_event_pk=exclude_event_pk, exclude_rental_pk=exclude_rental_pk )['is_available']
 
     def get_assigned_quantity_on_date(self, target_date):
         """ 
@@ -179,8 +294,7 @@ class Item(models.Model):
             return 0
 
         try:
-            start_of_day = timezone.make_aware(datetime.datetime.combine(target_date, datetime.time.min))
-            end_of_day = timezone.make_aware(datetime.datetime.combine(target_date, datetime.time.max))
+            start_of_day, end_of_day = day_bounds(target_date)
         except Exception as e:
             print(f"Error creating aware datetimes in get_assigned_quantity_on_date: {e}")
             return 0
@@ -213,19 +327,33 @@ class Item(models.Model):
         total_assigned = assigned_event_qty + assigned_rental_qty
         return total_assigned
 
+    # Both properties prefer values annotated by ItemQuerySet.with_availability();
+    # the setters let Django assign those annotations onto the instance.
     @property
     def currently_assigned(self):
+        if '_currently_assigned' in self.__dict__:
+            return self.__dict__['_currently_assigned']
         today = timezone.now().date()
         return self.get_assigned_quantity_on_date(today)
 
+    @currently_assigned.setter
+    def currently_assigned(self, value):
+        self.__dict__['_currently_assigned'] = value
+
     @property
     def available_quantity(self):
         # For client-supplied items, this might represent "available from what client gave us"
         # rather than "available for any booking".
         # The core logic might still work if initial_quantity is set to what client supplied.
+        if '_available_quantity' in self.__dict__:
+            return self.__dict__['_available_quantity']
         assigned_now = self.currently_assigned
         return max(0, self.initial_quantity - assigned_now)
 
+    @available_quantity.setter
+    def available_quantity(self, value):
+        self.__dict__['_available_quantity'] = value
+
     def save(self, *args, **kwargs):
         is_new = self.pk is None
         # If it's a client-supplied item, some fields might not be relevant
@@ -250,10 +378,48 @@ class Item(models.Model):
     class Meta:
         ordering = ['category', 'name']
         
+class ItemSearchEntry(models.Model):
+    """
+    Row of the FTS5 index of the item search (inventory.search), one per item. The table and the triggers
+    keeping it in sync are created after migrate, only on SQLite; hence not managed by migrations.
+    """
+    item = models.OneToOneField(Item, primary_key=True, db_column='rowid', on_delete=models.DO_NOTHING, related_name='search_entry')
+    document = FullTextField(db_column='inventory_item_fts') # The hidden column MATCH runs against
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'inventory_item_fts'
+
 class ItemImage(models.Model):
     item = models.ForeignKey(Item, related_name='extra_images', on_delete=models.CASCADE)
-    image = models.ImageField(upload_to='item_images/')
+    image = models.ImageField(upload_to='item_images/', storage=item_image_storage, db_index=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"Image for {self.item.name}"
+
+
+class ItemDayOccupancy(models.Model):
+    """
+    Materialized per-item, per-day reserved quantity.
+    One row per (item, local calendar day) with the summed quantity of every blocking
+    booking line (PLANNED/ACTIVE events, BOOKED/OUT/OVERDUE rentals) scheduled on that day.
+    Kept up to date incrementally by inventory.signals; see inventory.occupancy.
+    """
+    item = models.ForeignKey(Item, related_name='day_occupancy', on_delete=models.CASCADE)
+    day = models.DateField()
+    reserved_quantity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Item Day Occupancy"
+        verbose_name_plural = "Item Day Occupancy"
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'day'], name='unique_item_day_occupancy'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'item'], name='item_occupancy_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} @ {self.day}: {self.reserved_quantity}"
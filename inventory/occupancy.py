@@ -0,0 +1,173 @@
+# clavis_event_inventory/inventory/occupancy.py
+
+"""
+Maintenance and lookups for the materialized ItemDayOccupancy table.
+
+Every write path recomputes the affected (item, day) cells from the live
+EventItem/RentalItem rows instead of applying +/- deltas, so a refresh is
+idempotent and a missed or duplicated signal can never drift the table.
+Refreshes requested inside a transaction are coalesced and run once on commit.
+"""
+
+import datetime
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .availability import BLOCKING_EVENT_STATUSES, BLOCKING_RENTAL_STATUSES
+from .models import ItemDayOccupancy, day_bounds
+
+
+def booking_days(start_date, end_date):
+    """ (first, last) local calendar day covered by a booking's datetimes. """
+    return timezone.localtime(start_date).date(), timezone.localtime(end_date).date()
+
+
+def is_blocking(booking, status=None):
+    """ True if the booking's status (or the given status, e.g. a previous one) reserves stock. """
+    from bookings.models import Event
+    statuses = BLOCKING_EVENT_STATUSES if isinstance(booking, Event) else BLOCKING_RENTAL_STATUSES
+    return (booking.status if status is None else status) in statuses
+
+
+def compute_occupancy(item_ids=None, start_day=None, end_day=None, event_item_model=None, rental_item_model=None):
+    """
+    Recomputes occupancy from the live booking lines.
+    Returns {(item_id, day): reserved_quantity} for non-zero cells, optionally limited to
+    item_ids and/or [start_day, end_day]. The model arguments let migrations pass historical models.
+    """
+    if event_item_model is None or rental_item_model is None:
+        from bookings.models import EventItem, RentalItem
+        event_item_model, rental_item_model = EventItem, RentalItem
+
+    line_filter = Q()
+    if item_ids is not None:
+        line_filter &= Q(item_id__in=list(item_ids))
+    if start_day is not None:
+        line_filter &= Q(booking__end_date__gte=day_bounds(start_day)[0])
+    if end_day is not None:
+        line_filter &= Q(booking__start_date__lte=day_bounds(end_day)[1])
+
+    lines = []
+    for model, statuses in ((event_item_model, BLOCKING_EVENT_STATUSES), (rental_item_model, BLOCKING_RENTAL_STATUSES)):
+        lines.extend(
+            model.objects.filter(line_filter, booking__status__in=statuses)
+            .values_list('item_id', 'booking__start_date', 'booking__end_date', 'quantity')
+        )
+
+    cells = defaultdict(int)
+    one_day = datetime.timedelta(days=1)
+    for item_id, booking_start, booking_end, quantity in lines:
+        first_day, last_day = booking_days(booking_start, booking_end)
+        if start_day is not None and first_day < start_day: first_day = start_day
+        if end_day is not None and last_day > end_day: last_day = end_day
+        day = first_day
+        while day <= last_day:
+            cells[(item_id, day)] += quantity
+            day += one_day
+    return cells
+
+
+def refresh_occupancy(item_ids, start_day, end_day):
+    """ Rewrites the occupancy rows of item_ids within [start_day, end_day] from the live booking lines. """
+    item_ids = set(item_ids)
+    if not item_ids or start_day is None or end_day is None:
+        return
+    cells = compute_occupancy(item_ids, start_day, end_day)
+    with transaction.atomic():
+        ItemDayOccupancy.objects.filter(item_id__in=item_ids, day__range=(start_day, end_day)).delete()
+        ItemDayOccupancy.objects.bulk_create(
+            ItemDayOccupancy(item_id=item_id, day=day, reserved_quantity=quantity)
+            for (item_id, day), quantity in cells.items() if quantity > 0
+        )
+
+
+def rebuild_occupancy(batch_size=1000):
+    """ Reconstructs the whole table from scratch. Returns the number of rows written. """
+    cells = compute_occupancy()
+    with transaction.atomic():
+        ItemDayOccupancy.objects.all().delete()
+        ItemDayOccupancy.objects.bulk_create(
+            (ItemDayOccupancy(item_id=item_id, day=day, reserved_quantity=quantity)
+             for (item_id, day), quantity in cells.items() if quantity > 0),
+            batch_size=batch_size,
+        )
+    return len(cells)
+
+
+def find_occupancy_mismatches(item_ids=None, start_day=None, end_day=None):
+    """
+    Consistency check: compares the stored rows with a live recomputation.
+    Returns a list of (item_id, day, stored_quantity, live_quantity) for every differing cell.
+    """
+    live = compute_occupancy(item_ids, start_day, end_day)
+    stored_rows = ItemDayOccupancy.objects.all()
+    if item_ids is not None:
+        stored_rows = stored_rows.filter(item_id__in=list(item_ids))
+    if start_day is not None:
+        stored_rows = stored_rows.filter(day__gte=start_day)
+    if end_day is not None:
+        stored_rows = stored_rows.filter(day__lte=end_day)
+    stored = {(item_id, day): quantity for item_id, day, quantity in stored_rows.values_list('item_id', 'day', 'reserved_quantity')}
+
+    mismatches = []
+    for key in sorted(set(live) | set(stored)):
+        if live.get(key, 0) != stored.get(key, 0):
+            mismatches.append((key[0], key[1], stored.get(key, 0), live.get(key, 0)))
+    return mismatches
+
+
+# --- Lookups (range scans over the indexed table) ---
+
+def total_reserved_on(day):
+    """ Units reserved across all items on a given day. """
+    return ItemDayOccupancy.objects.filter(day=day).aggregate(total=Sum('reserved_quantity'))['total'] or 0
+
+
+def item_occupancy_by_day(item, start_day, end_day):
+    """ [(day, reserved_quantity)] for every day of the range, zero-filled. """
+    stored = dict(
+        ItemDayOccupancy.objects.filter(item=item, day__range=(start_day, end_day)).values_list('day', 'reserved_quantity')
+    )
+    days = []
+    day = start_day
+    while day <= end_day:
+        days.append((day, stored.get(day, 0)))
+        day += datetime.timedelta(days=1)
+    return days
+
+
+# --- Deferred refresh scheduling (used by inventory.signals) ---
+
+_pending = threading.local()
+
+
+def _pending_ranges():
+    if not hasattr(_pending, 'ranges'):
+        _pending.ranges = defaultdict(set)
+    return _pending.ranges
+
+
+def _flush_pending():
+    ranges = _pending_ranges()
+    while ranges:
+        (start_day, end_day), item_ids = ranges.popitem()
+        refresh_occupancy(item_ids, start_day, end_day)
+
+
+def schedule_refresh(item_ids, start_day, end_day):
+    """
+    Queues a refresh of item_ids over [start_day, end_day], run when the current transaction commits
+    (immediately in autocommit mode). Lines of the same booking share a range, so a formset save
+    collapses into a single refresh.
+    """
+    item_ids = {item_id for item_id in item_ids if item_id}
+    if not item_ids or start_day is None or end_day is None:
+        return
+    # If the transaction rolls back the callback is dropped but the range stays queued;
+    # it is simply refreshed again (harmlessly) by the next flush.
+    _pending_ranges()[(start_day, end_day)].update(item_ids)
+    transaction.on_commit(_flush_pending)
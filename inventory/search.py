@@ -0,0 +1,49 @@
+# clavis_event_inventory/inventory/search.py
+
+"""
+Full-text index of the item list search: name, SKU, description, category and supplier names.
+See reports.full_text_search; created after migrate by InventoryConfig.ready().
+"""
+
+from reports.full_text_search import ensure_search_index, search
+
+ITEM_SEARCH_INDEX = {
+    'table': 'inventory_item_fts',
+    'columns': {'name': 10, 'sku': 8, 'description': 1, 'category': 4, 'supplier': 2},
+    'source': (
+        "SELECT i.id, i.name, i.sku, i.description, c.name, s.name FROM inventory_item i "
+        "LEFT JOIN inventory_category c ON c.id = i.category_id LEFT JOIN suppliers_supplier s ON s.id = i.supplier_id"
+    ),
+    'triggers': {
+        'insert': {'on': "AFTER INSERT ON inventory_item", 'insert': "i.id = new.id"},
+        'update': {
+            'on': (
+                "AFTER UPDATE OF name, sku, description, category_id, supplier_id ON inventory_item "
+                "WHEN old.name IS NOT new.name OR old.sku IS NOT new.sku OR old.description IS NOT new.description "
+                "OR old.category_id IS NOT new.category_id OR old.supplier_id IS NOT new.supplier_id"
+            ),
+            'delete': "old.id", 'insert': "i.id = new.id",
+        },
+        'delete': {'on': "AFTER DELETE ON inventory_item", 'delete': "old.id"},
+        'category': {
+            'on': "AFTER UPDATE OF name ON inventory_category WHEN old.name IS NOT new.name",
+            'delete': "SELECT id FROM inventory_item WHERE category_id = new.id", 'insert': "i.category_id = new.id",
+        },
+        'supplier': {
+            'on': "AFTER UPDATE OF name ON suppliers_supplier WHEN old.name IS NOT new.name",
+            'delete': "SELECT id FROM inventory_item WHERE supplier_id = new.id", 'insert': "i.supplier_id = new.id",
+        },
+    },
+    'relation': 'search_entry',
+    'ordering': ('name', 'pk'),
+    'fallback_fields': ('name', 'sku', 'description', 'category__name', 'supplier__name'),
+}
+
+
+def search_items(queryset, query):
+    return search(queryset, ITEM_SEARCH_INDEX, query)
+
+
+def create_item_search_index(sender, using, verbosity=1, **kwargs):
+    """ post_migrate receiver. """
+    ensure_search_index(ITEM_SEARCH_INDEX, using, verbosity)
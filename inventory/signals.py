@@ -0,0 +1,196 @@
+# clavis_event_inventory/inventory/signals.py
+
+"""
+Keeps ItemDayOccupancy in sync with booking changes, builds the derivatives of new item images,
+releases the content-addressed image files no row references any more, keeps the stored
+barcode images in step with item SKUs and invalidates the scanning SKU map.
+Connected in InventoryConfig.ready().
+"""
+
+import logging
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models.fields.files import FieldFile
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from bookings.models import Event, Rental, EventItem, RentalItem
+from .barcodes import build_barcodes, delete_barcodes
+from .image_derivatives import build_derivatives
+from .image_store import item_image_storage, release_image
+from .models import Item, ItemImage
+from .occupancy import booking_days, is_blocking, schedule_refresh
+from .sku_lookup import invalidate_sku_map
+
+logger = logging.getLogger(__name__)
+
+
+# --- Snapshots of the values loaded from the DB, to detect what changed on save ---
+# Read through __dict__ so deferred fields are never fetched just to take a snapshot.
+
+@receiver(post_init, sender=Event)
+@receiver(post_init, sender=Rental)
+def snapshot_booking(sender, instance, **kwargs):
+    instance._occupancy_snapshot = (
+        instance.__dict__.get('start_date'),
+        instance.__dict__.get('end_date'),
+        instance.__dict__.get('status'),
+    )
+
+
+@receiver(post_init, sender=EventItem)
+@receiver(post_init, sender=RentalItem)
+def snapshot_booking_item(sender, instance, **kwargs):
+    instance._occupancy_item_id = instance.__dict__.get('item_id')
+
+
+# --- Booking date / status changes ---
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Rental)
+def booking_saved(sender, instance, created, **kwargs):
+    old_start, old_end, old_status = instance._occupancy_snapshot
+    snapshot_booking(sender, instance)
+    if created or (old_start, old_end, old_status) == instance._occupancy_snapshot:
+        return # New bookings have no lines yet; their lines schedule their own refresh
+
+    if not is_blocking(instance, old_status) and not is_blocking(instance):
+        return
+
+    # Refresh the union of the old and new date spans for every item on the booking
+    days = [*booking_days(instance.start_date, instance.end_date)]
+    if old_start and old_end:
+        days.extend(booking_days(old_start, old_end))
+    item_ids = instance.items.values_list('item_id', flat=True)
+    schedule_refresh(item_ids, min(days), max(days))
+
+
+# --- Booking line saves / deletes ---
+
+@receiver(post_save, sender=EventItem)
+@receiver(post_save, sender=RentalItem)
+def booking_item_saved(sender, instance, **kwargs):
+    old_item_id = instance._occupancy_item_id
+    instance._occupancy_item_id = instance.item_id
+    booking = instance.booking
+    if not is_blocking(booking):
+        return
+    schedule_refresh({old_item_id, instance.item_id}, *booking_days(booking.start_date, booking.end_date))
+
+
+@receiver(post_delete, sender=EventItem)
+@receiver(post_delete, sender=RentalItem)
+def booking_item_deleted(sender, instance, **kwargs):
+    try:
+        booking = instance.booking
+    except ObjectDoesNotExist:
+        return
+    if not is_blocking(booking):
+        return
+    schedule_refresh({instance.item_id}, *booking_days(booking.start_date, booking.end_date))
+
+
+# --- Item images: derivatives and content-addressed blobs ---
+
+ITEM_IMAGE_FIELDS = {Item: ('image1', 'image2'), ItemImage: ('image',)}
+
+
+def _stored_name(value):
+    # __dict__ holds the stored name as a str until the field is first accessed, then a FieldFile.
+    # A freshly assigned upload (File, or an uncommitted FieldFile) has no stored name yet.
+    if isinstance(value, FieldFile):
+        return value.name if value._committed and value.name else None
+    return value if isinstance(value, str) and value else None
+
+
+@receiver(post_init, sender=Item)
+@receiver(post_init, sender=ItemImage)
+def snapshot_images(sender, instance, **kwargs):
+    instance._image_names = {field: _stored_name(instance.__dict__.get(field)) for field in ITEM_IMAGE_FIELDS[sender]}
+
+
+def _build_quietly(field_file):
+    try:
+        build_derivatives(field_file) # Only missing ones: a re-uploaded blob already has its derivatives
+    except Exception: # A broken upload must not break the save that triggered it
+        logger.exception("Error building image derivatives for %s", field_file.name)
+
+
+def _release_quietly(name):
+    try:
+        release_image(name, item_image_storage)
+    except Exception:
+        logger.exception("Error releasing image %s", name)
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_save, sender=ItemImage)
+def image_saved(sender, instance, **kwargs):
+    old_names = instance._image_names
+    snapshot_images(sender, instance)
+    for field in ITEM_IMAGE_FIELDS[sender]:
+        field_file = getattr(instance, field)
+        old_name = old_names.get(field)
+        if (field_file.name or None) == old_name:
+            continue
+        # After the commit, so a rolled-back save neither builds derivatives nor deletes the old file
+        if field_file:
+            transaction.on_commit(lambda field_file=field_file: _build_quietly(field_file))
+        if old_name:
+            transaction.on_commit(lambda old_name=old_name: _release_quietly(old_name))
+
+
+@receiver(post_delete, sender=Item)
+@receiver(post_delete, sender=ItemImage)
+def image_owner_deleted(sender, instance, **kwargs):
+    for name in set(instance._image_names.values()):
+        if name:
+            transaction.on_commit(lambda name=name: _release_quietly(name))
+
+
+# --- Item barcodes: stored images follow the SKU ---
+
+@receiver(post_init, sender=Item)
+def snapshot_sku(sender, instance, **kwargs):
+    instance._barcode_sku = instance.__dict__.get('sku') or None
+
+
+def _build_barcodes_quietly(sku):
+    try:
+        build_barcodes(sku)
+    except Exception: # Served (and retried) on demand by barcode_image_view anyway
+        logger.exception("Error building barcode images for %s", sku)
+
+
+def _delete_barcodes_quietly(sku):
+    try:
+        delete_barcodes(sku)
+    except Exception:
+        logger.exception("Error deleting barcode images of %s", sku)
+
+
+@receiver(post_save, sender=Item)
+def item_sku_saved(sender, instance, **kwargs):
+    # Item.save() assigns the SKU of a new item in a second save, so the first post_save usually has none
+    old_sku, new_sku = instance._barcode_sku, instance.__dict__.get('sku') or None
+    instance._barcode_sku = new_sku
+    if new_sku == old_sku:
+        return
+    if new_sku:
+        transaction.on_commit(lambda: _build_barcodes_quietly(new_sku))
+    if old_sku:
+        transaction.on_commit(lambda: _delete_barcodes_quietly(old_sku))
+
+
+@receiver(post_delete, sender=Item)
+def item_barcodes_deleted(sender, instance, **kwargs):
+    if instance._barcode_sku:
+        transaction.on_commit(lambda sku=instance._barcode_sku: _delete_barcodes_quietly(sku))
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def item_changed_sku_map(sender, instance, **kwargs):
+    # After the commit, so no process reloads the map from uncommitted (or rolled back) rows
+    transaction.on_commit(invalidate_sku_map)
@@ -0,0 +1,69 @@
+# clavis_event_inventory/inventory/sku_lookup.py
+
+"""
+In-process SKU -> item map for barcode scanning.
+
+Scans resolve a SKU with a dict lookup instead of a query. The map is loaded once per process (one
+values_list() query) and kept warm between requests. inventory.signals bumps a version number held
+in the cache whenever an Item is saved or deleted, and every process reloads its map on its next
+lookup. That needs a cache all the processes share (settings.CACHES configures one); with a
+per-process LocMemCache other workers would keep resolving renamed SKUs until SKU_MAP_MAX_AGE.
+SKU_MAP_MAX_AGE (seconds, default 300) bounds staleness for changes that bypass signals, such as
+queryset.update() or bulk_create().
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'inventory:sku_map:version'
+DEFAULT_MAX_AGE = 300
+
+_lock = threading.Lock()
+_sku_map = (None, 0.0, {}) # (version, loaded at, {sku: item dict}); replaced as a whole, never mutated
+
+
+def _cache():
+    return caches[getattr(settings, 'SKU_MAP_CACHE_ALIAS', 'default')]
+
+
+def invalidate_sku_map():
+    """ Makes every process reload its map on its next lookup. """
+    cache = _cache()
+    cache.add(VERSION_KEY, 1, None)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError: # Evicted between add() and incr()
+        cache.set(VERSION_KEY, 2, None)
+
+
+def _load(version):
+    from .models import Item
+    rows = Item.objects.exclude(sku='').values_list('pk', 'sku', 'name').iterator(chunk_size=2000)
+    return (version, time.monotonic(), {sku: {'id': pk, 'sku': sku, 'name': name} for pk, sku, name in rows})
+
+
+def get_sku_map():
+    """ {sku: {'id', 'sku', 'name'}} for every item, reloaded after an Item change or SKU_MAP_MAX_AGE seconds. """
+    global _sku_map
+    version = _cache().get_or_set(VERSION_KEY, 1, None) # Read before loading, so a change during the load triggers another
+    max_age = getattr(settings, 'SKU_MAP_MAX_AGE', DEFAULT_MAX_AGE)
+    loaded_version, loaded_at, items = _sku_map
+    if loaded_version != version or time.monotonic() - loaded_at > max_age:
+        with _lock: # One load per process, however many requests are waiting for it
+            loaded_version, loaded_at, items = _sku_map
+            if loaded_version != version or time.monotonic() - loaded_at > max_age:
+                _sku_map = _load(version)
+                loaded_version, loaded_at, items = _sku_map
+    return items
+
+
+def lookup_sku(sku):
+    """ The item dict for a scanned SKU (surrounding whitespace and letter case are forgiven), or None. """
+    sku = (sku or '').strip()
+    if not sku:
+        return None
+    items = get_sku_map()
+    return items.get(sku) or items.get(sku.upper())
@@ -0,0 +1,15 @@
+# clavis_event_inventory/inventory/templatetags/inventory_images.py
+
+from django import template
+
+from inventory.image_derivatives import DERIVATIVES, derivative_url as _derivative_url
+
+register = template.Library()
+
+
+@register.filter
+def derivative_url(field_file, kind):
+    """ {{ item.image1|derivative_url:'list' }} - URL of the derivative, falling back to the original. """
+    if kind not in DERIVATIVES:
+        raise template.TemplateSyntaxError(f"Unknown image derivative '{kind}'. Choices: {', '.join(DERIVATIVES)}")
+    return _derivative_url(field_file, kind)
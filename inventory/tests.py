@@ -1,3 +1,180 @@
-from django.test import TestCase
+import datetime
+import io
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from bookings.models import Event, EventItem, Rental, RentalItem
+from clients.models import Client
+from .availability import peak_concurrent_usage
+from .models import Item, ItemDayOccupancy
+from .occupancy import compute_occupancy
+
+
+def at(hour, day=1):
+    return timezone.make_aware(datetime.datetime(2030, 6, day, hour))
+
+
+def interval(start, end, quantity):
+    return {'start': start, 'end': end, 'quantity': quantity}
+
+
+class PeakConcurrentUsageTests(SimpleTestCase):
+    """ The sweep-line peak, as opposed to the sum of everything overlapping the window. """
+
+    def test_touching_intervals_overlap(self):
+        # Closed intervals, like the overlap filters: a booking starting as another ends counts with it
+        peak = peak_concurrent_usage([interval(at(9), at(12), 6), interval(at(12), at(15), 4)], at(8), at(18))
+        self.assertEqual(peak['peak_quantity'], 10)
+        self.assertEqual(peak['peak_at'], at(12))
+
+    def test_peak_is_below_sum_when_bookings_never_all_coincide(self):
+        intervals = [interval(at(9), at(12), 6), interval(at(11), at(14), 3), interval(at(13), at(16), 4)]
+        peak = peak_concurrent_usage(intervals, at(8), at(18))
+        self.assertEqual(peak['peak_quantity'], 9)
+        self.assertEqual(peak['peak_at'], at(11))
+        self.assertEqual(sorted(booking['quantity'] for booking in peak['peak_bookings']), [3, 6])
+
+    def test_intervals_are_clipped_to_the_window(self):
+        intervals = [interval(at(9), at(12), 6), interval(at(13), at(16), 4)]
+        self.assertEqual(peak_concurrent_usage(intervals, at(13), at(18))['peak_quantity'], 4)
+        self.assertEqual(peak_concurrent_usage(intervals, at(17), at(18)), {'peak_quantity': 0, 'peak_at': None, 'peak_bookings': []})
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ItemAvailabilityTests(TestCase):
+    """ Item.check_availability against bookings stored in the database. """
+
+    def setUp(self):
+        self.client_record = Client.objects.create(name="Availability Client")
+        self.item = Item.objects.create(name="Round Table", rent_price_per_day=1, initial_quantity=10)
+
+    def book_event(self, start, end, quantity, status='PLANNED'):
+        event = Event.objects.create(
+            client=self.client_record, event_name="Event", event_location="Hall", start_date=start, end_date=end, status=status,
+        )
+        EventItem.objects.create(booking=event, item=self.item, quantity=quantity)
+        return event
+
+    def book_rental(self, start, end, quantity):
+        rental = Rental.objects.create(client=self.client_record, start_date=start, end_date=end)
+        RentalItem.objects.create(booking=rental, item=self.item, quantity=quantity)
+        return rental
+
+    def test_back_to_back_bookings_are_counted_together(self):
+        self.book_event(at(9), at(12), 6)
+        self.book_rental(at(12), at(15), 4)
+        availability = self.item.check_availability(1, at(8), at(18))
+        self.assertEqual((availability['peak_quantity'], availability['available']), (10, 0))
+        self.assertFalse(availability['is_available'])
+
+    def test_staggered_bookings_leave_stock_free(self):
+        self.book_event(at(9), at(12), 6)
+        self.book_rental(at(11), at(14), 3)
+        self.book_event(at(13), at(16), 4)
+        self.assertEqual(self.item.check_availability(1, at(8), at(18))['available'], 1)
+        self.assertTrue(self.item.is_available(1, at(8), at(18)))
+        self.assertFalse(self.item.is_available(2, at(8), at(18)))
+
+    def test_booking_being_edited_is_excluded(self):
+        edited = self.book_event(at(9), at(12), 6)
+        self.book_event(at(10), at(11), 3)
+        self.assertFalse(self.item.is_available(6, at(9), at(12)))
+        self.assertTrue(self.item.is_available(6, at(9), at(12), exclude_event_pk=edited.pk))
+        self.assertFalse(self.item.is_available(8, at(9), at(12), exclude_event_pk=edited.pk))
+
+    def test_cancelled_bookings_do_not_block(self):
+        self.book_event(at(9), at(12), 8, status='CANCELLED')
+        self.assertTrue(self.item.is_available(10, at(9), at(12)))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class OccupancyMaintenanceTests(TestCase):
+    """ The signals and update_booking_statuses keep ItemDayOccupancy equal to a fresh recomputation. """
+
+    def setUp(self):
+        self.client_record = Client.objects.create(name="Occupancy Client")
+        self.chairs = Item.objects.create(name="Chair", rent_price_per_day=1, initial_quantity=50)
+        self.tables = Item.objects.create(name="Table", rent_price_per_day=1, initial_quantity=50)
+        self.start = timezone.make_aware(datetime.datetime.combine(timezone.localdate() + datetime.timedelta(days=10), datetime.time(9)))
+
+    def stored(self):
+        return {(item_id, day): quantity for item_id, day, quantity in ItemDayOccupancy.objects.values_list('item_id', 'day', 'reserved_quantity')}
+
+    def assertConsistent(self):
+        self.assertEqual(self.stored(), dict(compute_occupancy()))
+        call_command('check_item_occupancy', stdout=io.StringIO()) # Raises CommandError on any mismatch
+
+    def reserved(self, item, days=0):
+        return self.stored().get((item.pk, self.start.date() + datetime.timedelta(days=days)), 0)
+
+    def test_booking_lifecycle(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            event = Event.objects.create(
+                client=self.client_record, event_name="Gala", event_location="Hall",
+                start_date=self.start, end_date=self.start + datetime.timedelta(days=2),
+            )
+            line = EventItem.objects.create(booking=event, item=self.chairs, quantity=5)
+            rental = Rental.objects.create(client=self.client_record, start_date=self.start, end_date=self.start + datetime.timedelta(days=1))
+            RentalItem.objects.create(booking=rental, item=self.chairs, quantity=3)
+            rental_tables = RentalItem.objects.create(booking=rental, item=self.tables, quantity=2)
+        self.assertConsistent()
+        self.assertEqual((self.reserved(self.chairs), self.reserved(self.chairs, days=2), self.reserved(self.tables)), (8, 5, 2))
+
+        with self.captureOnCommitCallbacks(execute=True): # Dates move: old days freed, new days reserved
+            event.start_date += datetime.timedelta(days=5)
+            event.end_date += datetime.timedelta(days=5)
+            event.save()
+        self.assertConsistent()
+        self.assertEqual((self.reserved(self.chairs, days=2), self.reserved(self.chairs, days=5)), (0, 5))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            line.quantity = 7
+            line.save()
+        self.assertConsistent()
+        self.assertEqual(self.reserved(self.chairs, days=5), 7)
+
+        with self.captureOnCommitCallbacks(execute=True): # Item swapped on the line: both items refreshed
+            line.item = self.tables
+            line.save()
+        self.assertConsistent()
+        self.assertEqual((self.reserved(self.chairs, days=5), self.reserved(self.tables, days=5)), (0, 7))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event.status = 'CANCELLED'
+            event.save()
+        self.assertConsistent()
+        self.assertEqual(self.reserved(self.tables, days=5), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rental_tables.delete()
+        self.assertConsistent()
+        self.assertEqual((self.reserved(self.chairs), self.reserved(self.tables)), (3, 0))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rental.delete()
+        self.assertConsistent()
+        self.assertEqual(self.stored(), {})
+
+    def test_status_command_releases_completed_bookings(self):
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            ended = Event.objects.create(
+                client=self.client_record, event_name="Ended", event_location="Hall", status='ACTIVE',
+                start_date=now - datetime.timedelta(days=3), end_date=now - datetime.timedelta(days=1),
+            )
+            EventItem.objects.create(booking=ended, item=self.chairs, quantity=4)
+            starting = Rental.objects.create(client=self.client_record, start_date=now - datetime.timedelta(hours=1), end_date=now + datetime.timedelta(days=1))
+            RentalItem.objects.create(booking=starting, item=self.tables, quantity=6)
+        self.assertConsistent()
+        self.assertTrue(ItemDayOccupancy.objects.filter(item=self.chairs).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('update_booking_statuses', stdout=io.StringIO())
+        ended.refresh_from_db()
+        starting.refresh_from_db()
+        self.assertEqual((ended.status, starting.status), ('COMPLETED', 'OUT'))
+        self.assertConsistent()
+        self.assertFalse(ItemDayOccupancy.objects.filter(item=self.chairs).exists())
+        self.assertTrue(ItemDayOccupancy.objects.filter(item=self.tables, reserved_quantity=6).exists())
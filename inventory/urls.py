@@ -8,6 +8,7 @@ app_name = 'inventory'
 urlpatterns = [
     # Item URLs
     path('items/', views.item_list_view, name='item_list'),
+    path('items/export.<slug:export_format>', views.item_export_view, name='item_export'), # CSV / NDJSON stream, item list filters
     path('items/add/', views.item_add_view, name='item_add'), # NEW
     path('item/<int:item_id>/', views.item_detail_view, name='item_detail'),
     path('item/<int:item_id>/edit/', views.item_edit_view, name='item_edit'), # NEW
@@ -20,5 +21,7 @@ urlpatterns = [
     
     # Barcode URLs
     path('print-barcode/<int:item_id>/', views.print_barcode_view, name='print_barcode'),
+    path('labels/', views.label_sheet_view, name='label_sheet'), # Bulk label sheets PDF (?items=&category=&supplier=&event=&rental=)
+    path('barcodes/v<int:version>/<str:sku>.<slug:barcode_format>', views.barcode_image_view, name='barcode_image'), # Immutable; see inventory.barcodes
 
 ]
\ No newline at end of file
@@ -7,8 +7,8 @@ from django.conf import settings # Ensure settings is imported
 import os # Ensure os is imported
 
 # Excel Export
-import openpyxl
 from openpyxl.styles import Font
+from reports.excel_toolkit import ColumnWidths, iterate_rows, new_write_only_workbook, styled_cell, workbook_response
 # from openpyxl.drawing.image import Image as OpenpyxlImage # For Excel images, if added later
 
 # PDF Export
@@ -18,54 +18,26 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 
-from PIL import Image as PILImage, ImageOps
+from concurrent.futures import ThreadPoolExecutor
+from .image_derivatives import prepare_derivative # Pre-rendered item image thumbnails
+from reports.pdf_toolkit import get_pdf_styles # Shared, pre-built stylesheet
 
 # Word Export
 from docx import Document
 from docx.shared import Inches, Pt
+from reports.docx_toolkit import DOCX_CONTENT_TYPE, append_text_rows
 # from docx.shared import Cm # For Word images, if added later
 
-# generate barcode start
-import barcode
-from barcode.writer import ImageWriter
-from io import BytesIO
-import base64
+MASTER_INVENTORY_EXCEL_HEADERS = [
+    "SKU", "Item Name", "Category", "Description", "Location",
+    "Initial Qty", "Available Qty", "Purchase Price (BHD)", "Rent Price/Day (BHD)",
+    "Supplier", "Depth", "Width", "Height", "Unit", "Created", "Updated"
+]
 
-def generate_barcode_base64(sku):
-    if not sku:
-        return None
-    CODE128 = barcode.get_barcode_class('code128')
-    buffer = BytesIO()
-    CODE128(sku, writer=ImageWriter()).write(buffer)
-    return base64.b64encode(buffer.getvalue()).decode('utf-8')
 
-# generate barcode end
-
-def generate_master_inventory_excel(items):
-    """Generates an Excel HttpResponse for the master inventory list."""
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    )
-    response['Content-Disposition'] = f'attachment; filename="clavis_master_inventory_{date.today()}.xlsx"'
-
-    workbook = openpyxl.Workbook()
-    sheet = workbook.active
-    sheet.title = 'Master Inventory'
-
-    # Headers (Depth instead of Length)
-    headers = [
-        "SKU", "Item Name", "Category", "Description", "Location",
-        "Initial Qty", "Available Qty", "Purchase Price (BHD)", "Rent Price/Day (BHD)",
-        "Supplier", "Depth", "Width", "Height", "Unit", "Created", "Updated"
-    ]
-    sheet.append(headers)
-
-    for cell in sheet[1]:
-        cell.font = Font(bold=True)
-
-    # Data Rows (using item.depth)
-    for item in items:
-        sheet.append([
+def _master_inventory_excel_rows(items):
+    for item in iterate_rows(items):
+        yield [
             item.sku,
             item.name,
             item.category.name if item.category else '-',
@@ -82,29 +54,27 @@ def generate_master_inventory_excel(items):
             item.get_dimension_unit_display(),
             item.created_at.strftime('%Y-%m-%d') if item.created_at else '-',
             item.updated_at.strftime('%Y-%m-%d') if item.updated_at else '-',
-        ])
+        ]
 
-    # Adjust column widths
-    for col_idx, column_cells in enumerate(sheet.columns):
-        # Skip image column if we add it later to Excel, as width is tricky
-        # if headers[col_idx] == "Image":
-        #     sheet.column_dimensions[column_cells[0].column_letter].width = 15 # Example fixed width for image
-        #     continue
-        
-        max_length = 0
-        column_letter = column_cells[0].column_letter
-        for cell in column_cells:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except: pass
-        adjusted_width = (max_length + 2)
-        if column_letter in ['H', 'I'] and adjusted_width < 15: adjusted_width = 15
-        if column_letter in ['K','L','M'] and adjusted_width < 8: adjusted_width = 8
-        sheet.column_dimensions[column_letter].width = adjusted_width
-
-    workbook.save(response)
-    return response
+
+def generate_master_inventory_excel(items):
+    """Generates a streamed Excel response for the master inventory list (write-only workbook, see reports.excel_toolkit)."""
+    workbook, sheet = new_write_only_workbook('Master Inventory')
+
+    # First pass: column widths, measured row by row
+    widths = ColumnWidths()
+    widths.add(MASTER_INVENTORY_EXCEL_HEADERS)
+    for row in _master_inventory_excel_rows(items):
+        widths.add(row)
+    widths.apply(sheet, minimums={'H': 15, 'I': 15, 'K': 8, 'L': 8, 'M': 8})
+
+    # Second pass: the rows themselves
+    header_font = Font(bold=True)
+    sheet.append([styled_cell(sheet, header, font=header_font) for header in MASTER_INVENTORY_EXCEL_HEADERS])
+    for row in _master_inventory_excel_rows(items):
+        sheet.append(row)
+
+    return workbook_response(workbook, f"clavis_master_inventory_{date.today()}.xlsx")
 
 
 # def generate_master_inventory_pdf(items):
@@ -198,6 +168,14 @@ def generate_master_inventory_excel(items):
 #     response['Content-Disposition'] = f'attachment; filename="clavis_master_inventory_{date.today()}.pdf"'
 #     return response
 
+def get_pdf_image_workers():
+    """ Threads preparing item thumbnails for the master inventory PDF (settings.PDF_IMAGE_WORKERS, 1 = serial). """
+    workers = getattr(settings, 'PDF_IMAGE_WORKERS', None)
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+    return max(1, int(workers))
+
+
 def generate_master_inventory_pdf(items, client_view=False):
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(
@@ -205,9 +183,9 @@ def generate_master_inventory_pdf(items, client_view=False):
         rightMargin=0.5*inch, leftMargin=0.5*inch,
         topMargin=0.5*inch, bottomMargin=0.5*inch
     )
-    styles = getSampleStyleSheet()
+    styles = get_pdf_styles()
     story = []
-    table_cell_style = ParagraphStyle('TableCell', parent=styles['Normal'], fontSize=7, leading=8)
+    table_cell_style = styles['InventoryTableCell']
 
     title = f"Clavis Master Inventory Report - {date.today()}"
     story.append(Paragraph(title, styles['h1']))
@@ -219,24 +197,31 @@ def generate_master_inventory_pdf(items, client_view=False):
     headers += ["Rent", "D", "W", "H", "Unit", "Supplier"]
     data = [headers]
 
+    # Thumbnails (the pre-rendered 150px JPEG, built from the original when missing) are prepared on a
+    # thread pool while the rows are built below; PIL releases the GIL while decoding and resizing.
+    items = list(items)
+    image_pool = ThreadPoolExecutor(max_workers=get_pdf_image_workers())
+    image_jobs = {}
+    for item in items:
+        if item.image1 and item.image1.name not in image_jobs:
+            image_jobs[item.image1.name] = image_pool.submit(prepare_derivative, item.image1, 'pdf')
+    image_pool.shutdown(wait=False)
+    image_errors = [] # (item, message), listed at the end of the report
+
     for item in items:
         purch_price = f"{item.purchase_price} BHD" if item.purchase_price is not None else '-'
         rent_price = f"{item.rent_price_per_day} BHD" if item.rent_price_per_day is not None else '-'
 
         item_image_el = Paragraph("(No Image)", table_cell_style)
-        if item.image1 and hasattr(item.image1, 'path'):
-            try:
-                if os.path.exists(item.image1.path):
-                    with PILImage.open(item.image1.path) as pil_img:
-                        pil_img = ImageOps.exif_transpose(pil_img).convert("RGB")
-                        img_buffer = io.BytesIO()
-                        pil_img.save(img_buffer, format='JPEG')
-                        img_buffer.seek(0)
-                        img = Image(img_buffer, width=0.5*inch, height=0.5*inch)
-                        img.hAlign = 'CENTER'
-                        item_image_el = img
-            except Exception as e:
-                print(f"Error loading image {item.image1.path} for PDF: {e}")
+        if item.image1:
+            thumbnail_path, error = image_jobs[item.image1.name].result()
+            if thumbnail_path:
+                img = Image(thumbnail_path, width=0.5*inch, height=0.5*inch)
+                img.hAlign = 'CENTER'
+                item_image_el = img
+            else:
+                item_image_el = Paragraph("(Image error)", table_cell_style)
+                image_errors.append((item, error))
 
         row = [
             item_image_el,
@@ -290,15 +275,32 @@ def generate_master_inventory_pdf(items, client_view=False):
     else:
         story.append(Paragraph("No inventory items found.", styles['Normal']))
 
+    if image_errors:
+        story.append(Spacer(1, 0.2*inch))
+        story.append(Paragraph(f"Images that could not be loaded ({len(image_errors)})", styles['h3']))
+        for item, error in image_errors:
+            story.append(Paragraph(f"{item.sku or '-'} - {item.name}: {item.image1.name} ({error})", table_cell_style))
+
     doc.build(story)
     buffer.seek(0)
     response = HttpResponse(buffer, content_type='application/pdf')
     filename = f"clavis_master_inventory_{'client' if client_view else 'full'}_{date.today()}.pdf"
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Image-Errors'] = str(len(image_errors))
     return response
 
 
 
+def _master_inventory_docx_values(item):
+    return [
+        item.sku or '-', item.name or '-', item.category.name if item.category else '-', item.storage_location or '-',
+        str(item.initial_quantity), str(item.available_quantity),
+        f"{item.purchase_price} BHD" if item.purchase_price is not None else '-',
+        f"{item.rent_price_per_day} BHD" if item.rent_price_per_day is not None else '-',
+        str(item.depth or '-'), str(item.width or '-'), str(item.height or '-'),
+        item.get_dimension_unit_display(), item.supplier.name if item.supplier else '-',
+    ]
+
 def generate_master_inventory_docx(items):
     """Generates a Word (.docx) HttpResponse for the master inventory list."""
     # Note: Adding images to DOCX tables cell by cell can be complex and might require
@@ -316,37 +318,12 @@ def generate_master_inventory_docx(items):
             run = hdr_cells[i].paragraphs[0].add_run(header)
             run.font.bold = True; run.font.size = Pt(8)
 
-        for item in items:
-            row_cells = table.add_row().cells
-            purch_price = f"{item.purchase_price} BHD" if item.purchase_price is not None else '-'
-            rent_price = f"{item.rent_price_per_day} BHD" if item.rent_price_per_day is not None else '-'
-            
-            row_cells[0].text = item.sku or '-'; 
-            row_cells[1].text = item.name or '-';
-            row_cells[2].text = item.category.name if item.category else '-'; 
-            row_cells[3].text = item.storage_location or '-';
-            row_cells[4].text = str(item.initial_quantity); 
-            row_cells[5].text = str(item.available_quantity);
-            row_cells[6].text = purch_price; 
-            row_cells[7].text = rent_price;
-            row_cells[8].text = str(item.depth or '-'); 
-            row_cells[9].text = str(item.width or '-');
-            row_cells[10].text = str(item.height or '-'); 
-            row_cells[11].text = item.get_dimension_unit_display();
-            row_cells[12].text = item.supplier.name if item.supplier else '-'
-            for cell in row_cells: 
-                if cell.paragraphs: # Ensure paragraph exists
-                    for run in cell.paragraphs[0].runs:
-                        run.font.size = Pt(8)
-                else: # Add a paragraph if none exists
-                    p = cell.add_paragraph()
-                    p.add_run().font.size = Pt(8)
-
+        append_text_rows(table, (_master_inventory_docx_values(item) for item in items), Pt(8))
 
     else:
          document.add_paragraph("No inventory items found.")
 
     buffer = io.BytesIO(); document.save(buffer); buffer.seek(0)
-    response = HttpResponse(buffer.getvalue(), content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+    response = HttpResponse(buffer.getvalue(), content_type=DOCX_CONTENT_TYPE)
     response['Content-Disposition'] = f'attachment; filename="clavis_master_inventory_{date.today()}.docx"'
     return response
@@ -9,16 +9,29 @@ from bookings.models import EventItem, RentalItem
 from .utils import generate_master_inventory_excel, generate_master_inventory_pdf, generate_master_inventory_docx
 from django.utils import timezone # Make sure timezone is imported
 import datetime # Make sure datetime is imported
-from .utils import generate_barcode_base64 #barcode imported
+from .barcodes import BARCODE_CACHE_CONTROL, BARCODE_FORMATS, BARCODE_VERSION, barcode_name, barcode_url, build_barcodes
+from barcode.errors import BarcodeError
+from .label_sheets import DEFAULT_LABEL_LAYOUT, LABEL_LAYOUTS, label_selection, parse_item_copies, render_label_sheets
+from django.core.files.storage import default_storage
+from .occupancy import item_occupancy_by_day
+from .search import search_items
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest
+from reports.streaming_exports import EXPORT_FORMATS, iterate_values, stream_export
 
 # --- Item List/Detail Views ---
-def item_list_view(request):
-    search_query = request.GET.get('q', '')
-    selected_category_id = request.GET.get('category', '')
-    selected_item_source = request.GET.get('item_source', '')
-
-    queryset = Item.objects.all().select_related('category', 'supplier')
+def filter_items(params):
+    """
+    The item list filters (q, category, item_source) applied to Item.objects.with_availability(), ordered as the list
+    (by search rank when searching).
+    Returns (queryset, search_query, selected_category_id, selected_item_source); an invalid category is ignored.
+    """
+    search_query = params.get('q', '')
+    selected_category_id = params.get('category', '')
+    selected_item_source = params.get('item_source', '')
+
+    queryset = Item.objects.all().select_related('category', 'supplier').with_availability()
 
     if selected_category_id:
         try:
@@ -30,15 +43,13 @@ def item_list_view(request):
     if selected_item_source:
         queryset = queryset.filter(item_source=selected_item_source)
 
+    queryset = queryset.order_by('category__name', 'name')
     if search_query:
-        queryset = queryset.filter(
-            Q(name__icontains=search_query) | 
-            Q(sku__icontains=search_query) | 
-            Q(description__icontains=search_query) | 
-            Q(category__name__icontains=search_query)
-        ).distinct()
+        queryset = search_items(queryset, search_query) # Best matches first (see inventory.search)
+    return queryset, search_query, selected_category_id, selected_item_source
 
-    queryset = queryset.order_by('category__name', 'name')
+def item_list_view(request):
+    queryset, search_query, selected_category_id, selected_item_source = filter_items(request.GET)
     
     # Pagination logic
     paginator = Paginator(queryset, 10)  # Show 10 items per page
@@ -50,9 +61,9 @@ def item_list_view(request):
     except EmptyPage:
         items = paginator.page(paginator.num_pages)
 
-    # Inject barcode
+    # Inject barcode (stored image, see inventory.barcodes)
     for item in items:
-        item.barcode_image = generate_barcode_base64(item.sku)
+        item.barcode_url = barcode_url(item.sku)
 
     categories = Category.objects.all().order_by('name')
 
@@ -69,18 +80,77 @@ def item_list_view(request):
 
     return render(request, 'inventory/item_list.html', context)
 
+ITEM_EXPORT_COLUMNS = [
+    ('id', 'pk'), ('sku', 'sku'), ('name', 'name'), ('category', 'category__name'), ('item_source', 'item_source'),
+    ('storage_location', 'storage_location'), ('initial_quantity', 'initial_quantity'),
+    ('currently_assigned', 'currently_assigned'), ('available_quantity', 'available_quantity'),
+    ('purchase_price', 'purchase_price'), ('rent_price_per_day', 'rent_price_per_day'), ('supplier', 'supplier__name'),
+    ('depth', 'depth'), ('width', 'width'), ('height', 'height'), ('dimension_unit', 'dimension_unit'),
+    ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+]
+
+@login_required
+def item_export_view(request, export_format):
+    """ Master inventory with today's availability as a CSV / NDJSON stream, filtered like the item list (q, category, item_source). """
+    if export_format not in EXPORT_FORMATS:
+        raise Http404("Unknown export format.")
+    queryset = filter_items(request.GET)[0]
+    rows = iterate_values(queryset, [key for name, key in ITEM_EXPORT_COLUMNS])
+    return stream_export(rows, ITEM_EXPORT_COLUMNS, export_format, f"clavis_master_inventory_{timezone.localdate()}")
+
 def print_barcode_view(request, item_id):
     item = get_object_or_404(Item, pk=item_id)
-    from .utils import generate_barcode_base64
-    barcode_image = generate_barcode_base64(item.sku)
     return render(request, 'inventory/print_barcode.html', {
         'item': item,
-        'barcode_image': barcode_image,
+        'barcode_url': barcode_url(item.sku, 'svg'), # Vector, prints sharply at any size
     })
 
+def barcode_image_view(request, version, sku, barcode_format):
+    """ Stored barcode image of a SKU, cacheable forever; built on the first request if an item has that SKU. """
+    if version != BARCODE_VERSION or barcode_format not in BARCODE_FORMATS:
+        raise Http404("Unknown barcode image.")
+    name = barcode_name(sku, barcode_format)
+    if not default_storage.exists(name):
+        if not Item.objects.filter(sku=sku).exists():
+            raise Http404("No item has this SKU.")
+        try:
+            build_barcodes(sku, formats=[barcode_format])
+        except BarcodeError as e:
+            raise Http404(f"Cannot encode this SKU as a barcode: {e}")
+    response = FileResponse(default_storage.open(name, 'rb'), content_type=BARCODE_FORMATS[barcode_format]['content_type'])
+    response['Cache-Control'] = BARCODE_CACHE_CONTROL
+    return response
+
+
+def label_sheet_view(request):
+    """
+    Barcode label sheets as one PDF. Items are selected with any of ?items=12:3,15 (id:copies),
+    ?category=, ?supplier= (?copies= each), ?event= / ?rental= (booked quantity x ?copies=);
+    ?layout= is an Avery layout from inventory.label_sheets and ?skip= leaves used positions of the first sheet empty.
+    """
+    layout = request.GET.get('layout') or DEFAULT_LABEL_LAYOUT
+    if layout not in LABEL_LAYOUTS:
+        return HttpResponseBadRequest(f"Unknown layout; use one of: {', '.join(LABEL_LAYOUTS)}.", content_type='text/plain')
+    try:
+        selection = {key: int(request.GET[key]) for key in ('category', 'supplier', 'event', 'rental') if request.GET.get(key)}
+        copies = int(request.GET.get('copies') or 1)
+        skip = int(request.GET.get('skip') or 0)
+        if copies < 1:
+            raise ValueError("copies must be at least 1.")
+        labels = label_selection(parse_item_copies(request.GET.get('items', '')), copies=copies, **selection)
+        if not labels:
+            raise ValueError("No items with a SKU were selected.")
+        pdf = render_label_sheets(labels, layout, skip)
+    except ValueError as e:
+        return HttpResponseBadRequest(f"Invalid label selection: {e}", content_type='text/plain')
+
+    response = HttpResponse(pdf, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="clavis_labels_{layout}_{timezone.localdate()}.pdf"'
+    return response
+
 
 def item_detail_view(request, item_id):
-    item = get_object_or_404(Item.objects.select_related('category', 'supplier'), pk=item_id)
+    item = get_object_or_404(Item.objects.select_related('category', 'supplier').with_availability(), pk=item_id)
     context = { 
         'item': item, 
         'page_title': f"Item Details: {item.name}", 
@@ -173,9 +243,7 @@ def delete_item_image(request, image_id):
     item_id = image.item.id
 
     if request.method == 'GET' and request.GET.get('confirm') == '1':
-        # Delete file from media folder
-        if image.image and os.path.isfile(image.image.path):
-            os.remove(image.image.path)
+        # The file (and its derivatives) is removed by inventory.signals once no other row shares it
         image.delete()
         messages.success(request, "Image deleted successfully.")
 
@@ -184,7 +252,7 @@ def delete_item_image(request, image_id):
 def master_inventory_report(request):
     format_param = request.GET.get('format') 
     pdf_type = request.GET.get('type')  # 'client' or 'complete'
-    items = Item.objects.all().select_related('category', 'supplier').order_by('category', 'name')
+    items = Item.objects.all().select_related('category', 'supplier').with_availability().order_by('category', 'name')
     if format_param == 'xlsx': return generate_master_inventory_excel(items)
     elif format_param == 'pdf':
         client_view = (pdf_type == 'client')
@@ -198,6 +266,7 @@ def availability_report_view(request):
     form = AvailabilityCheckForm(request.GET or None)
     overlapping_events = None
     overlapping_rentals = None
+    daily_occupancy = None
     selected_item_obj = None
     start_date_val = None # This will be a date object
     end_date_val = None   # This will be a date object
@@ -226,6 +295,12 @@ def availability_report_view(request):
             booking__start_date__lte=end_datetime_aware   # Use aware datetime
         ).select_related('booking__client', 'item').order_by('booking__start_date')
 
+        # Per-day reserved quantity: a range scan over the materialized occupancy table
+        daily_occupancy = [
+            {'day': day, 'reserved': reserved, 'free': max(0, selected_item_obj.initial_quantity - reserved)}
+            for day, reserved in item_occupancy_by_day(selected_item_obj, start_date_val, end_date_val)
+        ]
+
     context = { 
         'form': form, 
         'selected_item': selected_item_obj, # Changed from selected_item_obj for consistency with template
@@ -233,6 +308,7 @@ def availability_report_view(request):
         'end_date': end_date_val,         # Pass original date objects for display
         'overlapping_events': overlapping_events, 
         'overlapping_rentals': overlapping_rentals, 
+        'daily_occupancy': daily_occupancy,
         'page_title': 'Inventory Availability Report' 
     }
     return render(request, 'inventory/availability_report.html', context)
\ No newline at end of file
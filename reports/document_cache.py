@@ -0,0 +1,189 @@
+# clavis_event_inventory/reports/document_cache.py
+
+"""
+On-disk cache for generated documents (delivery notes, receipts, waybills, quote PDFs).
+
+Each document is stored under a fingerprint of everything it renders: the caller's state parts
+(e.g. the booking's updated_at and its item lines), PDF_TEMPLATE_VERSION and the logo file.
+The fingerprint doubles as the ETag, so an unchanged document is answered with 304 without being
+read or rendered, and a changed booking simply gets a new file; the previous version of the same
+document is removed when the new one is written.
+
+Settings:
+- DOCUMENT_CACHE_DIR: where files are stored (default BASE_DIR / 'document_cache').
+- DOCUMENT_CACHE_MAX_BYTES: size cap (default 200 MB); the least recently served files are evicted
+  down to 90% of the cap whenever a new file is written. 0 disables the cache.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .pdf_toolkit import PDF_TEMPLATE_VERSION, get_logo_path
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+EVICT_TO_RATIO = 0.9
+
+
+def get_cache_dir():
+    return str(getattr(settings, 'DOCUMENT_CACHE_DIR', settings.BASE_DIR / 'document_cache'))
+
+
+def get_max_bytes():
+    return getattr(settings, 'DOCUMENT_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+
+
+def document_fingerprint(kind, state_parts):
+    """ sha256 over the document kind, template version, logo file and the caller's state (JSON-serialisable, str() fallback). """
+    try:
+        logo_mtime = os.path.getmtime(get_logo_path())
+    except OSError:
+        logo_mtime = None
+    payload = json.dumps([kind, PDF_TEMPLATE_VERSION, logo_mtime, state_parts], default=str, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _document_path(kind, object_key, fingerprint):
+    # object_key ('event-12') groups the versions of one document, so older ones can be removed
+    return os.path.join(get_cache_dir(), kind, f"{object_key}.{fingerprint}.pdf")
+
+
+def _remove_other_versions(path):
+    directory, name = os.path.split(path)
+    prefix = name.split('.', 1)[0] + '.'
+    for entry in os.scandir(directory):
+        if entry.name.startswith(prefix) and entry.name.endswith('.pdf') and entry.path != path:
+            try:
+                os.remove(entry.path)
+            except OSError: # Already removed by a concurrent request
+                pass
+
+
+def _write(path, content):
+    """ Atomic write: readers see either no file or the complete PDF. """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as temp_file:
+            temp_file.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def cache_stats():
+    """ {'files', 'bytes', 'max_bytes', 'directory'} for the cache directory. """
+    files = total = 0
+    for entry in _iter_cached_files():
+        files += 1
+        total += entry.stat().st_size
+    return {'files': files, 'bytes': total, 'max_bytes': get_max_bytes(), 'directory': get_cache_dir()}
+
+
+def _iter_cached_files():
+    cache_dir = get_cache_dir()
+    if not os.path.isdir(cache_dir):
+        return
+    for kind_entry in os.scandir(cache_dir):
+        if kind_entry.is_dir():
+            for entry in os.scandir(kind_entry.path):
+                if entry.is_file() and entry.name.endswith('.pdf'):
+                    yield entry
+
+
+def evict(max_bytes=None):
+    """
+    Removes the least recently served files (by access time, which is bumped on every hit) until the
+    cache is at or below 90% of max_bytes, if it is over max_bytes. Returns the number of files removed.
+    """
+    max_bytes = get_max_bytes() if max_bytes is None else max_bytes
+    entries = []
+    total = 0
+    for entry in _iter_cached_files():
+        stat = entry.stat()
+        entries.append((stat.st_atime, stat.st_size, entry.path))
+        total += stat.st_size
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    target = max_bytes * EVICT_TO_RATIO
+    for atime, size, path in sorted(entries):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+        total -= size
+    return removed
+
+
+def clear_cache():
+    """ Deletes every cached document. Returns the number of files removed. """
+    removed = 0
+    for entry in list(_iter_cached_files()):
+        try:
+            os.remove(entry.path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def serve_cached_document(request, kind, object_key, state_parts, filename, render):
+    """
+    Returns the document as an attachment response, from disk when the fingerprint is cached.
+    `render()` must return an HttpResponse with the PDF content (the existing generate_*_pdf functions);
+    it is only called on a miss. Conditional requests (If-None-Match / If-Modified-Since) get a 304.
+    """
+    fingerprint = document_fingerprint(kind, state_parts)
+    etag = f'"{fingerprint}"'
+    path = _document_path(kind, object_key, fingerprint)
+    max_bytes = get_max_bytes()
+
+    try:
+        last_modified = int(os.path.getmtime(path))
+    except OSError:
+        last_modified = None
+
+    # The fingerprint identifies the content, so a matching ETag is enough even if the file was evicted
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        return not_modified
+
+    response = None
+    if last_modified is not None and max_bytes:
+        try:
+            response = FileResponse(open(path, 'rb'), content_type='application/pdf', as_attachment=True, filename=filename)
+            response['X-Document-Cache'] = 'hit'
+            os.utime(path, (time.time(), os.path.getmtime(path))) # Bumps the access time used for the eviction order
+        except OSError: # Evicted between the stat and the open
+            response = None
+
+    if response is None:
+        response = render()
+        if response.status_code != 200 or response.get('Content-Type') != 'application/pdf':
+            return response
+        last_modified = int(time.time())
+        if max_bytes:
+            _write(path, response.content)
+            _remove_other_versions(path)
+            evict(max_bytes)
+        response['X-Document-Cache'] = 'miss'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache' # Revalidate every time; the ETag check is cheap
+    return response
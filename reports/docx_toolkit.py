@@ -0,0 +1,52 @@
+# clavis_event_inventory/reports/docx_toolkit.py
+
+"""
+Shared python-docx helpers for the Word exports (master inventory, monthly summary).
+
+Styling a cell through python-docx (add_run, font.size, paragraph.alignment) creates and positions
+each XML element one at a time, which dominates the export time on a few hundred rows. Body rows are
+therefore built once as a styled prototype row, and every data row is a deep copy of its XML in
+which only the text is replaced: the resulting document is the same as styling each cell.
+"""
+
+import copy
+
+from docx.oxml.ns import qn
+
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+PLACEHOLDER = '-'
+SPECIAL_CHARACTERS = ('\t', '\n', '\r')
+
+
+def _set_run_text(run_element, text):
+    if text and text == text.strip() and not any(character in text for character in SPECIAL_CHARACTERS):
+        run_element.find(qn('w:t')).text = text
+    else:
+        # Empty text, surrounding spaces, tabs and line breaks: python-docx's own run text handling
+        run_element.text = text
+
+
+def append_text_rows(table, rows, font_size, alignments=None):
+    """
+    Appends one row per list of strings in `rows` to a python-docx table, each cell holding a single run
+    of `font_size` with the paragraph alignment given per column in `alignments` (None leaves it unset).
+    Returns the number of rows added.
+    """
+    prototype = table.add_row()
+    for index, cell in enumerate(prototype.cells):
+        paragraph = cell.paragraphs[0]
+        paragraph.add_run(PLACEHOLDER).font.size = font_size
+        if alignments and alignments[index] is not None:
+            paragraph.alignment = alignments[index]
+    prototype_tr = prototype._tr
+    tbl = prototype_tr.getparent()
+    tbl.remove(prototype_tr)
+
+    count = 0
+    for values in rows:
+        tr = copy.deepcopy(prototype_tr)
+        for run_element, text in zip(tr.iter(qn('w:r')), values):
+            _set_run_text(run_element, text)
+        tbl.append(tr)
+        count += 1
+    return count
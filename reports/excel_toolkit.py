@@ -0,0 +1,85 @@
+# clavis_event_inventory/reports/excel_toolkit.py
+
+"""
+Shared openpyxl helpers for the streaming Excel exports (master inventory, monthly summary).
+
+Workbooks are built in write-only mode: rows go straight to openpyxl's temporary sheet file
+instead of being kept as Cell objects, and the finished .xlsx is written to a temporary file
+that is streamed back with a FileResponse, so memory stays flat whatever the number of rows.
+
+Write-only sheets emit their column widths before the first row, so exports make two passes
+over the same row generator: ColumnWidths measures it (one running maximum per column), then
+the rows are written. Querysets are read with iterator() in both passes.
+"""
+
+import tempfile
+
+from django.http import FileResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+ITERATOR_CHUNK_SIZE = 2000
+
+
+def iterate_rows(source, chunk_size=ITERATOR_CHUNK_SIZE):
+    """ Streams a queryset (without filling its result cache); lists and other iterables are returned as-is. """
+    if hasattr(source, 'iterator'):
+        return source.iterator(chunk_size=chunk_size)
+    return source
+
+
+class ColumnWidths:
+    """ Running maximum of the displayed text length per column, fed one row at a time. """
+
+    def __init__(self):
+        self.lengths = []
+
+    def add(self, values, start_column=1):
+        for offset, value in enumerate(values):
+            if value is None or value == '':
+                continue
+            index = start_column - 1 + offset
+            while len(self.lengths) <= index:
+                self.lengths.append(0)
+            length = max(len(line) for line in str(value).split('\n'))
+            if length > self.lengths[index]:
+                self.lengths[index] = length
+
+    def apply(self, sheet, padding=2, default=12, minimums=None):
+        """ Sets the widths on a (write-only) sheet; must run before its first row is appended. """
+        minimums = minimums or {}
+        for index, length in enumerate(self.lengths, 1):
+            letter = get_column_letter(index)
+            width = length + padding if length else default
+            sheet.column_dimensions[letter].width = max(width, minimums.get(letter, 0))
+
+
+def styled_cell(sheet, value, font=None, fill=None, alignment=None, border=None):
+    """ WriteOnlyCell with the given styles (None leaves the default). """
+    cell = WriteOnlyCell(sheet, value=value)
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    if alignment is not None:
+        cell.alignment = alignment
+    if border is not None:
+        cell.border = border
+    return cell
+
+
+def new_write_only_workbook(title):
+    """ (workbook, sheet) in write-only mode. """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title)
+    return workbook, sheet
+
+
+def workbook_response(workbook, filename):
+    """ Saves the workbook to a temporary file and streams it as an attachment; the file is deleted once sent. """
+    handle = tempfile.TemporaryFile()
+    workbook.save(handle)
+    handle.seek(0)
+    return FileResponse(handle, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
@@ -0,0 +1,141 @@
+# clavis_event_inventory/reports/full_text_search.py
+
+"""
+SQLite FTS5 full-text indexes behind the list searches (inventory items, clients).
+
+An index is an FTS5 table holding one row per searchable row (rowid = its pk), kept in sync by SQLite
+triggers, so every write path (save(), queryset.update(), bulk_create(), raw SQL) updates it. Tables and
+triggers are created by ensure_search_index() after every migrate, and rebuilt whenever a trigger is
+missing: SQLite drops a table's triggers when a migration rebuilds that table.
+
+search() matches every word of the query as a prefix ('ITEM-0001' finds ITEM-000164) and orders by
+bm25 rank with per-column weights. On other databases, or a SQLite built without FTS5, it falls back
+to icontains filters.
+
+An index is described by a dict:
+    'table':    FTS5 table name
+    'columns':  {column: bm25 weight}, in the order the 'source' query selects them (after the pk)
+    'source':   SELECT of pk and column values; the trigger conditions below are ANDed to its WHERE
+    'triggers': {suffix: {'on': trigger event, 'delete': rowids to drop, 'insert': source condition}}
+    'relation': name of the OneToOne relation to the unmanaged model mapping the table (FullTextField 'document', 'rank')
+    'ordering': tie-breakers after the rank
+    'fallback_fields': fields searched with icontains without FTS5
+"""
+
+import re
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, models, transaction
+from django.db.models import F, FloatField, Lookup, Q, Value
+
+TOKENIZER = 'unicode61 remove_diacritics 2'
+PREFIX_LENGTHS = '2 3' # Prefix indexes for the short, as-you-type queries
+
+_ready = {} # (database name, table) -> whether the FTS5 table exists
+
+
+class FullTextField(models.TextField):
+    """ The hidden column named after an FTS5 table, which MATCH queries are run against. """
+
+
+@FullTextField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", (*lhs_params, *rhs_params)
+
+
+def match_expression(query):
+    """ FTS5 query requiring every word of `query` as a prefix, e.g. 'ITEM-0001' -> '"ITEM"* "0001"*'; '' without words. """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'[^\W_]+', query or ''))
+
+
+def _key(index, using):
+    return (connections[using].settings_dict['NAME'], index['table'])
+
+
+def index_ready(index, using=DEFAULT_DB_ALIAS):
+    """ Whether searches on `using` can use the FTS5 table of `index`. """
+    key = _key(index, using)
+    if key not in _ready:
+        connection = connections[using]
+        _ready[key] = connection.vendor == 'sqlite' and index['table'] in connection.introspection.table_names()
+    return _ready[key]
+
+
+def _trigger_sql(index, suffix, trigger):
+    table, columns = index['table'], ', '.join(index['columns'])
+    statements = []
+    if trigger.get('delete'):
+        statements.append(f"DELETE FROM {table} WHERE rowid IN ({trigger['delete']});")
+    if trigger.get('insert'):
+        statements.append(f"INSERT INTO {table}(rowid, {columns}) {index['source']} WHERE {trigger['insert']};")
+    return f"CREATE TRIGGER IF NOT EXISTS {table}_{suffix} {trigger['on']} BEGIN {' '.join(statements)} END"
+
+
+def rebuild_search_index(index, using=DEFAULT_DB_ALIAS):
+    """ Refills the FTS5 table of `index` from its source rows. """
+    table = index['table']
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(f"INSERT INTO {table}(rowid, {', '.join(index['columns'])}) {index['source']}")
+        cursor.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+
+
+def ensure_search_index(index, using=DEFAULT_DB_ALIAS, verbosity=1):
+    """
+    Creates the FTS5 table and triggers of `index` where missing, rebuilding the table when anything had to be
+    created. Returns whether the index is usable (False off SQLite or without FTS5).
+    """
+    connection = connections[using]
+    _ready.pop(_key(index, using), None)
+    if connection.vendor != 'sqlite':
+        return False
+    table = index['table']
+    triggers = {f"{table}_{suffix}": (suffix, trigger) for suffix, trigger in index['triggers'].items()}
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        created = table not in connection.introspection.table_names(cursor)
+        if created:
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {table} USING fts5({', '.join(index['columns'])}, "
+                    f"prefix='{PREFIX_LENGTHS}', tokenize='{TOKENIZER}')"
+                )
+            except OperationalError as e: # No FTS5 in this SQLite build
+                if verbosity:
+                    print(f"Full-text index {table} not created ({e}); searches use icontains.")
+                return False
+            weights = ', '.join(str(float(weight)) for weight in index['columns'].values())
+            cursor.execute(f"INSERT INTO {table}({table}, rank) VALUES ('rank', 'bm25({weights})')")
+        placeholders = ', '.join(['%s'] * len(triggers))
+        cursor.execute(f"SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})", list(triggers))
+        missing = set(triggers) - {row[0] for row in cursor.fetchall()}
+        for name in missing:
+            cursor.execute(_trigger_sql(index, *triggers[name]))
+    if created or missing:
+        rebuild_search_index(index, using)
+        if verbosity:
+            print(f"Full-text index {table} rebuilt.")
+    return True
+
+
+def search(queryset, index, query):
+    """
+    `queryset` narrowed to the rows matching `query`, annotated with `search_rank` (lower is better). With FTS5:
+    every word as a prefix, best matches first. Otherwise the whole query as an icontains filter on the fallback
+    fields, ordering unchanged and a search_rank of 0.
+    """
+    match = match_expression(query)
+    if match and index_ready(index, queryset.db):
+        relation = index['relation']
+        return (
+            queryset.filter(**{f"{relation}__document__match": match})
+            .annotate(search_rank=F(f"{relation}__rank"))
+            .order_by('search_rank', *index['ordering'])
+        )
+    condition = Q()
+    for field in index['fallback_fields']:
+        condition |= Q(**{f"{field}__icontains": query})
+    return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
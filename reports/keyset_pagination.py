@@ -0,0 +1,177 @@
+# clavis_event_inventory/reports/keyset_pagination.py
+
+"""
+Keyset (cursor) pagination and the shared list filters (status, date range, client, project manager).
+
+A page is fetched with a range condition on the sort keys of the last (or first) row shown instead of an
+OFFSET, so with an index on those keys every page costs the same however much history precedes it, and
+no COUNT(*) is run. The cursor in the 'after' / 'before' query parameter is the base64 JSON of those
+sort key values. The last sort key must be unique (normally the pk).
+"""
+
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.utils import timezone
+
+DEFAULT_PAGE_SIZE = 25
+
+
+def get_list_page_size():
+    return getattr(settings, 'LIST_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+
+
+def _json_value(value):
+    # Full isoformat(): DjangoJSONEncoder cuts datetimes to milliseconds, and the cursor must compare equal
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, default=_json_value).encode()).decode().rstrip('=')
+
+
+def decode_cursor(queryset, fields, cursor):
+    """ The sort key values in `cursor`, converted back to their field types; None when it is not a valid cursor. """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(fields):
+            return None
+        converted = []
+        for name, value in zip(fields, values):
+            field = _sort_field(queryset, name)
+            if field is None: # Compared as given
+                converted.append(value)
+                continue
+            converted.append(field.to_python(value) if value is not None else None)
+        return converted
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def _sort_field(queryset, name):
+    """ The field whose to_python() converts cursor values of the sort key `name` (the pk, an annotation or a model field). """
+    if name == 'pk':
+        return queryset.model._meta.pk
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    try:
+        return queryset.model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def _seek(fields, descending, values):
+    """
+    Rows after `values` in the ordering: f1 beyond v1, or f1 = v1 and f2 beyond v2, and so on; ANDed with
+    f1 beyond-or-equal v1 so the database can seek the index of f1 instead of filtering from the start.
+    """
+    def beyond(name, desc, value, inclusive=False):
+        return Q(**{f"{name}__{'l' if desc else 'g'}{'te' if inclusive else 't'}": value})
+
+    condition = beyond(fields[-1], descending[-1], values[-1])
+    for name, desc, value in reversed(list(zip(fields[:-1], descending[:-1], values[:-1]))):
+        condition = beyond(name, desc, value) | (Q(**{name: value}) & condition)
+    return beyond(fields[0], descending[0], values[0], inclusive=True) & condition
+
+
+def keyset_page(queryset, ordering, params, per_page=None):
+    """
+    One page of `queryset` in `ordering` (e.g. ('-start_date', '-pk')), positioned by the 'after' or 'before'
+    cursor in `params`; an invalid cursor gives the first page. Returns a dict with 'object_list',
+    'has_next', 'has_previous', 'next_cursor' and 'previous_cursor'.
+    """
+    per_page = per_page or get_list_page_size()
+    fields = [name.lstrip('-') for name in ordering]
+    descending = [name.startswith('-') for name in ordering]
+    backwards = bool(params.get('before')) and not params.get('after')
+    cursor = params.get('before') if backwards else params.get('after')
+    values = decode_cursor(queryset, fields, cursor) if cursor else None
+
+    if backwards and values is not None:
+        # Rows before the cursor: seek the reversed ordering, then put the page back in order
+        reversed_descending = [not desc for desc in descending]
+        reversed_ordering = [f"{'-' if desc else ''}{name}" for name, desc in zip(fields, reversed_descending)]
+        rows = list(queryset.filter(_seek(fields, reversed_descending, values)).order_by(*reversed_ordering)[:per_page + 1])
+        has_previous, has_next = len(rows) > per_page, True
+        rows = rows[:per_page][::-1]
+    else:
+        if values is not None:
+            queryset = queryset.filter(_seek(fields, descending, values))
+        rows = list(queryset.order_by(*ordering)[:per_page + 1])
+        has_previous, has_next = values is not None, len(rows) > per_page
+        rows = rows[:per_page]
+
+    def row_cursor(row):
+        return encode_cursor([getattr(row, 'pk' if name == 'pk' else name) for name in fields])
+
+    return {
+        'object_list': rows,
+        'has_next': has_next and bool(rows),
+        'has_previous': has_previous and bool(rows),
+        'next_cursor': row_cursor(rows[-1]) if rows else None,
+        'previous_cursor': row_cursor(rows[0]) if rows else None,
+    }
+
+
+def _local_day_start(value, days=0):
+    """ Aware datetime of the start of a 'YYYY-MM-DD' local day (plus `days`); None when empty or invalid. """
+    try:
+        day = datetime.date.fromisoformat(value) + datetime.timedelta(days=days)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def apply_list_filters(queryset, params, date_field, status_choices=None):
+    """
+    The list filters in `params` applied to `queryset`: status, client and project_manager ids, and a range of
+    local days (date_from, date_to, inclusive) on `date_field`. Invalid values are ignored, like the item
+    list's category filter. Returns (queryset, selected values as strings for the filter form).
+    """
+    selected = {key: params.get(key, '').strip() for key in ('status', 'client', 'project_manager', 'date_from', 'date_to')}
+
+    if status_choices is not None:
+        if selected['status'] in dict(status_choices):
+            queryset = queryset.filter(status=selected['status'])
+        else:
+            selected['status'] = ''
+    for key in ('client', 'project_manager'):
+        if selected[key]:
+            try:
+                queryset = queryset.filter(**{f"{key}_id": int(selected[key])})
+            except ValueError:
+                selected[key] = ''
+
+    date_from, date_to_end = _local_day_start(selected['date_from']), _local_day_start(selected['date_to'], days=1)
+    if date_from:
+        queryset = queryset.filter(**{f"{date_field}__gte": date_from})
+    else:
+        selected['date_from'] = ''
+    if date_to_end:
+        queryset = queryset.filter(**{f"{date_field}__lt": date_to_end})
+    else:
+        selected['date_to'] = ''
+    return queryset, selected
+
+
+def filter_choices(selected):
+    """
+    Options of the client / project manager filters, at a cost independent of history: the client filter is an
+    autocomplete (clients:client_autocomplete), so only the selected client is loaded here as (pk, label); the
+    manager select lists the active users, which grow with the team rather than with the bookings.
+    """
+    from django.contrib.auth.models import User
+    from clients.models import Client
+    client = Client.objects.filter(pk=selected['client']).only('pk', 'name', 'company_name').first() if selected['client'] else None
+    managers = User.objects.filter(is_active=True).order_by('first_name', 'last_name', 'username')
+    return {
+        'filter_client': (client.pk, str(client)) if client else None,
+        'filter_managers': [
+            (pk, f"{first_name} {last_name}".strip() or username)
+            for pk, username, first_name, last_name in managers.values_list('pk', 'username', 'first_name', 'last_name')
+        ],
+    }
@@ -0,0 +1,96 @@
+# reports/management/commands/benchmark_docx_exports.py
+
+import json
+import os
+import platform
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils import timezone
+
+from bookings.utils import generate_master_inventory_docx as generate_bookings_master_inventory_docx
+from inventory.management.commands.seed_synthetic_data import scaled_counts, seed
+from inventory.models import Item
+from inventory.utils import generate_master_inventory_docx
+from reports.views import monthly_summary_report_view
+
+
+class _Rollback(Exception):
+    """ Raised to discard the seeded dataset once it has been benchmarked. """
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the DOCX exports (master inventory from inventory and bookings, monthly summary for all periods) "
+        "at a given number of table rows. The rows are seeded inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Synthetic items, events, rentals and clients to add.')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per export; the min and median times are reported.')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic data.')
+        parser.add_argument('--save-dir', help='Also write the generated documents to this directory (to compare versions).')
+        parser.add_argument('--output', help='Optional JSON output path.')
+
+    def get_exports(self, rows):
+        """ [(name, render)] """
+        items = Item.objects.select_related('category', 'supplier').with_availability().order_by('pk')[:rows]
+        request = RequestFactory().get('/', {'year': 'all', 'month': 'all', 'format': 'docx'})
+        request.user = User.objects.filter(is_superuser=True).order_by('pk').first()
+        return [
+            ('master_inventory', lambda: generate_master_inventory_docx(items)),
+            ('master_inventory_bookings', lambda: generate_bookings_master_inventory_docx(items)),
+            ('monthly_summary', lambda: monthly_summary_report_view(request)),
+        ]
+
+    def run_exports(self, options):
+        results = {}
+        for name, render in self.get_exports(options['rows']):
+            timings = []
+            for run in range(options['repeat']):
+                start = time.perf_counter()
+                response = render()
+                timings.append((time.perf_counter() - start) * 1000)
+            results[name] = {
+                'bytes': len(response.content),
+                'ms_min': round(min(timings), 1), 'ms_median': round(statistics.median(timings), 1),
+            }
+            self.stdout.write(f"{name:<28} min {min(timings):>9.1f} ms | median {statistics.median(timings):>9.1f} ms | {len(response.content):>9} B")
+            if options['save_dir']:
+                with open(os.path.join(options['save_dir'], f"{name}.docx"), 'wb') as handle:
+                    handle.write(response.content)
+        return results
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1 or options['rows'] < 1:
+            raise CommandError("--rows and --repeat must be at least 1.")
+        if options['save_dir']:
+            os.makedirs(options['save_dir'], exist_ok=True)
+
+        rows = options['rows']
+        counts = {**scaled_counts(rows), 'events': rows, 'rentals': rows, 'clients': rows, 'images': 0}
+        self.stdout.write(f"Seeding synthetic dataset ({rows} items, events, rentals and clients)...")
+        try:
+            with transaction.atomic():
+                seed(counts, random.Random(options['seed']))
+                results = self.run_exports(options)
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        if options['output']:
+            report = {
+                'generated_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'rows': rows,
+                'repeat': options['repeat'],
+                'exports': results,
+            }
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
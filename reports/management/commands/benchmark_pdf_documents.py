@@ -0,0 +1,122 @@
+# reports/management/commands/benchmark_pdf_documents.py
+
+import json
+import platform
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from bookings.models import Event, Rental
+from bookings.utils import generate_delivery_note_pdf, generate_receipt_pdf, generate_logistics_waybill_pdf
+from inventory.models import Item
+from inventory.utils import generate_master_inventory_pdf
+from reports import pdf_toolkit
+from reports.views import monthly_summary_report_view
+from request_quote.models import QuoteRequest
+from request_quote.utils import generate_quote_pdf
+
+
+class Command(BaseCommand):
+    help = (
+        "Times every PDF document generator with the shared PDF toolkit caches (after) and with the "
+        "per-document work the generators used to do (before): rebuilding the stylesheet and embedding "
+        "the full-size logo. Uses the current data; run seed_synthetic_data first on an empty database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Renders per document and mode; the min and median times are reported.')
+        parser.add_argument('--items', type=int, default=100, help='Items in the master inventory PDF.')
+        parser.add_argument('--only', nargs='+', help='Only run documents whose name contains one of these strings.')
+        parser.add_argument('--output', help='Optional JSON output path.')
+
+    def get_documents(self, item_limit):
+        """ [(name, render)]; documents whose objects do not exist in the data are skipped. """
+        event = Event.objects.filter(is_logistics_only_service=False, items__isnull=False).order_by('-pk').first()
+        logistics_event = Event.objects.filter(is_logistics_only_service=True).order_by('-pk').first()
+        rental = Rental.objects.filter(items__isnull=False).order_by('-pk').first()
+        quote = QuoteRequest.objects.filter(items__isnull=False).select_related('project_manager').order_by('-pk').first()
+
+        request = RequestFactory().get('/', {'year': 'all', 'month': 'all', 'format': 'pdf'})
+        request.user = User.objects.filter(is_superuser=True).order_by('pk').first()
+        items = Item.objects.select_related('category', 'supplier').order_by('pk')
+
+        documents = [
+            ('monthly_summary', lambda: monthly_summary_report_view(request)),
+            ('master_inventory', lambda: generate_master_inventory_pdf(items[:item_limit])),
+        ]
+        if event:
+            documents += [
+                ('delivery_note_event', lambda: generate_delivery_note_pdf(event)),
+                ('receipt_event', lambda: generate_receipt_pdf(event)),
+            ]
+        if rental:
+            documents += [
+                ('delivery_note_rental', lambda: generate_delivery_note_pdf(rental)),
+                ('receipt_rental', lambda: generate_receipt_pdf(rental)),
+            ]
+        if logistics_event:
+            documents.append(('waybill', lambda: generate_logistics_waybill_pdf(logistics_event)))
+        if quote:
+            documents.append(('quote', lambda: generate_quote_pdf(quote)))
+        return documents
+
+    def _measure(self, render, repeat, rebuild_styles):
+        timings = []
+        size = None
+        for run in range(repeat):
+            start = time.perf_counter()
+            if rebuild_styles:
+                pdf_toolkit._build_styles() # What every document used to pay before the shared registry
+            response = render()
+            timings.append((time.perf_counter() - start) * 1000)
+            size = len(response.content)
+        return {'bytes': size, 'ms_min': round(min(timings), 2), 'ms_median': round(statistics.median(timings), 2)}
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1.")
+
+        results = {}
+        for name, render in self.get_documents(options['items']):
+            if options['only'] and not any(part in name for part in options['only']):
+                continue
+
+            with override_settings(PDF_LOGO_DPI=None):
+                before = self._measure(render, options['repeat'], rebuild_styles=True)
+            pdf_toolkit._downscaled_logo.cache_clear()
+            cold = self._measure(render, 1, rebuild_styles=False) # Includes the one-off logo decode
+            after = self._measure(render, options['repeat'], rebuild_styles=False)
+
+            speedup = round(before['ms_median'] / after['ms_median'], 1) if after['ms_median'] else None
+            results[name] = {'before': before, 'after_cold': cold, 'after': after, 'speedup': speedup}
+            self.stdout.write(
+                f"{name:<22} | before {before['ms_median']:>8.1f} ms {before['bytes']:>9} B | "
+                f"after {after['ms_median']:>8.1f} ms {after['bytes']:>9} B (cold {cold['ms_min']:>7.1f} ms) | x{speedup}"
+            )
+
+        if not results:
+            raise CommandError("No documents to render. Create some bookings/quotes or run seed_synthetic_data first.")
+
+        style_timings = []
+        for run in range(options['repeat']):
+            start = time.perf_counter()
+            pdf_toolkit._build_styles()
+            style_timings.append((time.perf_counter() - start) * 1000)
+        self.stdout.write(f"Stylesheet build: {statistics.median(style_timings):.2f} ms (now once per process)")
+
+        if options['output']:
+            report = {
+                'generated_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'repeat': options['repeat'],
+                'stylesheet_build_ms': round(statistics.median(style_timings), 3),
+                'documents': results,
+            }
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
@@ -0,0 +1,32 @@
+# reports/management/commands/clear_document_cache.py
+
+from django.core.management.base import BaseCommand
+
+from reports.document_cache import cache_stats, clear_cache, evict
+
+
+class Command(BaseCommand):
+    help = "Deletes the cached delivery notes, receipts, waybills and quote PDFs (or only reports/trims the cache)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stats', action='store_true', help='Only show the cache size.')
+        parser.add_argument('--evict', action='store_true', help='Only evict the least recently served files down to DOCUMENT_CACHE_MAX_BYTES.')
+
+    def _print_stats(self):
+        stats = cache_stats()
+        self.stdout.write(
+            f"{stats['files']} cached document(s), {stats['bytes'] / 1024 / 1024:.1f} MB of "
+            f"{stats['max_bytes'] / 1024 / 1024:.1f} MB in {stats['directory']}"
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self._print_stats()
+            return
+        if options['evict']:
+            removed = evict()
+            self.stdout.write(self.style.SUCCESS(f"Evicted {removed} cached document(s)."))
+        else:
+            removed = clear_cache()
+            self.stdout.write(self.style.SUCCESS(f"Removed {removed} cached document(s)."))
+        self._print_stats()
@@ -0,0 +1,304 @@
+# clavis_event_inventory/reports/pdf_toolkit.py
+
+"""
+Shared ReportLab building blocks for every PDF the app produces: delivery notes, receipts and
+waybills (bookings), quote requests (request_quote), the monthly summary (reports) and the
+master inventory (inventory).
+
+- STYLES is built once at import and shared by all documents, so it must be treated as read-only.
+- The company logo is decoded once per process and downscaled to print resolution
+  (settings.PDF_LOGO_DPI, default 300) instead of re-decoding and embedding the full-size PNG
+  in every document. PDF_LOGO_DPI = None embeds the original file.
+"""
+
+import functools
+import io
+import os
+
+from django.conf import settings
+from PIL import Image as PILImage
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT, TA_RIGHT
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Image, Paragraph, Spacer, Table, TableStyle
+
+# --- COMPANY DETAILS ---
+COMPANY_NAME_FOR_PDF = "Clavis Events & Promotions W.L.L"
+COMPANY_ADDRESS_PDF_LINE1 = "Office 123, Building 456, Road 789"
+COMPANY_ADDRESS_PDF_LINE2 = "Manama, Kingdom of Bahrain"
+COMPANY_CONTACT_DETAILS_PDF = "Tel: +973 1700 0000 | Email: info@clavisevents.com"
+COMPANY_REGISTRATION_PDF = "CR: XXXXXX-X | VAT: XXXXXXXXXXXXXXX"
+
+# Bump when the layout of any document changes, so cached copies (reports.document_cache) are regenerated
+PDF_TEMPLATE_VERSION = 1
+
+LOGO_WIDTH = 1.5*inch
+LOGO_HEIGHT = 0.6*inch
+DEFAULT_LOGO_DPI = 300
+
+
+# --- PDF STYLES ---
+def _build_styles():
+    styles = getSampleStyleSheet()
+    base_font = 'Helvetica'
+    base_font_bold = 'Helvetica-Bold'
+
+    # Company Header Styles
+    styles.add(ParagraphStyle(name='CompanyNameLarge', parent=styles['h1'], fontName=base_font_bold, fontSize=16, leading=18, alignment=TA_LEFT, textColor=colors.HexColor("#2C3E50")))
+    styles.add(ParagraphStyle(name='CompanyAddressSmall', parent=styles['Normal'], fontName=base_font, fontSize=7, leading=8, alignment=TA_LEFT, textColor=colors.HexColor("#34495E")))
+
+    # Document Title & Reference Styles
+    styles.add(ParagraphStyle(name='DocumentTitleMain', parent=styles['h1'], fontName=base_font_bold, fontSize=18, alignment=TA_RIGHT, textColor=colors.HexColor("#4A4A4A"), spaceBefore=0, spaceAfter=1))
+    styles.add(ParagraphStyle(name='DocumentReference', parent=styles['Normal'], fontName=base_font_bold, fontSize=8, alignment=TA_RIGHT, textColor=colors.HexColor("#2C3E50"), spaceBefore=3))
+
+    # Addressee & Date Section Styles
+    styles.add(ParagraphStyle(name='AddresseeToLabel', parent=styles['Normal'], fontName=base_font, fontSize=7.5, alignment=TA_LEFT, textColor=colors.HexColor("#7F8C8D"), spaceBefore=0, spaceAfter=1, leading=9))
+    styles.add(ParagraphStyle(name='AddresseeName', parent=styles['Normal'], fontName=base_font_bold, fontSize=9, alignment=TA_LEFT, textColor=colors.HexColor("#2C3E50"), spaceBefore=0, spaceAfter=0, leading=11))
+    styles.add(ParagraphStyle(name='AddresseeInfo', parent=styles['Normal'], fontName=base_font, fontSize=7.5, alignment=TA_LEFT, textColor=colors.HexColor("#34495E"), leading=9))
+    styles.add(ParagraphStyle(name='RightDetailLine', parent=styles['Normal'], fontName=base_font, fontSize=8, alignment=TA_RIGHT, textColor=colors.HexColor("#2C3E50"), spaceBefore=0, spaceAfter=0, leading=10))
+    styles.add(ParagraphStyle(name='RightDetailLineBold', parent=styles['RightDetailLine'], fontName=base_font_bold))
+
+    # Item Table Styles
+    styles.add(ParagraphStyle(name='ItemsTableHeader', parent=styles['Normal'], fontName=base_font_bold, fontSize=7.5, alignment=TA_CENTER, textColor=colors.white, spaceBefore=2, spaceAfter=2))
+    styles.add(ParagraphStyle(name='ItemsTableCellText', parent=styles['Normal'], fontName=base_font, fontSize=7.5, leading=9, alignment=TA_LEFT))
+    styles.add(ParagraphStyle(name='ItemsTableCellNumber', parent=styles['Normal'], fontName=base_font, fontSize=7.5, leading=9, alignment=TA_CENTER))
+
+    # Section Title
+    styles.add(ParagraphStyle(name='SectionTitle', parent=styles['h2'], fontName=base_font_bold, fontSize=10, alignment=TA_LEFT, textColor=colors.HexColor("#2C3E50"), spaceBefore=10, spaceAfter=2, borderPadding=1, bottomPadding=1))
+
+    # Waybill Specific
+    styles.add(ParagraphStyle(name='WaybillDetailLabel', parent=styles['Normal'], fontName=base_font_bold, fontSize=8, alignment=TA_LEFT, spaceAfter=1, leading=10))
+    styles.add(ParagraphStyle(name='WaybillDetailText', parent=styles['Normal'], fontName=base_font, fontSize=8, alignment=TA_LEFT, leftIndent=10, spaceAfter=4, leading=10))
+
+    # Disclaimer & Signature Styles
+    styles.add(ParagraphStyle(name='DisclaimerText', parent=styles['Normal'], fontName=base_font, fontSize=6.5, leading=8, textColor=colors.HexColor("#546E7A"), alignment=TA_JUSTIFY))
+    styles.add(ParagraphStyle(name='SignatureLine', parent=styles['Normal'], fontName=base_font, fontSize=8, spaceBefore=12, textColor=colors.HexColor("#2C3E50"), leading=10))
+    styles.add(ParagraphStyle(name='SignatureLabel', parent=styles['Normal'], fontName=base_font_bold, fontSize=8, spaceBefore=0, textColor=colors.HexColor("#2C3E50"), leading=10))
+
+    # Report Styles (monthly summary, master inventory)
+    styles.add(ParagraphStyle(name='ReportMainTitle', parent=styles['h1'], fontName=base_font_bold, fontSize=18, leading=22, alignment=TA_CENTER, spaceAfter=6, textColor=colors.HexColor("#1A237E")))
+    styles.add(ParagraphStyle(name='ReportPeriodSubtitle', parent=styles['Normal'], alignment=TA_CENTER, fontSize=11, textColor=colors.dimgrey, spaceAfter=18, fontName=base_font))
+    styles.add(ParagraphStyle(name='ReportSectionTitle', parent=styles['h2'], fontName=base_font_bold, fontSize=12, leading=14, textColor=colors.HexColor("#2C3E50"), spaceBefore=10, spaceAfter=4, borderPadding=2))
+    styles.add(ParagraphStyle(name='ReportTableHeader', parent=styles['Normal'], fontName=base_font_bold, fontSize=8, alignment=TA_CENTER, textColor=colors.whitesmoke, leading=10))
+    styles.add(ParagraphStyle(name='ReportTableCell', parent=styles['Normal'], fontName=base_font, fontSize=7.5, leading=9, alignment=TA_LEFT))
+    styles.add(ParagraphStyle(name='ReportTableCellRight', parent=styles['ReportTableCell'], alignment=TA_RIGHT))
+    styles.add(ParagraphStyle(name='ReportTableCellCenter', parent=styles['ReportTableCell'], alignment=TA_CENTER))
+    styles.add(ParagraphStyle(name='InventoryTableCell', parent=styles['Normal'], fontSize=7, leading=8))
+
+    styles.add(ParagraphStyle(name='NoDataMessage', parent=styles['Normal'], fontSize=9, textColor=colors.grey, alignment=TA_CENTER, spaceBefore=6, spaceAfter=6))
+    return styles
+
+
+# Process-wide registry; ReportLab only reads styles while rendering, so one instance serves every document
+STYLES = _build_styles()
+
+
+def get_pdf_styles():
+    """ The shared, read-only stylesheet. """
+    return STYLES
+
+
+# --- LOGO ---
+def get_logo_path():
+    static_dir = settings.STATICFILES_DIRS[0] if settings.STATICFILES_DIRS else settings.STATIC_ROOT or ''
+    return os.path.join(static_dir, 'images', 'clavis_logo.png')
+
+
+@functools.lru_cache(maxsize=8)
+def _downscaled_logo(path, mtime, max_width_px, max_height_px):
+    """
+    (PNG bytes of the logo fitted into the pixel box, original width, original height).
+    The mtime argument makes a replaced file get re-read.
+    """
+    with PILImage.open(path) as pil_img:
+        pil_img.load()
+        original_size = pil_img.size
+        pil_img.thumbnail((max_width_px, max_height_px), PILImage.LANCZOS) # Keeps transparency and never upscales
+        buffer = io.BytesIO()
+        pil_img.save(buffer, format='PNG')
+    return buffer.getvalue(), *original_size
+
+
+def get_logo(width=LOGO_WIDTH, height=LOGO_HEIGHT):
+    """
+    Returns a new logo flowable fitted into width x height, or None if the logo is missing/unreadable.
+    A new flowable is returned on every call because flowables carry per-document layout state;
+    only the decoded image data is shared.
+    """
+    logo_path = get_logo_path()
+    try:
+        mtime = os.path.getmtime(logo_path)
+    except OSError:
+        return None
+
+    dpi = getattr(settings, 'PDF_LOGO_DPI', DEFAULT_LOGO_DPI)
+    try:
+        if not dpi:
+            return Image(logo_path, width=width, height=height, kind='proportional')
+        png, original_width, original_height = _downscaled_logo(logo_path, mtime, round(width / inch * dpi), round(height / inch * dpi))
+        # Size from the original dimensions, so rounding in the downscaled copy does not change the layout
+        factor = min(width / original_width, height / original_height)
+        return Image(io.BytesIO(png), width=original_width * factor, height=original_height * factor)
+    except Exception as e:
+        print(f"--- ERROR: Error loading logo image for PDF: {e}")
+        return None
+
+
+# --- LETTERHEAD ---
+def build_pdf_header_letterhead(story_list, styles, logo_el, doc_title_text, reference,
+                                company_name_main, company_address_l1, company_address_l2, company_contact_reg,
+                                show_company_info=True):
+    left_col_content = []
+    if logo_el:
+        logo_el.hAlign = 'LEFT'
+        left_col_content.append(logo_el)
+        if show_company_info:
+            left_col_content.append(Spacer(1, 0.05*inch))
+
+    if show_company_info:
+        if company_name_main:
+            left_col_content.append(Paragraph(company_name_main, styles['CompanyNameLarge']))
+        if company_address_l1:
+            left_col_content.append(Paragraph(company_address_l1.replace('<br/>', '\n'), styles['CompanyAddressSmall']))
+        if company_address_l2:
+            left_col_content.append(Paragraph(company_address_l2.replace('\n', '<br/>'), styles['CompanyAddressSmall']))
+        if company_contact_reg:
+            left_col_content.append(Paragraph(company_contact_reg, styles['CompanyAddressSmall']))
+
+    right_col_content = [
+        Paragraph(doc_title_text.upper(), styles['DocumentTitleMain']),
+        Paragraph(f"No: {reference}", styles['DocumentReference'])
+    ]
+
+    if not left_col_content:
+        left_col_content = [Spacer(1, 0.1*inch)]
+
+    header_table = Table([[left_col_content, right_col_content]], colWidths=[3.75*inch, 3.75*inch])
+    header_table.setStyle(TableStyle([
+        ('VALIGN', (0,0), (-1,-1), 'TOP'),
+        ('ALIGN', (0,0), (0,0), 'LEFT'),
+        ('ALIGN', (1,0), (1,0), 'RIGHT'),
+        ('LEFTPADDING', (0,0), (-1,-1), 0),
+        ('RIGHTPADDING', (0,0), (-1,-1), 0),
+    ]))
+    story_list.append(header_table)
+    story_list.append(Spacer(1, 0.2*inch))
+
+
+def build_company_letterhead(story_list, doc_title_text, reference, show_company_info=True):
+    """ Letterhead with the company logo and (optionally) the company details. """
+    build_pdf_header_letterhead(story_list, STYLES, get_logo(), doc_title_text, reference,
+                                COMPANY_NAME_FOR_PDF,
+                                COMPANY_ADDRESS_PDF_LINE1,
+                                COMPANY_ADDRESS_PDF_LINE2,
+                                COMPANY_CONTACT_DETAILS_PDF + " | " + COMPANY_REGISTRATION_PDF,
+                                show_company_info=show_company_info)
+
+
+def build_report_header(story_list, title, subtitle):
+    """ Report title/subtitle on the left with the logo on the right (or the title alone if there is no logo). """
+    title_elements = [Paragraph(title, STYLES['ReportMainTitle']), Paragraph(subtitle, STYLES['ReportPeriodSubtitle'])]
+    logo_el = get_logo()
+    if logo_el:
+        header_table = Table([[title_elements, logo_el]], colWidths=[5.5*inch, 1.5*inch])
+        header_table.setStyle(TableStyle([
+            ('VALIGN', (0,0), (-1,-1), 'TOP'), ('ALIGN', (0,0), (0,0), 'LEFT'),
+            ('ALIGN', (1,0), (1,0), 'RIGHT'), ('LEFTPADDING', (0,0), (0,0), 0),
+            ('RIGHTPADDING', (1,0), (1,0), 0),
+        ]))
+        story_list.append(header_table)
+    else:
+        story_list.extend(title_elements)
+    story_list.append(Spacer(1, 0.1*inch))
+
+
+# --- SIGNATURE FOOTER ---
+def make_signature_footer(*labels):
+    """ Returns an onPage callback drawing one signature block per label, side by side at the bottom of the page. """
+    def draw_signature_footer(canvas, doc):
+        canvas.saveState()
+        width = doc.pagesize[0]
+
+        # Equal columns across the usable width, with extra padding between them
+        usable_width = width - doc.leftMargin - doc.rightMargin
+        col_width = usable_width / len(labels)
+        padding = 15
+        xs = [doc.leftMargin + index * (col_width + padding) for index in range(len(labels))]
+        y = 0.5 * inch
+
+        canvas.setFont("Helvetica-Bold", 7)
+        for x, label in zip(xs, labels):
+            canvas.drawString(x, y + 30, label)
+
+        canvas.setFont("Helvetica", 7)
+        for x in xs:
+            canvas.drawString(x, y + 15, "Name & Signature: ________________________")
+        for x in xs:
+            canvas.drawString(x, y, "Date: _______________   Time: __________")
+
+        canvas.restoreState()
+    return draw_signature_footer
+
+
+# --- TABLES ---
+def get_items_table_style(header_bg_color=colors.HexColor("#4A5568"), grid_color=colors.HexColor("#BDC3C7")):
+    """ Style commands for the '#, item & description, qty' tables of the letterhead documents. """
+    return [
+        ('BACKGROUND', (0,0), (-1,0), header_bg_color),
+        ('TEXTCOLOR',(0,0),(-1,0),colors.white),
+        ('ALIGN', (0,0), (-1,0), 'CENTER'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('GRID', (0,0), (-1,-1), 0.5, grid_color),
+        ('ALIGN', (0,1), (0,-1), 'CENTER'),
+        ('ALIGN', (2,1), (2,-1), 'CENTER'),
+        ('LEFTPADDING', (1,0), (1,-1), 4),
+        ('RIGHTPADDING', (1,0), (1,-1), 4),
+        ('BOTTOMPADDING', (0,0), (-1,0), 3),
+        ('TOPPADDING', (0,0), (-1,0), 3),
+        ('BOTTOMPADDING', (0,1), (-1,-1), 2),
+        ('TOPPADDING', (0,1), (-1,-1), 2),
+    ]
+
+
+def get_base_table_style(header_bg_color=colors.HexColor("#4A5568"), grid_color=colors.darkgrey, even_row_bg_color=colors.HexColor("#F0F8FF"), odd_row_bg_color=colors.white):
+    style_cmds = [
+        ('BACKGROUND', (0,0), (-1,0), header_bg_color),
+        ('TEXTCOLOR',(0,0),(-1,0), colors.whitesmoke),
+        ('ALIGN', (0,0), (-1,0), 'CENTER'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,0), 7.5),
+        ('FONTSIZE', (0,1), (-1,-1), 7),
+        ('GRID', (0,0), (-1,-1), 0.5, grid_color),
+        ('TOPPADDING', (0,0), (-1,-1), 3),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 3),
+        ('LEFTPADDING', (0,0), (-1,-1), 4),
+        ('RIGHTPADDING', (0,0), (-1,-1), 4),
+    ]
+    return style_cmds
+
+
+def apply_zebra_striping(table_style_list, data_rows_count, even_row_bg_color=colors.HexColor("#F0F8FF"), odd_row_bg_color=colors.white):
+    for i in range(1, data_rows_count + 1):
+        bg_color = even_row_bg_color if i % 2 == 0 else odd_row_bg_color
+        table_style_list.append(('BACKGROUND', (0, i), (-1, i), bg_color))
+    return table_style_list
+
+
+def build_data_table(headers, rows, col_widths, extra_style_cmds=(), header_style='ReportTableHeader', cell_style='ReportTableCell'):
+    """
+    Zebra-striped report table. Plain values in `rows` are wrapped in Paragraphs with `cell_style`;
+    flowables are used as they are.
+    """
+    table_data = [[Paragraph(header, STYLES[header_style]) for header in headers]]
+    for row in rows:
+        table_data.append([value if hasattr(value, 'wrapOn') else Paragraph(str(value), STYLES[cell_style]) for value in row])
+    table = Table(table_data, colWidths=col_widths)
+    style = get_base_table_style()
+    apply_zebra_striping(style, len(table_data) - 1)
+    style.extend(extra_style_cmds)
+    table.setStyle(TableStyle(style))
+    return table
@@ -0,0 +1,72 @@
+# clavis_event_inventory/reports/streaming_exports.py
+
+"""
+CSV / NDJSON exports streamed with StreamingHttpResponse, for scripts that do not need the XLSX files.
+
+Rows are plain dicts (queryset.values() read with iterator(chunk_size=EXPORT_CHUNK_SIZE), so no model
+instances are created or cached) and are encoded as they are sent, a few hundred rows per chunk.
+Datetimes are converted to local time (ISO 8601) and decimals kept exact (strings in NDJSON).
+"""
+
+import csv
+import datetime
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+EXPORT_CHUNK_SIZE = 2000 # Rows fetched from the database per round trip
+ROWS_PER_WRITE = 500 # Rows encoded into each chunk sent to the client
+
+
+def iterate_values(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """ Streams queryset.values(*fields) without filling the queryset's result cache. """
+    return queryset.values(*fields).iterator(chunk_size=chunk_size)
+
+
+def _export_value(value):
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        return timezone.localtime(value).isoformat()
+    return value
+
+
+def _csv_chunks(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, key in columns])
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_export_value(row.get(key)) for header, key in columns])
+        if count % ROWS_PER_WRITE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(rows, columns):
+    lines = []
+    for row in rows:
+        record = {header: _export_value(row.get(key)) for header, key in columns}
+        lines.append(json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False))
+        if len(lines) >= ROWS_PER_WRITE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def stream_export(rows, columns, export_format, filename_stem):
+    """
+    StreamingHttpResponse attachment for `rows` (an iterable of dicts) in 'csv' or 'ndjson'.
+    `columns` is a list of (output name, row key) pairs; the output names are the CSV headers / JSON keys.
+    """
+    chunks = _csv_chunks(rows, columns) if export_format == 'csv' else _ndjson_chunks(rows, columns)
+    response = StreamingHttpResponse(chunks, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename_stem}.{export_format}"'
+    return response
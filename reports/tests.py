@@ -1,3 +1,81 @@
-from django.test import TestCase
+import base64
+import datetime
+import json
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from bookings.models import Event
+from clients.models import Client
+from clients.views import CLIENT_LIST_ORDERING, CLIENT_SORT_COMPANY
+from .keyset_pagination import encode_cursor, keyset_page
+
+EVENT_ORDERING = ('-start_date', '-pk')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class KeysetPageTests(TestCase):
+    """ Walking keyset pages visits every row once, in order, both ways. """
+
+    def setUp(self):
+        client = Client.objects.create(name="Keyset Client")
+        base = timezone.now().replace(microsecond=123456)
+        # Runs of equal start dates (ties broken by pk) and neighbours a microsecond apart
+        starts = [base] * 4 + [base - datetime.timedelta(microseconds=1)] * 3 + [base - datetime.timedelta(days=day) for day in range(1, 5)]
+        for index, start in enumerate(starts):
+            Event.objects.create(
+                client=client, event_name=f"Event {index}", event_location="Hall",
+                start_date=start, end_date=start + datetime.timedelta(hours=4),
+            )
+
+    def walk_forward(self, queryset, ordering, per_page):
+        pages, params = [], {}
+        while True:
+            page = keyset_page(queryset, ordering, params, per_page=per_page)
+            pages.append([row.pk for row in page['object_list']])
+            self.assertEqual(page['has_previous'], len(pages) > 1)
+            if not page['has_next']:
+                return pages, page
+            params = {'after': page['next_cursor']}
+
+    def walk_backward(self, queryset, ordering, per_page, last_page):
+        pages, page = [], last_page
+        while page['has_previous']:
+            page = keyset_page(queryset, ordering, {'before': page['previous_cursor']}, per_page=per_page)
+            pages.insert(0, [row.pk for row in page['object_list']])
+        return pages
+
+    def assertWalks(self, queryset, ordering, per_page):
+        expected = [row.pk for row in queryset.order_by(*ordering)]
+        pages, last_page = self.walk_forward(queryset, ordering, per_page)
+        self.assertEqual(sum(pages, []), expected)
+        self.assertTrue(all(len(page) == per_page for page in pages[:-1]))
+        self.assertEqual(self.walk_backward(queryset, ordering, per_page, last_page), pages[:-1])
+
+    def test_events_with_tied_start_dates(self):
+        for per_page in (1, 2, 3, 4, 5, 11, 20):
+            with self.subTest(per_page=per_page):
+                self.assertWalks(Event.objects.all(), EVENT_ORDERING, per_page)
+
+    def test_clients_on_coalesced_company_name(self):
+        for name, company in [("Zed", None), ("Amy", ""), ("Amy", None), ("Bob", "Acme"), ("Amy", "Acme"), ("Cal", "Beta"), ("Bob", None)]:
+            Client.objects.create(name=name, company_name=company)
+        clients = Client.objects.annotate(sort_company=CLIENT_SORT_COMPANY)
+        for per_page in (1, 2, 3, 8):
+            with self.subTest(per_page=per_page):
+                self.assertWalks(clients, CLIENT_LIST_ORDERING, per_page)
+
+    def test_invalid_cursors_give_the_first_page(self):
+        first_page = [row.pk for row in Event.objects.order_by(*EVENT_ORDERING)[:3]]
+        raw = lambda value: base64.urlsafe_b64encode(value.encode()).decode()
+        cursors = [
+            'not a cursor', '!!!', raw('not json'), raw('{"a": 1}'), raw('[1]'),
+            encode_cursor(['not a date', 1]), encode_cursor([timezone.now(), 'x']), raw(json.dumps([None, None, None])),
+        ]
+        for key in ('after', 'before'):
+            for cursor in cursors:
+                with self.subTest(key=key, cursor=cursor):
+                    page = keyset_page(Event.objects.all(), EVENT_ORDERING, {key: cursor}, per_page=3)
+                    self.assertEqual([row.pk for row in page['object_list']], first_page)
+                    self.assertFalse(page['has_previous'])
+                    self.assertTrue(page['has_next'])
@@ -9,6 +9,8 @@ urlpatterns = [
     
     # NEW: URL for the Monthly Summary Report
     path('monthly-summary/', views.monthly_summary_report_view, name='report_monthly_summary'),
+    # CSV / NDJSON streams of the summary data (events, rentals, item-lines, item-usage), same filters
+    path('monthly-summary/export/<slug:dataset>.<slug:export_format>', views.monthly_summary_export_view, name='report_monthly_summary_export'),
     
     # Add other report URLs here later
 ]
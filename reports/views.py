@@ -1,5 +1,7 @@
 # clavis_event_inventory/reports/views.py
 
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponseBadRequest
 from django.shortcuts import render
 from django.utils import timezone
 from django.db.models import Count, Sum
@@ -18,6 +20,86 @@ from .utils import (
     generate_monthly_summary_docx,
     get_month_year_str,
 )
+from .streaming_exports import EXPORT_FORMATS, iterate_values, stream_export
+
+def get_monthly_summary_filters(form, user):
+    """ (year, month, project manager) from a valid MonthlyReportFilterForm; non-superusers only see their own bookings. """
+    selected_year = form.cleaned_data.get('year', "all")
+    selected_month = form.cleaned_data.get('month', "all")
+    if 'project_manager' in form.fields:
+        selected_pm = form.cleaned_data.get('project_manager')
+    else:
+        # If user is not superuser, default to their own events
+        selected_pm = user
+    return selected_year, selected_month, selected_pm
+
+
+def _filter_period(queryset, selected_year, selected_month, date_field='start_date'):
+    if selected_year != "all":
+        queryset = queryset.filter(**{f'{date_field}__year': selected_year})
+    if selected_month != "all":
+        queryset = queryset.filter(**{f'{date_field}__month': selected_month})
+    return queryset
+
+
+def get_monthly_summary_querysets(selected_year, selected_month, selected_pm):
+    """
+    The (lazy) querysets behind the monthly summary: regular events, logistics services, rentals,
+    new clients, and the event/rental item lines counted in the item usage summary.
+    Shared by the report page, its XLSX/PDF/DOCX exports and the CSV/NDJSON exports.
+    """
+    # 1. Regular Events
+    regular_events_in_month = _filter_period(Event.objects.filter(is_logistics_only_service=False), selected_year, selected_month)
+    # 2. Logistics Services
+    logistics_services_in_month = _filter_period(Event.objects.filter(is_logistics_only_service=True), selected_year, selected_month)
+    # 3. Rentals
+    rentals_in_month = _filter_period(Rental.objects.all(), selected_year, selected_month)
+    if selected_pm:
+        regular_events_in_month = regular_events_in_month.filter(project_manager=selected_pm)
+        logistics_services_in_month = logistics_services_in_month.filter(project_manager=selected_pm)
+        rentals_in_month = rentals_in_month.filter(project_manager=selected_pm)
+
+    # 4. Clients Summary
+    new_clients_in_month = _filter_period(Client.objects.all(), selected_year, selected_month, date_field='created_at')
+
+    # 5. Item lines used in the period (not restricted to the project manager)
+    event_items_usage = _filter_period(
+        EventItem.objects.filter(booking__is_logistics_only_service=False), selected_year, selected_month, date_field='booking__start_date'
+    )
+    rental_items_usage = _filter_period(RentalItem.objects.all(), selected_year, selected_month, date_field='booking__start_date')
+
+    return {
+        # Every table and export shows the booking's client
+        'regular_events': regular_events_in_month.select_related('client'),
+        'logistics_services': logistics_services_in_month.select_related('client'),
+        'rentals': rentals_in_month.select_related('client'),
+        'new_clients': new_clients_in_month,
+        'event_items': event_items_usage,
+        'rental_items': rental_items_usage,
+    }
+
+
+def get_item_usage_summary(event_items_usage, rental_items_usage):
+    """ Times used and total quantity per item across event and rental lines, most used first. """
+    usage_dict = {}
+    for lines in (event_items_usage, rental_items_usage):
+        usage = lines.values('item__name', 'item__sku').annotate(
+            times_used=Count('booking', distinct=True),
+            total_quantity_used=Sum('quantity')
+        )
+        for row in usage:
+            key = (row['item__sku'], row['item__name'])
+            usage_dict.setdefault(key, {'times_used': 0, 'total_quantity_used': 0})
+            usage_dict[key]['times_used'] += row['times_used']
+            usage_dict[key]['total_quantity_used'] += row.get('total_quantity_used', 0) or 0
+
+    # Final list
+    item_usage_summary = [
+        {'item__name': name, 'item__sku': sku, **data}
+        for (sku, name), data in usage_dict.items()
+    ]
+    return sorted(item_usage_summary, key=lambda x: (-x['total_quantity_used'], x['item__name']))
+
 
 def monthly_summary_report_view(request):
     """
@@ -37,105 +119,22 @@ def monthly_summary_report_view(request):
 
     selected_year = None
     selected_month = None
-    selected_pm = None
     month_year_str = "Not Selected"
 
     if form.is_valid():
-        selected_year = form.cleaned_data.get('year', "all")
-        selected_month = form.cleaned_data.get('month', "all")
-        if 'project_manager' in form.fields:
-            selected_pm = form.cleaned_data.get('project_manager')
-        else:
-            # If user is not superuser, default to their own events
-            selected_pm = user
+        selected_year, selected_month, selected_pm = get_monthly_summary_filters(form, user)
         month_year_str = get_month_year_str(selected_year, selected_month)
 
-        # 1. Regular Events
-        regular_events_in_month = Event.objects.filter(is_logistics_only_service=False)
-        if selected_year != "all":
-            regular_events_in_month = regular_events_in_month.filter(start_date__year=selected_year)
-        if selected_month != "all":
-            regular_events_in_month = regular_events_in_month.filter(start_date__month=selected_month)
-        if selected_pm:
-            regular_events_in_month = regular_events_in_month.filter(project_manager=selected_pm)
-
-        # 2. Logistics Services
-        logistics_services_in_month = Event.objects.filter(is_logistics_only_service=True)
-        if selected_year != "all":
-            logistics_services_in_month = logistics_services_in_month.filter(start_date__year=selected_year)
-        if selected_month != "all":
-            logistics_services_in_month = logistics_services_in_month.filter(start_date__month=selected_month)
-        if selected_pm:
-            logistics_services_in_month = logistics_services_in_month.filter(project_manager=selected_pm)
-
-        # 3. Rentals
-        rentals_in_month = Rental.objects.all()
-        if selected_year != "all":
-            rentals_in_month = rentals_in_month.filter(start_date__year=selected_year)
-        if selected_month != "all":
-            rentals_in_month = rentals_in_month.filter(start_date__month=selected_month)
-        if selected_pm:
-            rentals_in_month = rentals_in_month.filter(project_manager=selected_pm)
-
-        # 4. Clients Summary
-        new_clients_in_month = Client.objects.all()
-        if selected_year != "all":
-            new_clients_in_month = new_clients_in_month.filter(created_at__year=selected_year)
-        if selected_month != "all":
-            new_clients_in_month = new_clients_in_month.filter(created_at__month=selected_month)
-
+        querysets = get_monthly_summary_querysets(selected_year, selected_month, selected_pm)
+        regular_events_in_month = querysets['regular_events']
+        logistics_services_in_month = querysets['logistics_services']
+        rentals_in_month = querysets['rentals']
+        new_clients_in_month = querysets['new_clients']
         clients_summary = {
             'new_clients': new_clients_in_month.order_by('created_at'),
             'new_clients_count': new_clients_in_month.count()
         }
-
-        # 5. Item Usage Summary
-        usage_dict = {}
-
-        # Event Items
-        event_items_usage = EventItem.objects.filter(
-            booking__is_logistics_only_service=False
-        )
-        if selected_year != "all":
-            event_items_usage = event_items_usage.filter(booking__start_date__year=selected_year)
-        if selected_month != "all":
-            event_items_usage = event_items_usage.filter(booking__start_date__month=selected_month)
-
-        event_items_usage = event_items_usage.values('item__name', 'item__sku').annotate(
-            times_used=Count('booking', distinct=True),
-            total_quantity_used=Sum('quantity')
-        )
-
-        for usage in event_items_usage:
-            key = (usage['item__sku'], usage['item__name'])
-            usage_dict.setdefault(key, {'times_used': 0, 'total_quantity_used': 0})
-            usage_dict[key]['times_used'] += usage['times_used']
-            usage_dict[key]['total_quantity_used'] += usage.get('total_quantity_used', 0) or 0
-
-        # Rental Items
-        rental_items_usage = RentalItem.objects.all()
-        if selected_year != "all":
-            rental_items_usage = rental_items_usage.filter(booking__start_date__year=selected_year)
-        if selected_month != "all":
-            rental_items_usage = rental_items_usage.filter(booking__start_date__month=selected_month)
-
-        rental_items_usage = rental_items_usage.values('item__name', 'item__sku').annotate(
-            times_used=Count('booking', distinct=True),
-            total_quantity_used=Sum('quantity')
-        )
-
-        for usage in rental_items_usage:
-            key = (usage['item__sku'], usage['item__name'])
-            usage_dict.setdefault(key, {'times_used': 0, 'total_quantity_used': 0})
-            usage_dict[key]['times_used'] += usage['times_used']
-            usage_dict[key]['total_quantity_used'] += usage.get('total_quantity_used', 0) or 0
-
-        # Final list
-        item_usage_summary = [
-            {'item__name': name, 'item__sku': sku, **data}
-            for (sku, name), data in usage_dict.items()
-        ]
-        item_usage_summary = sorted(item_usage_summary, key=lambda x: (-x['total_quantity_used'], x['item__name']))
+        item_usage_summary = get_item_usage_summary(querysets['event_items'], querysets['rental_items'])
 
         # 6. Export Handling
         export_format = request.GET.get('format')
@@ -171,3 +170,66 @@ def monthly_summary_report_view(request):
     }
 
     return render(request, 'reports/monthly_summary_report.html', context)
+
+
+# --- CSV / NDJSON streaming exports ---
+
+BOOKING_EXPORT_COLUMNS = [
+    ('id', 'pk'), ('reference_number', 'reference_number'),
+    ('client', 'client__name'), ('client_company', 'client__company_name'),
+    ('project_manager', 'project_manager__username'),
+    ('start_date', 'start_date'), ('end_date', 'end_date'), ('status', 'status'),
+]
+EVENT_EXPORT_COLUMNS = BOOKING_EXPORT_COLUMNS[:2] + [
+    ('event_name', 'event_name'), ('is_logistics_only_service', 'is_logistics_only_service'), ('event_location', 'event_location'),
+] + BOOKING_EXPORT_COLUMNS[2:]
+RENTAL_EXPORT_COLUMNS = BOOKING_EXPORT_COLUMNS[:2] + [('delivery_location', 'delivery_location')] + BOOKING_EXPORT_COLUMNS[2:]
+ITEM_LINE_EXPORT_COLUMNS = [
+    ('booking_type', 'booking_type'), ('booking_id', 'booking_id'), ('booking_reference', 'booking__reference_number'),
+    ('booking_status', 'booking__status'), ('start_date', 'booking__start_date'), ('end_date', 'booking__end_date'),
+    ('item_id', 'item_id'), ('item_sku', 'item__sku'), ('item_name', 'item__name'), ('quantity', 'quantity'),
+]
+ITEM_USAGE_EXPORT_COLUMNS = [
+    ('item_sku', 'item__sku'), ('item_name', 'item__name'), ('times_used', 'times_used'), ('total_quantity_used', 'total_quantity_used'),
+]
+EXPORT_DATASETS = ('events', 'rentals', 'item-lines', 'item-usage')
+
+
+def _item_line_rows(querysets):
+    """ Event lines (regular events, as in the usage summary) followed by rental lines, tagged with their booking type. """
+    fields = [key for name, key in ITEM_LINE_EXPORT_COLUMNS if key != 'booking_type']
+    for booking_type, lines in (('event', querysets['event_items']), ('rental', querysets['rental_items'])):
+        for row in iterate_values(lines.order_by('booking_id', 'pk'), fields):
+            row['booking_type'] = booking_type
+            yield row
+
+
+@login_required
+def monthly_summary_export_view(request, dataset, export_format):
+    """
+    Streams one dataset of the monthly summary as CSV or NDJSON, with the report's year/month/project_manager
+    filters (year and month default to "all" here). Datasets: events (regular and logistics), rentals,
+    item-lines and item-usage.
+    """
+    if dataset not in EXPORT_DATASETS or export_format not in EXPORT_FORMATS:
+        raise Http404("Unknown export.")
+    form = MonthlyReportFilterForm({'year': 'all', 'month': 'all', **request.GET.dict()}, user=request.user)
+    if not form.is_valid():
+        return HttpResponseBadRequest(f"Invalid filters: {form.errors.as_text()}", content_type='text/plain')
+
+    selected_year, selected_month, selected_pm = get_monthly_summary_filters(form, request.user)
+    querysets = get_monthly_summary_querysets(selected_year, selected_month, selected_pm)
+    if dataset == 'events':
+        events = (querysets['regular_events'] | querysets['logistics_services']).order_by('start_date', 'pk')
+        rows, columns = iterate_values(events, [key for name, key in EVENT_EXPORT_COLUMNS]), EVENT_EXPORT_COLUMNS
+    elif dataset == 'rentals':
+        rentals = querysets['rentals'].order_by('start_date', 'pk')
+        rows, columns = iterate_values(rentals, [key for name, key in RENTAL_EXPORT_COLUMNS]), RENTAL_EXPORT_COLUMNS
+    elif dataset == 'item-lines':
+        rows, columns = _item_line_rows(querysets), ITEM_LINE_EXPORT_COLUMNS
+    else:
+        # One row per item, already aggregated in SQL
+        rows, columns = get_item_usage_summary(querysets['event_items'], querysets['rental_items']), ITEM_USAGE_EXPORT_COLUMNS
+
+    filename_stem = f"clavis_{dataset}_{selected_year}_{selected_month}"
+    return stream_export(rows, columns, export_format, filename_stem)
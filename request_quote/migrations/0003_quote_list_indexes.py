@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0004_client_list_index'),
+        ('request_quote', '0002_remove_quoterequest_client_name_quoterequest_client'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quoterequest',
+            index=models.Index(fields=['event_start_date'], name='quote_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quoterequest',
+            index=models.Index(fields=['client', 'event_start_date'], name='quote_client_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quoterequest',
+            index=models.Index(fields=['project_manager', 'event_start_date'], name='quote_manager_start_idx'),
+        ),
+    ]
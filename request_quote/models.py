@@ -47,6 +47,14 @@ class QuoteRequest(models.Model):
     # Notes
     project_manager_notes = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            # Keyset-paginated quote list (newest first), unfiltered or filtered by client / project manager
+            models.Index(fields=['event_start_date'], name='quote_start_idx'),
+            models.Index(fields=['client', 'event_start_date'], name='quote_client_start_idx'),
+            models.Index(fields=['project_manager', 'event_start_date'], name='quote_manager_start_idx'),
+        ]
+
     def __str__(self):
         return f"{self.event_title} ({self.reference_number})"
 
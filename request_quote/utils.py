@@ -16,82 +16,26 @@ from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER, TA_JUSTIFY
 from .models import QuoteRequest, QuoteRequestItem
 from inventory.models import Item
 
-# --- PDF STYLES ---
-def get_pdf_styles():
-    styles = getSampleStyleSheet()
-    base_font = 'Helvetica'
-    base_font_bold = 'Helvetica-Bold'
-
-    # Company Header Styles
-    styles.add(ParagraphStyle(name='CompanyNameLarge', parent=styles['h1'], fontName=base_font_bold, fontSize=16, leading=18, alignment=TA_LEFT, textColor=colors.HexColor("#2C3E50")))
-    styles.add(ParagraphStyle(name='CompanyAddressSmall', parent=styles['Normal'], fontName=base_font, fontSize=7, leading=8, alignment=TA_LEFT, textColor=colors.HexColor("#34495E")))
-
-    # Document Title & Reference Styles
-    styles.add(ParagraphStyle(name='DocumentTitleMain', parent=styles['h1'], fontName=base_font_bold, fontSize=18, alignment=TA_RIGHT, textColor=colors.HexColor("#4A4A4A"), spaceBefore=0, spaceAfter=1))
-    styles.add(ParagraphStyle(name='DocumentReference', parent=styles['Normal'], fontName=base_font_bold, fontSize=8, alignment=TA_RIGHT, textColor=colors.HexColor("#2C3E50"), spaceBefore=3))
-
-    # Addressee & Date Section Styles
-    styles.add(ParagraphStyle(name='AddresseeToLabel', parent=styles['Normal'], fontName=base_font, fontSize=7.5, alignment=TA_LEFT, textColor=colors.HexColor("#7F8C8D"), spaceBefore=0, spaceAfter=1, leading=9))
-    styles.add(ParagraphStyle(name='AddresseeName', parent=styles['Normal'], fontName=base_font_bold, fontSize=9, alignment=TA_LEFT, textColor=colors.HexColor("#2C3E50"), spaceBefore=0, spaceAfter=0, leading=11))
-    styles.add(ParagraphStyle(name='AddresseeInfo', parent=styles['Normal'], fontName=base_font, fontSize=7.5, alignment=TA_LEFT, textColor=colors.HexColor("#34495E"), leading=9))
-    styles.add(ParagraphStyle(name='RightDetailLine', parent=styles['Normal'], fontName=base_font, fontSize=8, alignment=TA_RIGHT, textColor=colors.HexColor("#2C3E50"), spaceBefore=0, spaceAfter=0, leading=10))
-    styles.add(ParagraphStyle(name='RightDetailLineBold', parent=styles['RightDetailLine'], fontName=base_font_bold))
-
-    # Item Table Styles
-    styles.add(ParagraphStyle(name='ItemsTableHeader', parent=styles['Normal'], fontName=base_font_bold, fontSize=7.5, alignment=TA_CENTER, textColor=colors.white, spaceBefore=2, spaceAfter=2))
-    styles.add(ParagraphStyle(name='ItemsTableCellText', parent=styles['Normal'], fontName=base_font, fontSize=7.5, leading=9, alignment=TA_LEFT))
-    styles.add(ParagraphStyle(name='ItemsTableCellNumber', parent=styles['Normal'], fontName=base_font, fontSize=7.5, leading=9, alignment=TA_CENTER))
-
-    # Section Title
-    styles.add(ParagraphStyle(name='SectionTitle', parent=styles['h2'], fontName=base_font_bold, fontSize=10, alignment=TA_LEFT, textColor=colors.HexColor("#2C3E50"), spaceBefore=10, spaceAfter=2, borderPadding=1, bottomPadding=1))
-
-    # Disclaimer & Signature Styles
-    styles.add(ParagraphStyle(name='DisclaimerText', parent=styles['Normal'], fontName=base_font, fontSize=6.5, leading=8, textColor=colors.HexColor("#546E7A"), alignment=TA_JUSTIFY))
-    styles.add(ParagraphStyle(name='SignatureLine', parent=styles['Normal'], fontName=base_font, fontSize=8, spaceBefore=12, textColor=colors.HexColor("#2C3E50"), leading=10))
-    styles.add(ParagraphStyle(name='SignatureLabel', parent=styles['Normal'], fontName=base_font_bold, fontSize=8, spaceBefore=0, textColor=colors.HexColor("#2C3E50"), leading=10))
-    
-    styles.add(ParagraphStyle(name='NoDataMessage', parent=styles['Normal'], fontSize=9, textColor=colors.grey, alignment=TA_CENTER, spaceBefore=6, spaceAfter=6))
-    return styles
-
-def build_pdf_header_letterhead(story_list, styles, logo_el, doc_title_text, quote_ref, 
-                                company_name_main, company_address_l1, company_address_l2, company_contact_reg, 
-                                show_company_info=True):
-    left_col_content = []
-    if logo_el:
-        logo_el.hAlign = 'LEFT'
-        left_col_content.append(logo_el)
-        if show_company_info:
-            left_col_content.append(Spacer(1, 0.05*inch))
-    
-    if show_company_info:
-        if company_name_main:
-            left_col_content.append(Paragraph(company_name_main, styles['CompanyNameLarge']))
-        if company_address_l1:
-            left_col_content.append(Paragraph(company_address_l1.replace('<br/>', '\n'), styles['CompanyAddressSmall']))
-        if company_address_l2:
-            left_col_content.append(Paragraph(company_address_l2.replace('\n', '<br/>'), styles['CompanyAddressSmall']))
-        if company_contact_reg:
-            left_col_content.append(Paragraph(company_contact_reg, styles['CompanyAddressSmall']))
-    
-    right_col_content = [
-        Paragraph(doc_title_text.upper(), styles['DocumentTitleMain']),
-        Paragraph(f"No: {quote_ref}", styles['DocumentReference'])
+# Shared PDF toolkit (styles, logo, letterhead)
+from reports.pdf_toolkit import get_pdf_styles, get_logo, build_pdf_header_letterhead, make_signature_footer
+
+draw_signature_footer = make_signature_footer("Project Manager:")
+
+
+def quote_document_state(quote):
+    """
+    What the quote PDF renders, for the document cache fingerprint. Quotes have no updated_at,
+    so every field of the quote is used, plus the project manager's name and the item lines.
+    Uses quote.items.all(), so prefetch 'items__item' to avoid extra queries.
+    """
+    project_manager = quote.project_manager
+    return [
+        [getattr(quote, field.attname) for field in quote._meta.concrete_fields],
+        quote.client.name if quote.client else None,
+        [project_manager.pk, project_manager.get_full_name(), project_manager.username] if project_manager else None,
+        sorted((line.pk, line.item_id, line.quantity, line.item.name) for line in quote.items.all()),
     ]
-    
-    if not left_col_content:
-        left_col_content = [Spacer(1, 0.1*inch)]
 
-    header_table_data = [[left_col_content, right_col_content]]
-    header_table = Table(header_table_data, colWidths=[3.75*inch, 3.75*inch])
-    header_table.setStyle(TableStyle([
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('ALIGN', (0,0), (0,0), 'LEFT'),
-        ('ALIGN', (1,0), (1,0), 'RIGHT'),
-        ('LEFTPADDING', (0,0), (-1,-1), 0),       
-        ('RIGHTPADDING', (0,0), (-1,-1), 0),       
-    ]))
-    story_list.append(header_table)
-    story_list.append(Spacer(1, 0.2*inch))
 
 def build_addressee_date_section_letterhead(story_list, styles, quote, doc_date_label, doc_date_value):
     left_info = []
@@ -171,27 +115,6 @@ def build_items_table_letterhead(story, styles, quote_items_qs):
 
     story.append(table)
 
-def draw_signature_footer(canvas, doc):
-    canvas.saveState()
-    width, height = letter
-
-    # Set margins
-    left_margin = doc.leftMargin
-    usable_width = width - left_margin - doc.rightMargin
-
-    x = left_margin
-    y = 0.5 * inch
-
-    canvas.setFont("Helvetica-Bold", 7)
-    canvas.drawString(x, y + 30, "Project Manager:")
-
-    canvas.setFont("Helvetica", 7)
-    canvas.drawString(x, y + 15, "Name & Signature: ________________________")
-    canvas.drawString(x, y, "Date: _______________   Time: __________")
-
-    canvas.restoreState()
-
-
 # In request_quote/utils.py, within generate_quote_pdf
 def generate_quote_pdf(quote):
     buffer = io.BytesIO()
@@ -206,19 +129,9 @@ def generate_quote_pdf(quote):
     styles = get_pdf_styles()
     story = []
 
-    # Load logo
-    logo_path = os.path.join(settings.STATICFILES_DIRS[0] if settings.STATICFILES_DIRS else settings.STATIC_ROOT or '', 'images', 'clavis_logo.png')
-    logo_el = None
-    if os.path.exists(logo_path):
-        try:
-            logo = Image(logo_path, width=1.5*inch, height=0.6*inch, kind='proportional')
-            logo_el = logo
-        except Exception as e:
-            print(f"--- ERROR: Error loading logo image for Quote: {e}")
-
     # Build header
     build_pdf_header_letterhead(
-        story, styles, logo_el, "QUOTE REQUEST",
+        story, styles, get_logo(), "QUOTE REQUEST",
         quote.reference_number, "", "", "", "",
         show_company_info=False
     )
@@ -12,7 +12,9 @@ from django import forms
 
 from django.contrib.auth.decorators import login_required
 
-from .utils import generate_quote_pdf
+from .utils import generate_quote_pdf, quote_document_state
+from reports.document_cache import serve_cached_document
+from reports.keyset_pagination import apply_list_filters, filter_choices, keyset_page
 
 # --- List View ---
 def quote_list_view(request):
@@ -21,12 +23,19 @@ def quote_list_view(request):
     else:
         quotes = QuoteRequest.objects.filter(project_manager=request.user).select_related('project_manager','client')
 
-    quotes = quotes.order_by('-event_start_date')
+    quotes, selected = apply_list_filters(quotes, request.GET, 'event_start_date')
+    page = keyset_page(quotes, ('-event_start_date', '-pk'), request.GET) # Newest first, on the event_start_date indexes
 
     context = {
-        'quotes': quotes,
+        'quotes': page['object_list'],
+        'page': page,
+        'selected': selected,
+        'filtered': any(selected.values()),
+        **filter_choices(selected),
         'page_title': 'Quote Requests'
     }
+    if not request.user.is_superuser:
+        context['filter_managers'] = None # Only their own quotes are listed
     return render(request, 'request_quote/quote_list.html', context)
 
 
@@ -131,10 +140,13 @@ def quote_pdf_view(request, quote_id):
     try:
         # Retrieve QuoteRequest with related project_manager and items
         quote = get_object_or_404(
-            QuoteRequest.objects.select_related('project_manager').prefetch_related('items__item'),
+            QuoteRequest.objects.select_related('project_manager', 'client').prefetch_related('items__item'),
             pk=quote_id
         )
-        return generate_quote_pdf(quote)
+        return serve_cached_document(
+            request, 'quote', f"quote-{quote.pk}", quote_document_state(quote),
+            f"Quote-{quote.reference_number}.pdf", lambda: generate_quote_pdf(quote),
+        )
     except Http404:
         messages.error(request, "Quote request not found.")
         return redirect('dashboard:dashboard_main')
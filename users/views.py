@@ -3,11 +3,24 @@ from django.contrib.auth.hashers import make_password
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.auth.views import LogoutView
+from reports.keyset_pagination import keyset_page
 
 # List all users
 def user_list_view(request):
+    # Filters: role (admin / staff) and active (1 / 0); keyset-paginated on the unique username
+    role = request.GET.get('role', '')
+    active = request.GET.get('active', '')
     users = User.objects.all()
-    return render(request, 'users/user_list.html', {'users': users})
+    if role in ('admin', 'staff'):
+        users = users.filter(is_superuser=(role == 'admin'))
+    else:
+        role = ''
+    if active in ('1', '0'):
+        users = users.filter(is_active=(active == '1'))
+    else:
+        active = ''
+    page = keyset_page(users, ('username',), request.GET)
+    return render(request, 'users/user_list.html', {'users': page['object_list'], 'page': page, 'role': role, 'active': active})
 
 # Add a user
 def user_add_view(request):